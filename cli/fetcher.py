@@ -4,14 +4,14 @@ Unified metadata fetcher with improved information fetching logic.
 
 import click
 import sys
-import requests
+import yaml
 from pathlib import Path
 
 # Add the project root to the path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from metadata.core import FetcherRegistry, FetcherConfig, ToolCategory
-from metadata.core.fetchers import PyPIFetcher, GitHubFetcher, DockerHubFetcher, DocsFetcher, GoogleCSEFetcher, DuckDuckGoFetcher, BingSearchFetcher, YandexSearchFetcher, MainFetcher, MultiSearchFetcher
+from metadata.core.fetchers import PyPIFetcher, PyPIMirrorFetcher, PyPIMirrorIndex, GitHubFetcher, DockerHubFetcher, DocsFetcher, GoogleCSEFetcher, DuckDuckGoFetcher, BingSearchFetcher, YandexSearchFetcher, MainFetcher, MultiSearchFetcher
 from metadata.core.basic import save_to_json, save_to_yaml
 from metadata.core.export_formats import save_to_docx, save_to_pdf, save_to_txt
 from metadata.core.schema_formatter import SchemaFormatter
@@ -20,9 +20,10 @@ from utils.tool_normalizer import tool_normalizer
 class MetadataFetcher:
     """Handles metadata fetching operations with improved logic."""
     
-    def __init__(self):
+    def __init__(self, cache_snapshot=None):
         self.registry = None
         self.config = None
+        self.cache_snapshot = cache_snapshot
         
         # Define supported tools by category
         self.supported_tools = {
@@ -59,10 +60,12 @@ class MetadataFetcher:
         """Setup the fetcher registry with configuration."""
         self.config = FetcherConfig(
             output_format=output_format,
-            output_directory=output_directory
+            output_directory=output_directory,
+            stale_while_revalidate=True,
+            cache_snapshot=self.cache_snapshot
         )
         
-        self.registry = FetcherRegistry(self.config)
+        self.registry = FetcherRegistry(self.config, normalizer=tool_normalizer.normalize_tool_name)
         
         # Register MainFetcher first (highest priority for programming languages and online data)
         self.registry.register_class(MainFetcher)
@@ -72,6 +75,7 @@ class MetadataFetcher:
         
         # Register other online sources
         self.registry.register_class(GoogleCSEFetcher)
+        self.registry.register_class(PyPIMirrorFetcher)
         self.registry.register_class(PyPIFetcher)
         self.registry.register_class(GitHubFetcher)
         self.registry.register_class(DockerHubFetcher)
@@ -224,7 +228,8 @@ class MetadataFetcher:
         """Try to get a better description from various sources."""
         # Try PyPI first
         try:
-            response = requests.get(f"https://pypi.org/pypi/{tool_name}/json", timeout=5)
+            response = self.config.get_transport().get(f"https://pypi.org/pypi/{tool_name}/json", timeout=5,
+                                                       cached=True)
             if response.status_code == 200:
                 data = response.json()
                 description = data.get('info', {}).get('summary', '')
@@ -235,9 +240,10 @@ class MetadataFetcher:
         
         # Try GitHub search
         try:
-            response = requests.get(
+            response = self.config.get_transport().get(
                 f"https://api.github.com/search/repositories?q={tool_name}&sort=stars&order=desc&per_page=1",
-                timeout=5
+                timeout=5,
+                cached=True
             )
             if response.status_code == 200:
                 data = response.json()
@@ -255,7 +261,8 @@ class MetadataFetcher:
         """Try to get version information."""
         # Try PyPI
         try:
-            response = requests.get(f"https://pypi.org/pypi/{tool_name}/json", timeout=5)
+            response = self.config.get_transport().get(f"https://pypi.org/pypi/{tool_name}/json", timeout=5,
+                                                       cached=True)
             if response.status_code == 200:
                 data = response.json()
                 version = data.get('info', {}).get('version', '')
@@ -304,10 +311,9 @@ class MetadataFetcher:
             results = []
             click.echo(f"🔄 Processing {len(tool_list)} tools...")
             
-            for i, tool_name in enumerate(tool_list, 1):
+            for i, (tool_name, metadata) in enumerate(self.registry.fetch_many(tool_list), 1):
                 try:
-                    click.echo(f"[{i}/{len(tool_list)}] Fetching: {tool_name}")
-                    metadata = self.registry.fetch_metadata(tool_name)
+                    click.echo(f"[{i}/{len(tool_list)}] Fetched: {tool_name}")
                     
                     if metadata:
                         # Create output path
@@ -332,6 +338,93 @@ class MetadataFetcher:
         except Exception as e:
             click.echo(f"❌ Error: {e}")
     
+    def export_cache(self, output_path):
+        """Export the API and metadata caches as a snapshot bundle."""
+        try:
+            config = FetcherConfig()
+            counts = config.get_cache_manager().export_snapshot(output_path)
+            click.echo(f"📦 Exported {sum(counts.values())} cache entries to {output_path}")
+            for cache_type, count in counts.items():
+                click.echo(f"  {cache_type}: {count}")
+            return counts
+        except Exception as e:
+            click.echo(f"❌ Error: {e}")
+            return None
+    
+    def import_cache(self, bundle_path):
+        """Import a snapshot bundle into the local cache."""
+        try:
+            config = FetcherConfig()
+            counts = config.get_cache_manager().import_snapshot(bundle_path)
+            click.echo(f"📥 Imported {sum(counts.values())} cache entries from {bundle_path}")
+            for cache_type, count in counts.items():
+                click.echo(f"  {cache_type}: {count}")
+            return counts
+        except Exception as e:
+            click.echo(f"❌ Error: {e}")
+            return None
+    
+    def ingest_pypi_mirror(self, sources, index_path=None, force=False):
+        """Add new and changed PyPI JSON documents or JSONL dumps to the local mirror index."""
+        try:
+            index_path = index_path or FetcherConfig().pypi_mirror_index
+            index = PyPIMirrorIndex(index_path)
+            report = index.ingest(sources, force=force)
+            stats = index.get_stats()
+            index.close()
+            
+            click.echo(f"📦 Ingested {report['projects']} projects from {report['files']} files "
+                       f"({report['skipped']} unchanged, {report['errors']} unreadable documents)")
+            click.echo(f"  {index_path}: {stats['projects']} projects from {stats['files']} files")
+            return report
+        except Exception as e:
+            click.echo(f"❌ Error: {e}")
+            return None
+    
+    def get_warm_tool_list(self):
+        """Get the normalized tools to keep warm: tool_classification.yaml plus supported_tools."""
+        classification_file = Path(__file__).parent.parent / "tool_classification.yaml"
+        tool_classification = {}
+        if classification_file.exists():
+            with open(classification_file, 'r', encoding='utf-8') as f:
+                tool_classification = yaml.safe_load(f) or {}
+        
+        tools = list(tool_classification) + self.all_supported_tools
+        return list(dict.fromkeys(tool_normalizer.normalize_tool_name(tool) for tool in tools))
+    
+    def warm_cache(self, concurrency=None, refresh_window=None):
+        """Prime the caches for every known tool so user lookups hit warm entries."""
+        try:
+            # Setup registry
+            self.setup_registry()
+            
+            tool_list = self.get_warm_tool_list()
+            click.echo(f"🔥 Warming cache for {len(tool_list)} tools...")
+            
+            report = self.registry.warm(tool_list, concurrency=concurrency,
+                                        refresh_window=refresh_window)
+            
+            for tool_name, status in report['tools'].items():
+                if status == 'failed':
+                    click.echo(f"❌ Could not warm: {tool_name}")
+            
+            click.echo("📊 Warm Summary:")
+            click.echo(f"  Total tools: {report['total']}")
+            click.echo(f"  Warmed: {report['warmed']}")
+            click.echo(f"  Already fresh: {report['fresh']}")
+            click.echo(f"  Failed: {report['failed']}")
+            click.echo(f"  Coverage: {report['coverage'] * 100:.1f}%")
+            click.echo(f"  Time: {report['duration']:.1f}s")
+            
+            return report
+            
+        except Exception as e:
+            click.echo(f"❌ Error: {e}")
+            return None
+        finally:
+            if self.registry:
+                self.registry.shutdown()
+    
     def _print_batch_summary(self, results):
         """Print batch processing summary."""
         successful = sum(1 for _, success in results if success)
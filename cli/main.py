@@ -14,7 +14,9 @@ def cli():
     pass
 
 @cli.command()
-def fetch():
+@click.option('--snapshot', type=click.Path(exists=True, dir_okay=False), default=None,
+              help='Serve lookups offline from this cache snapshot bundle.')
+def fetch(snapshot):
     """Simple fetch: Enter tool name and choose format."""
     try:
         # Step 1: Prompt for tool name
@@ -24,7 +26,7 @@ def fetch():
         output_format = prompt_for_format()
         
         # Create unified fetcher and fetch metadata
-        fetcher = MetadataFetcher()
+        fetcher = MetadataFetcher(cache_snapshot=snapshot)
         fetcher.fetch_tool_metadata(tool_name, output_format, "outputs")
         
     except KeyboardInterrupt:
@@ -33,6 +35,44 @@ def fetch():
         click.echo(f"❌ Error: {e}")
         sys.exit(1)
 
+@cli.command()
+@click.option('--concurrency', type=int, default=None, help='Tools fetched at once (defaults to the configured worker count).')
+@click.option('--window', type=float, default=None, help='Refresh entries expiring within this many seconds.')
+def warm(concurrency, window):
+    """Prime the caches for every known tool."""
+    try:
+        fetcher = MetadataFetcher()
+        report = fetcher.warm_cache(concurrency, window)
+        if report is None:
+            sys.exit(1)
+        
+    except KeyboardInterrupt:
+        click.echo("\n\n👋 Goodbye!")
+
+@cli.command('export-cache')
+@click.argument('output_path', type=click.Path(dir_okay=False))
+def export_cache(output_path):
+    """Export the API and metadata caches as a snapshot bundle."""
+    if MetadataFetcher().export_cache(output_path) is None:
+        sys.exit(1)
+
+@cli.command('import-cache')
+@click.argument('bundle_path', type=click.Path(exists=True, dir_okay=False))
+def import_cache(bundle_path):
+    """Import a cache snapshot bundle into the local cache."""
+    if MetadataFetcher().import_cache(bundle_path) is None:
+        sys.exit(1)
+
+@cli.command('ingest-pypi-mirror')
+@click.argument('sources', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--index', 'index_path', type=click.Path(dir_okay=False),
+              help='Mirror index to update (default: PYPI_MIRROR_INDEX or cache/pypi_mirror.sqlite3)')
+@click.option('--force', is_flag=True, help='Re-read files that have not changed since the last ingest')
+def ingest_pypi_mirror(sources, index_path, force):
+    """Index PyPI JSON documents or JSONL dumps for offline PyPI lookups."""
+    if MetadataFetcher().ingest_pypi_mirror(sources, index_path, force) is None:
+        sys.exit(1)
+
 @cli.command()
 def info():
     """Show system information."""
@@ -3,15 +3,44 @@ Abstract base class for all fetchers in the unified architecture.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List, Sequence, Tuple
 from .schema import UnifiedMetadata, ToolCategory
 from .config import FetcherConfig
-from .cache import CacheManager
+from .cache import CACHE_KEY_VERSION, make_cache_key
+from .limits import ByteBudget
+from .transport import HttpTransport, STREAM_CHUNK_SIZE
+import asyncio
+import contextvars
+import json
+import threading
 import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Set while a fetch must not read cached results (forced refresh). A context
+# variable so it follows fetch() into executor threads used by afetch().
+_skip_cache_reads = contextvars.ContextVar('skip_cache_reads', default=False)
+
+# Download counters of the fetch running in this context (see read_response())
+_download_metrics = contextvars.ContextVar('download_metrics', default=None)
+
+# raw_data entries that describe one call rather than the result; they are
+# left out of cached metadata
+PER_CALL_RAW_DATA = ('downloads', 'cache_stale', 'registry')
+
+def metadata_cache_entry(metadata: UnifiedMetadata) -> Dict[str, Any]:
+    """
+    Serialize metadata for the result cache.
+    
+    Unlike UnifiedMetadata.to_dict(), keeps raw_data (minus
+    PER_CALL_RAW_DATA), which UnifiedMetadata.from_dict() restores.
+    """
+    data = metadata.to_dict()
+    data['raw_data'] = {key: value for key, value in metadata.raw_data.items()
+                        if key not in PER_CALL_RAW_DATA}
+    return data
+
 class FetcherError(Exception):
     """Base exception for fetcher errors."""
     pass
@@ -24,6 +53,30 @@ class DataSourceError(FetcherError):
     """Data source unavailable."""
     pass
 
+class FetchTimeoutError(FetcherError):
+    """Fetcher did not finish before the deadline."""
+    pass
+
+class _DownloadMetrics:
+    """Bytes read and truncated responses of one fetch, updated from any thread."""
+    
+    def __init__(self):
+        self.bytes_read = 0
+        self.responses = 0
+        self.truncated = 0
+        self._lock = threading.Lock()
+    
+    def record(self, size: int, truncated: bool) -> None:
+        with self._lock:
+            self.bytes_read += size
+            self.responses += 1
+            self.truncated += int(truncated)
+    
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {'bytes_read': self.bytes_read, 'responses': self.responses,
+                    'truncated': self.truncated}
+
 class BaseFetcher(ABC):
     """
     Abstract base class for all fetchers.
@@ -32,6 +85,22 @@ class BaseFetcher(ABC):
     metadata from various data sources.
     """
     
+    # Bump when a fetcher's parsing logic changes to invalidate its cache entries
+    cache_version = "1"
+    
+    # Request headers that can change an API response and so belong in cache keys
+    cache_key_headers = ('accept', 'accept-language')
+    
+    # Seconds fetched results are cached (None uses FetcherConfig.cache_ttl, 0 disables)
+    result_cache_ttl: Optional[int] = None
+    
+    # Answers from local data only, so it still runs in offline mode
+    works_offline = False
+    
+    # Seconds an expired cached result may still be served while it is
+    # refreshed (see FetcherConfig.stale_while_revalidate)
+    max_staleness = 86400
+    
     def __init__(self, config: Optional[FetcherConfig] = None):
         """
         Initialize the fetcher.
@@ -43,10 +112,7 @@ class BaseFetcher(ABC):
         self.name = self.__class__.__name__
         self.start_time = None
         self.end_time = None
-        self.cache_manager = CacheManager(
-            cache_directory=self.config.cache_directory,
-            default_ttl=self.config.cache_ttl
-        )
+        self.cache_manager = self.config.get_cache_manager()
     
     @abstractmethod
     def can_fetch(self, tool_name: str) -> bool:
@@ -74,12 +140,19 @@ class BaseFetcher(ABC):
         """
         pass
     
-    def fetch_with_timing(self, tool_name: str) -> Optional[UnifiedMetadata]:
+    def fetch_with_timing(self, tool_name: str, use_cache: bool = True) -> Optional[UnifiedMetadata]:
         """
         Fetch metadata with timing information.
         
+        Results are served from and stored in the metadata cache, so
+        fetch() implementations only deal with the data source. Misses are
+        fetched under the key's cache lock: a worker (thread or process)
+        that finds another one fetching the same tool waits for its result.
+        
         Args:
             tool_name: Name of the tool to fetch metadata for
+            use_cache: Read cached results; False forces a refresh (the
+                fresh result is still cached)
             
         Returns:
             UnifiedMetadata object with timing information
@@ -87,7 +160,28 @@ class BaseFetcher(ABC):
         self.start_time = time.time()
         
         try:
-            metadata = self.fetch(tool_name)
+            metadata = self._get_cached_metadata(tool_name) if use_cache else None
+            if metadata:
+                logger.info(f"{self.name}: using cached metadata for {tool_name}")
+            else:
+                lock = self._acquire_fetch_lock(tool_name)
+                try:
+                    # Another worker may have fetched it while we waited
+                    metadata = self._get_cached_metadata(tool_name) if use_cache and lock else None
+                    if not metadata:
+                        downloads = _DownloadMetrics()
+                        token = _skip_cache_reads.set(not use_cache)
+                        metrics_token = _download_metrics.set(downloads)
+                        try:
+                            metadata = self.fetch(tool_name)
+                        finally:
+                            _download_metrics.reset(metrics_token)
+                            _skip_cache_reads.reset(token)
+                        if metadata:
+                            self._cache_metadata(tool_name, metadata)
+                            metadata.raw_data['downloads'] = downloads.as_dict()
+                finally:
+                    self._release_fetch_lock(lock)
             
             if metadata:
                 self.end_time = time.time()
@@ -107,6 +201,75 @@ class BaseFetcher(ABC):
                         f"after {duration:.2f}s: {e}")
             raise
     
+    async def afetch(self, tool_name: str) -> Optional[UnifiedMetadata]:
+        """
+        Fetch metadata for a tool without blocking the event loop.
+        
+        The default implementation adapts the synchronous fetch() by running
+        it on the config's async executor (config.async_workers threads).
+        Fetchers with a native async client should override this.
+        
+        Args:
+            tool_name: Name of the tool to fetch metadata for
+            
+        Returns:
+            UnifiedMetadata object or None if not found
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.config.get_async_executor(), context.run,
+                                          self.fetch, tool_name)
+    
+    async def afetch_with_timing(self, tool_name: str, use_cache: bool = True) -> Optional[UnifiedMetadata]:
+        """
+        Async counterpart of fetch_with_timing().
+        
+        Args:
+            tool_name: Name of the tool to fetch metadata for
+            use_cache: Read cached results; False forces a refresh
+            
+        Returns:
+            UnifiedMetadata object with timing information
+        """
+        start_time = time.time()
+        
+        try:
+            metadata = self._get_cached_metadata(tool_name) if use_cache else None
+            if metadata:
+                logger.info(f"{self.name}: using cached metadata for {tool_name}")
+            else:
+                lock = await self._aacquire_fetch_lock(tool_name)
+                try:
+                    metadata = self._get_cached_metadata(tool_name) if use_cache and lock else None
+                    if not metadata:
+                        downloads = _DownloadMetrics()
+                        token = _skip_cache_reads.set(not use_cache)
+                        metrics_token = _download_metrics.set(downloads)
+                        try:
+                            metadata = await self.afetch(tool_name)
+                        finally:
+                            _download_metrics.reset(metrics_token)
+                            _skip_cache_reads.reset(token)
+                        if metadata:
+                            self._cache_metadata(tool_name, metadata)
+                            metadata.raw_data['downloads'] = downloads.as_dict()
+                finally:
+                    self._release_fetch_lock(lock)
+        except Exception as e:
+            duration = time.time() - start_time
+            logger.error(f"{self.name} failed to fetch {tool_name} "
+                        f"after {duration:.2f}s: {e}")
+            raise
+        
+        if metadata:
+            metadata.fetch_duration = time.time() - start_time
+            metadata.sources.append(self.name.lower())
+            
+            logger.info(f"{self.name} fetched metadata for {tool_name} "
+                      f"in {metadata.fetch_duration:.2f}s")
+        
+        return metadata
+    
     def validate_metadata(self, metadata: UnifiedMetadata) -> bool:
         """
         Validate that the fetched metadata is complete and correct.
@@ -188,45 +351,338 @@ class BaseFetcher(ABC):
         """
         return [ToolCategory.GENERIC]  # Default to generic
     
+    def get_hosts(self) -> List[str]:
+        """
+        Get the API hosts this fetcher always contacts.
+        
+        Used by the registry to cap concurrent fetches per host. Fetchers
+        that only visit arbitrary sites return an empty list.
+        
+        Returns:
+            List of hostnames
+        """
+        return []
+    
+    @property
+    def transport(self) -> HttpTransport:
+        """Pooled HTTP transport shared by all fetchers using this config."""
+        return self.config.get_transport()
+    
+    def _wait_for_rate_limit(self, url: str) -> None:
+        """
+        Block until a request to the URL's host is within its rate budget.
+        
+        Requests sent through self.transport are rate limited automatically;
+        this is only needed for clients that bypass the transport.
+        """
+        self.config.get_rate_limiter().acquire(url)
+    
     def __str__(self) -> str:
         return f"{self.name}(priority={self.get_priority()})"
     
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(config={self.config})" 
 
-    def _get_cached_response(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+    def get_cache_namespace(self, cache_type: str) -> str:
+        """
+        Get the cache key namespace for this fetcher.
+        
+        Entries for all tools share the namespace, so they can be dropped
+        together with CacheManager.delete_prefix().
+        
+        Args:
+            cache_type: Type of cache (api, metadata)
+            
+        Returns:
+            Namespace string including the fetcher's cache_version
+        """
+        return f"{self.name}@{self.cache_version}/{cache_type}"
+    
+    def get_result_cache_ttl(self) -> int:
+        """Get how long this fetcher's results are cached (0 disables caching)."""
+        ttl = self.config.fetcher_cache_ttls.get(self.name, self.result_cache_ttl)
+        return self.config.cache_ttl if ttl is None else ttl
+    
+    def get_response_byte_limit(self) -> int:
+        """Get the most bytes this fetcher reads from one response."""
+        return self.config.response_byte_limits.get(self.name, self.config.max_response_bytes)
+    
+    def read_response(self, response: Any, stop_at: Sequence[bytes] = (),
+                      max_bytes: Optional[int] = None, budget: Optional[ByteBudget] = None) -> str:
+        """
+        Read a response body as text without loading more than needed.
+        
+        Request the response with stream=True so the cap also bounds what
+        is downloaded. Bytes read and truncations are added to the fetch's
+        download metrics (raw_data['downloads']).
+        
+        Args:
+            response: Response to read
+            stop_at: Markers after which the rest of the page is not needed
+                (see HttpTransport.read_body)
+            max_bytes: Byte cap (defaults to get_response_byte_limit())
+            budget: Shared allowance the bytes are also taken from
+            
+        Returns:
+            The decoded text, possibly truncated
+        """
+        body, truncated = self._read_body(response, max_bytes, stop_at, budget)
+        if truncated:
+            logger.debug(f"{self.name}: response from {response.url} truncated at {len(body)} bytes")
+        return body.decode(response.encoding or 'utf-8', errors='replace')
+    
+    def read_json(self, response: Any, max_bytes: Optional[int] = None) -> Any:
+        """
+        Read and parse a JSON response under the byte cap.
+        
+        Raises:
+            DataSourceError: If the document is larger than the cap
+        """
+        body, truncated = self._read_body(response, max_bytes)
+        if truncated:
+            raise DataSourceError(f"JSON response from {response.url} exceeds {len(body)} bytes")
+        return json.loads(body)
+    
+    def iter_response(self, response: Any, max_bytes: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Yield a response body chunk by chunk under the byte cap.
+        
+        For incremental parsers that may stop early: closing the generator
+        (or letting it go) closes the response and adds the bytes actually
+        read to the fetch's download metrics.
+        
+        Args:
+            response: Response requested with stream=True
+            max_bytes: Byte cap (defaults to get_response_byte_limit())
+            
+        Raises:
+            DataSourceError: If the body is larger than the cap
+        """
+        limit = self.get_response_byte_limit() if max_bytes is None else max_bytes
+        size = 0
+        truncated = False
+        try:
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                if size + len(chunk) > limit:
+                    truncated = True
+                    raise DataSourceError(f"Response from {response.url} exceeds {limit} bytes")
+                size += len(chunk)
+                yield chunk
+        finally:
+            response.close()
+            downloads = _download_metrics.get()
+            if downloads is not None:
+                downloads.record(size, truncated)
+    
+    def _read_body(self, response: Any, max_bytes: Optional[int], stop_at: Sequence[bytes] = (),
+                   budget: Optional[ByteBudget] = None) -> Tuple[bytes, bool]:
+        """Read a response body under the byte cap, recording it in the download metrics."""
+        limit = self.get_response_byte_limit() if max_bytes is None else max_bytes
+        body, truncated = HttpTransport.read_body(response, limit, stop_at, budget)
+        downloads = _download_metrics.get()
+        if downloads is not None:
+            downloads.record(len(body), truncated)
+        return body, truncated
+    
+    def get_max_staleness(self) -> int:
+        """Get how long past expiry this fetcher's cached results may be served."""
+        return self.config.fetcher_max_staleness.get(self.name, self.max_staleness)
+    
+    def refresh(self, tool_name: str) -> Optional[UnifiedMetadata]:
+        """
+        Fetch metadata without reading cached results, updating the cache.
+        
+        Args:
+            tool_name: Name of the tool to refresh
+            
+        Returns:
+            Fresh UnifiedMetadata object or None if not found
+        """
+        return self.fetch_with_timing(tool_name, use_cache=False)
+    
+    def get_cache_fingerprint(self) -> Dict[str, Any]:
+        """
+        Get configuration inputs that change this fetcher's results.
+        
+        Included in every cache key, so entries written under a different
+        configuration are not reused.
+        
+        Returns:
+            JSON-serializable dictionary (empty by default)
+        """
+        return {}
+    
+    def _response_cache_key(self, url: str, params: Optional[Dict[str, Any]] = None,
+                            headers: Optional[Dict[str, str]] = None) -> str:
+        """Build the deterministic cache key for an API response."""
+        relevant_headers = {
+            name.lower(): value for name, value in (headers or {}).items()
+            if name.lower() in self.cache_key_headers
+        }
+        return make_cache_key(
+            self.get_cache_namespace("api"),
+            url=url,
+            params=params or {},
+            headers=relevant_headers,
+            config=self.get_cache_fingerprint()
+        )
+    
+    def _metadata_cache_key(self, tool_name: str) -> str:
+        """Build the deterministic cache key for a tool's metadata."""
+        return make_cache_key(
+            self.get_cache_namespace("metadata"),
+            tool=tool_name.strip().lower(),
+            config=self.get_cache_fingerprint()
+        )
+    
+    def _cache_reads_skipped(self) -> bool:
+        """Check whether the current fetch is a forced refresh that must not read cached data."""
+        return _skip_cache_reads.get()
+    
+    def _negative_cache_ttl(self) -> int:
+        """Get how long this fetcher remembers misses."""
+        return self.config.negative_cache_ttls.get(self.name, self.config.negative_cache_ttl)
+    
+    def _negative_cache_key(self, **parts: Any) -> str:
+        """Build the deterministic cache key for a remembered miss."""
+        return make_cache_key(
+            self.get_cache_namespace("negative"),
+            config=self.get_cache_fingerprint(),
+            **parts
+        )
+    
+    def _is_cached_miss(self, **parts: Any) -> bool:
+        """
+        Check whether a lookup is a remembered miss.
+        
+        Args:
+            **parts: Values identifying the lookup, e.g. tool= or url=
+            
+        Returns:
+            True if the lookup failed recently and should not be retried
+        """
+        if (not self.config.enable_caching or self._negative_cache_ttl() <= 0
+                or self._cache_reads_skipped()):
+            return False
+        
+        return self.cache_manager.get(self._negative_cache_key(**parts), "negative") is not None
+    
+    def _cache_miss(self, reason: str, **parts: Any) -> None:
+        """
+        Remember a miss for the fetcher's negative cache TTL.
+        
+        Args:
+            reason: Short description of the miss, kept for debugging
+            **parts: Values identifying the lookup, e.g. tool= or url=
+        """
+        ttl = self._negative_cache_ttl()
+        if not self.config.enable_caching or ttl <= 0:
+            return
+        
+        self.cache_manager.set(self._negative_cache_key(**parts), {'reason': reason},
+                               "negative", ttl=ttl)
+    
+    def purge_cached_misses(self) -> int:
+        """
+        Forget all misses remembered by this fetcher.
+        
+        Returns:
+            Number of entries deleted
+        """
+        prefix = f"v{CACHE_KEY_VERSION}/{self.get_cache_namespace('negative')}/"
+        return self.cache_manager.delete_prefix(prefix, "negative")
+    
+    def _get_cached_response(self, url: str, params: Optional[Dict[str, Any]] = None,
+                             headers: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
         """Get cached API response."""
         if not self.config.enable_caching:
             return None
         
-        cache_key = f"{self.name}_{url}_{hash(str(headers))}"
+        cache_key = self._response_cache_key(url, params, headers)
         return self.cache_manager.get(cache_key, "api")
     
-    def _cache_response(self, url: str, response_data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+    def _cache_response(self, url: str, response_data: Dict[str, Any],
+                        params: Optional[Dict[str, Any]] = None,
+                        headers: Optional[Dict[str, str]] = None) -> None:
         """Cache API response."""
         if not self.config.enable_caching:
             return
         
-        cache_key = f"{self.name}_{url}_{hash(str(headers))}"
+        cache_key = self._response_cache_key(url, params, headers)
         self.cache_manager.set(cache_key, response_data, "api")
     
     def _get_cached_metadata(self, tool_name: str) -> Optional[UnifiedMetadata]:
-        """Get cached metadata."""
-        if not self.config.enable_caching:
+        """
+        Get cached metadata.
+        
+        With stale_while_revalidate enabled, metadata up to
+        get_max_staleness() seconds past expiry is returned with
+        raw_data['cache_stale'] set, so the registry can refresh it.
+        """
+        if (not self.config.enable_caching or self.get_result_cache_ttl() <= 0
+                or self._cache_reads_skipped()):
             return None
         
-        cache_key = f"{self.name}_{tool_name}"
-        cached_data = self.cache_manager.get(cache_key, "metadata")
+        max_stale = self.get_max_staleness() if self.config.stale_while_revalidate else 0
+        cache_key = self._metadata_cache_key(tool_name)
+        cached_data, stale = self.cache_manager.get_stale(cache_key, "metadata", max_stale)
         
         if cached_data:
-            return UnifiedMetadata.from_dict(cached_data)
+            metadata = UnifiedMetadata.from_dict(cached_data)
+            if stale:
+                metadata.raw_data['cache_stale'] = True
+            return metadata
         
         return None
     
+    def _acquire_fetch_lock(self, tool_name: str) -> Optional[Any]:
+        """
+        Lock a tool's metadata cache key before fetching it.
+        
+        Returns:
+            Lock handle, or None if results are not cached or the wait
+            timed out (the caller then fetches without the lock)
+        """
+        if not self.config.enable_caching or self.get_result_cache_ttl() <= 0:
+            return None
+        
+        timeout = self.config.cache_lock_timeout
+        lock = self.cache_manager.locks.acquire(self._metadata_cache_key(tool_name), timeout)
+        if lock is None:
+            logger.warning(f"{self.name}: gave up waiting {timeout:.0f}s for another "
+                           f"fetch of {tool_name}, fetching it again")
+        return lock
+    
+    async def _aacquire_fetch_lock(self, tool_name: str) -> Optional[Any]:
+        """
+        Wait for a tool's cache lock off the event loop.
+        
+        If the caller is cancelled while waiting, the executor thread still
+        ends up holding the lock; it is released as soon as it arrives
+        instead of blocking later fetches of the tool until they time out.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(None, self._acquire_fetch_lock, tool_name)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            def release_late(done: asyncio.Future) -> None:
+                if not done.cancelled() and done.exception() is None:
+                    self._release_fetch_lock(done.result())
+            
+            future.add_done_callback(release_late)
+            raise
+    
+    def _release_fetch_lock(self, lock: Optional[Any]) -> None:
+        if lock is not None:
+            self.cache_manager.locks.release(lock)
+    
     def _cache_metadata(self, tool_name: str, metadata: UnifiedMetadata) -> None:
         """Cache metadata."""
-        if not self.config.enable_caching:
+        ttl = self.get_result_cache_ttl()
+        if not self.config.enable_caching or ttl <= 0:
             return
         
-        cache_key = f"{self.name}_{tool_name}"
-        self.cache_manager.set(cache_key, metadata.to_dict(), "metadata") 
\ No newline at end of file
+        cache_key = self._metadata_cache_key(tool_name)
+        self.cache_manager.set(cache_key, metadata_cache_entry(metadata), "metadata", ttl=ttl,
+                               stale_ttl=self.get_max_staleness())
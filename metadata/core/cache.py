@@ -4,36 +4,357 @@ Provides caching for API responses, metadata results, and configuration.
 """
 
 import json
-import os
 import hashlib
+import os
+import threading
 import time
-from typing import Any, Optional, Dict, Union
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Optional, Dict, Iterable, Iterator, List, Tuple, Union
 from pathlib import Path
+from .cache_backends import (EVICTION_ORDER, CacheBackend, FileCacheBackend, SQLiteCacheBackend,
+                             SnapshotCacheBackend, write_snapshot)
 import logging
 
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Bump to invalidate every cache entry written with an older key scheme
+CACHE_KEY_VERSION = 1
+
+# Cache types exported to snapshot bundles by default
+SNAPSHOT_CACHE_TYPES = ("api", "metadata")
+
+class CacheMissError(LookupError):
+    """Raised in offline (snapshot) mode when a lookup is not in the cache."""
+    pass
+
+def make_cache_key(namespace: str, **parts: Any) -> str:
+    """
+    Build a deterministic, content-addressed cache key.
+    
+    The parts are serialized canonically (sorted keys, no whitespace) and
+    hashed with SHA-256, so the same inputs give the same key in every
+    process. The readable namespace prefix lets related entries be
+    invalidated together with CacheManager.delete_prefix().
+    
+    Args:
+        namespace: Key prefix, e.g. "PyPIFetcher@1/metadata"
+        **parts: Values that determine the cached result
+        
+    Returns:
+        Cache key of the form "v<scheme>/<namespace>/<sha256>"
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'),
+                         ensure_ascii=False, default=str)
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    return f"v{CACHE_KEY_VERSION}/{namespace}/{digest}"
+
+class MemoryCache:
+    """
+    In-process LRU tier kept in front of the disk cache.
+    
+    Entries are stored as compact JSON so every hit returns a private copy
+    that callers can mutate freely. The tier is bounded by entry count and
+    by total payload bytes; the least recently used entries are evicted.
+    """
+    
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the memory cache.
+        
+        Args:
+            max_entries: Maximum number of entries held
+            max_bytes: Maximum total size of held payloads in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+    
+    def get(self, cache_type: str, key: str) -> Tuple[bool, Any]:
+        """
+        Look up an entry.
+        
+        Returns:
+            (hit, data) tuple; data is None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get((cache_type, key))
+            if entry is None:
+                self.misses += 1
+                return False, None
+            
+            payload, expires_at = entry
+            if time.time() > expires_at:
+                self._remove((cache_type, key))
+                self.misses += 1
+                return False, None
+            
+            self._entries.move_to_end((cache_type, key))
+            self.hits += 1
+        
+        return True, json.loads(payload)
+    
+    def set(self, cache_type: str, key: str, data: Any, expires_at: float) -> None:
+        """Store an entry that expires at the given epoch time."""
+        if not self.enabled:
+            return
+        
+        payload = json.dumps(data, separators=(',', ':'))
+        if len(payload) > self.max_bytes:
+            self.delete(cache_type, key)
+            return
+        
+        with self._lock:
+            self._remove((cache_type, key))
+            self._entries[(cache_type, key)] = (payload, expires_at)
+            self._bytes += len(payload)
+            
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+    
+    def delete(self, cache_type: str, key: str) -> None:
+        """Drop an entry if present."""
+        with self._lock:
+            self._remove((cache_type, key))
+    
+    def clear(self, cache_type: Optional[str] = None, prefix: str = "") -> None:
+        """Drop entries of a cache type (None for all) whose key starts with prefix."""
+        with self._lock:
+            for entry_id in list(self._entries):
+                if (cache_type is None or entry_id[0] == cache_type) and entry_id[1].startswith(prefix):
+                    self._remove(entry_id)
+    
+    def _remove(self, entry_id: Tuple[str, str]) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get memory cache statistics.
+        
+        Returns:
+            Dictionary with size, limits and hit/miss counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+class KeyLocks:
+    """
+    Advisory per-key locks shared by threads and processes.
+    
+    Holding a key's lock marks it as being fetched, so other workers wait
+    for that result instead of fetching it again. Threads of one process
+    queue on an in-process lock; processes sharing the cache directory
+    queue on an flock() of the key's lock file under <directory>. Lock
+    files are empty and deleted on release, so <directory> only holds the
+    keys being fetched; a process that locked a file after it was deleted
+    notices the path now names another file and locks that one instead.
+    Without fcntl (Windows) only threads of one process are coordinated.
+    """
+    
+    def __init__(self, directory: Union[str, Path], poll_interval: float = 0.05):
+        """
+        Initialize the locks.
+        
+        Args:
+            directory: Directory holding the lock files
+            poll_interval: Seconds between attempts on a contended lock file
+        """
+        self.directory = Path(directory)
+        self.poll_interval = poll_interval
+        self._thread_locks: Dict[str, List[Any]] = {}  # name -> [lock, users]
+        self._guard = threading.Lock()
+    
+    def acquire(self, key: str, timeout: Optional[float] = None) -> Optional[Tuple[str, Any]]:
+        """
+        Acquire a key's lock.
+        
+        Args:
+            key: Cache key to lock
+            timeout: Seconds to wait (None waits indefinitely)
+            
+        Returns:
+            Handle to pass to release(), or None if the wait timed out
+        """
+        name = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        with self._guard:
+            holder = self._thread_locks.setdefault(name, [threading.Lock(), 0])
+            holder[1] += 1
+        
+        if not holder[0].acquire(timeout=-1 if timeout is None else timeout):
+            self._forget(name)
+            return None
+        
+        lock_file = None
+        if FCNTL_AVAILABLE:
+            lock_file = self._lock_file(name, deadline)
+            if lock_file is None:
+                holder[0].release()
+                self._forget(name)
+                return None
+        
+        return name, lock_file
+    
+    def release(self, handle: Tuple[str, Any]) -> None:
+        """Release a lock returned by acquire()."""
+        name, lock_file = handle
+        if lock_file is not None:
+            # Delete while still locked, so no other process can hold it
+            try:
+                os.unlink(self.directory / f"{name}.lock")
+            except FileNotFoundError:
+                pass
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+        self._thread_locks[name][0].release()
+        self._forget(name)
+    
+    @contextmanager
+    def hold(self, key: str, timeout: Optional[float] = None) -> Iterator[bool]:
+        """
+        Hold a key's lock for the duration of a with block.
+        
+        Yields:
+            True if the lock was acquired, False if the wait timed out
+        """
+        handle = self.acquire(key, timeout)
+        try:
+            yield handle is not None
+        finally:
+            if handle is not None:
+                self.release(handle)
+    
+    def _lock_file(self, name: str, deadline: Optional[float]) -> Optional[Any]:
+        """Take the flock() on a key's lock file, or return None at the deadline."""
+        path = self.directory / f"{name}.lock"
+        while True:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            lock_file = open(path, 'a+b')
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        lock_file.close()
+                        return None
+                    time.sleep(self.poll_interval)
+            
+            # The holder we waited for deleted the file on release
+            try:
+                current = os.stat(path).st_ino == os.fstat(lock_file.fileno()).st_ino
+            except FileNotFoundError:
+                current = False
+            if current:
+                return lock_file
+            lock_file.close()
+    
+    def _forget(self, name: str) -> None:
+        """Drop a key's in-process lock once nobody is using it."""
+        with self._guard:
+            holder = self._thread_locks[name]
+            holder[1] -= 1
+            if holder[1] == 0:
+                del self._thread_locks[name]
+
 class CacheManager:
     """
     Manages caching for the MetadataFetcher system.
+    
+    Cache types are "api" (HTTP responses), "metadata" (fetcher results),
+    "config" and "negative" (short-lived records of misses).
+    
+    Lookups go through an in-memory LRU tier first and fall back to a
+    storage backend: JSON files on disk by default, or a SQLite database
+    for large caches shared by several worker processes.
     """
     
-    def __init__(self, cache_directory: str = "cache", default_ttl: int = 86400):
+    def __init__(self, cache_directory: str = "cache", default_ttl: int = 86400,
+                 memory_max_entries: int = 1024,
+                 memory_max_bytes: int = 64 * 1024 * 1024,
+                 backend: Union[str, CacheBackend] = "file",
+                 pretty: bool = False, compression: str = "zlib",
+                 compress_threshold: int = 4096,
+                 quotas: Optional[Dict[str, Dict[str, int]]] = None,
+                 eviction: str = "lru"):
         """
         Initialize the cache manager.
         
         Args:
             cache_directory: Directory to store cache files
             default_ttl: Default time-to-live in seconds (24 hours)
+            memory_max_entries: Entries kept in the in-memory tier (0 disables it)
+            memory_max_bytes: Byte budget of the in-memory tier
+            backend: Storage backend instance, or "file" / "sqlite"
+                (a SnapshotCacheBackend instance mounts a bundle read-only)
+            pretty: Store indented JSON instead of compact JSON
+            compression: Codec for large entries: "zlib", "zstd" or "none"
+            compress_threshold: Entries at least this many bytes are compressed
+            quotas: Per cache type limits, e.g. {"api": {"max_bytes": 2**30,
+                "max_entries": 100000}}; types without a quota are unbounded
+            eviction: Which entries to drop when over quota: "lru" (least
+                recently read) or "lfu" (least often read)
         """
         self.cache_directory = Path(cache_directory)
         self.default_ttl = default_ttl
-        self.cache_directory.mkdir(exist_ok=True)
-        
-        # Create subdirectories
-        (self.cache_directory / "api").mkdir(exist_ok=True)
-        (self.cache_directory / "metadata").mkdir(exist_ok=True)
-        (self.cache_directory / "config").mkdir(exist_ok=True)
+        self.memory = MemoryCache(memory_max_entries, memory_max_bytes)
+        self._encoding_options = {
+            'pretty': pretty,
+            'compression': compression,
+            'compress_threshold': compress_threshold
+        }
+        self.backend = self._create_backend(backend)
+        if eviction not in EVICTION_ORDER:
+            raise ValueError(f"Unknown cache eviction policy: {eviction}")
+        self.quotas = quotas or {}
+        self.eviction = eviction
+        self.evictions = 0
+        self.locks = KeyLocks(self.cache_directory / "locks")
+        self._cleanup_thread: Optional[threading.Thread] = None
+        self._cleanup_stop = threading.Event()
+    
+    def _create_backend(self, backend: Union[str, CacheBackend]) -> CacheBackend:
+        """Resolve a backend name to a backend instance."""
+        if isinstance(backend, CacheBackend):
+            return backend
+        if backend == "file":
+            return FileCacheBackend(str(self.cache_directory), self.default_ttl,
+                                    **self._encoding_options)
+        if backend == "sqlite":
+            self.cache_directory.mkdir(parents=True, exist_ok=True)
+            return SQLiteCacheBackend(str(self.cache_directory / "cache.sqlite3"), self.default_ttl,
+                                      **self._encoding_options)
+        raise ValueError(f"Unknown cache backend: {backend}")
     
     def _get_cache_key(self, key: str, prefix: str = "") -> str:
         """Generate a cache key with optional prefix."""
@@ -41,11 +362,9 @@ class CacheManager:
             return f"{prefix}_{key}"
         return key
     
-    def _get_cache_path(self, key: str, cache_type: str = "api") -> Path:
-        """Get the file path for a cache entry."""
-        # Create a hash of the key to avoid filesystem issues
-        key_hash = hashlib.md5(key.encode()).hexdigest()
-        return self.cache_directory / cache_type / f"{key_hash}.json"
+    def _expires_at(self, cache_data: Dict[str, Any]) -> float:
+        """Get the epoch time at which cache data expires."""
+        return cache_data['timestamp'] + cache_data.get('ttl', self.default_ttl)
     
     def _is_expired(self, cache_data: Dict[str, Any]) -> bool:
         """Check if cache data is expired."""
@@ -56,6 +375,24 @@ class CacheManager:
         age = time.time() - cache_data['timestamp']
         return age > ttl
     
+    def _is_retained(self, cache_data: Dict[str, Any]) -> bool:
+        """Check if expired cache data is still within its stale window."""
+        if 'timestamp' not in cache_data:
+            return False
+        return time.time() <= self._expires_at(cache_data) + cache_data.get('stale_ttl', 0)
+    
+    def _make_entry(self, key: str, data: Any, ttl: Optional[int],
+                    stale_ttl: int = 0) -> Dict[str, Any]:
+        entry = {
+            'data': data,
+            'timestamp': time.time(),
+            'ttl': ttl or self.default_ttl,
+            'key': key
+        }
+        if stale_ttl > 0:
+            entry['stale_ttl'] = stale_ttl
+        return entry
+    
     def get(self, key: str, cache_type: str = "api") -> Optional[Any]:
         """
         Get cached data.
@@ -67,28 +404,106 @@ class CacheManager:
         Returns:
             Cached data or None if not found/expired
         """
-        cache_path = self._get_cache_path(key, cache_type)
-        
-        if not cache_path.exists():
-            return None
+        return self.get_stale(key, cache_type)[0]
+    
+    def get_stale(self, key: str, cache_type: str = "api",
+                  max_stale: float = 0) -> Tuple[Optional[Any], bool]:
+        """
+        Get cached data, accepting data that expired recently.
         
-        try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+        Args:
+            key: Cache key
+            cache_type: Type of cache (api, metadata, config)
+            max_stale: Seconds past expiry that data is still returned;
+                only entries stored with a stale_ttl are kept that long
             
-            if self._is_expired(cache_data):
+        Returns:
+            (data, stale) tuple; data is None if not found or too old
+        """
+        hit, data = self.memory.get(cache_type, key)
+        if hit:
+            logger.debug(f"Memory cache hit for key: {key}")
+            self.backend.touch(cache_type, key)
+            return data, False
+        
+        cache_data = self.backend.read(cache_type, key)
+        if cache_data is None:
+            return None, False
+        
+        if self._is_expired(cache_data):
+            if not self._is_retained(cache_data):
                 logger.debug(f"Cache expired for key: {key}")
-                cache_path.unlink()  # Remove expired cache
-                return None
+                self.backend.delete(cache_type, key)  # Remove expired cache
+                return None, False
+            
+            if time.time() - self._expires_at(cache_data) > max_stale:
+                return None, False
             
-            logger.debug(f"Cache hit for key: {key}")
-            return cache_data.get('data')
+            logger.debug(f"Stale cache hit for key: {key}")
+            self.backend.touch(cache_type, key)
+            return cache_data.get('data'), True
+        
+        logger.debug(f"Cache hit for key: {key}")
+        self.backend.touch(cache_type, key)
+        data = cache_data.get('data')
+        self.memory.set(cache_type, key, data, self._expires_at(cache_data))
+        return data, False
+    
+    def time_to_expiry(self, key: str, cache_type: str = "api") -> Optional[float]:
+        """
+        Get how long cached data stays fresh, without counting it as a read.
+        
+        Args:
+            key: Cache key
+            cache_type: Type of cache (api, metadata, config)
             
-        except (json.JSONDecodeError, IOError) as e:
-            logger.warning(f"Error reading cache for key {key}: {e}")
+        Returns:
+            Seconds until expiry (negative once expired), or None if not cached
+        """
+        cache_data = self.backend.read(cache_type, key)
+        if cache_data is None or 'timestamp' not in cache_data:
             return None
+        return self._expires_at(cache_data) - time.time()
     
-    def set(self, key: str, data: Any, cache_type: str = "api", ttl: Optional[int] = None) -> None:
+    def get_many(self, keys: Iterable[str], cache_type: str = "api") -> Dict[str, Any]:
+        """
+        Get several cached entries in one backend round trip.
+        
+        Args:
+            keys: Cache keys
+            cache_type: Type of cache (api, metadata, config)
+            
+        Returns:
+            Mapping of key to data for the keys that were found and fresh
+        """
+        results = {}
+        missing = []
+        for key in keys:
+            hit, data = self.memory.get(cache_type, key)
+            if hit:
+                self.backend.touch(cache_type, key)
+                results[key] = data
+            else:
+                missing.append(key)
+        
+        if not missing:
+            return results
+        
+        for key, cache_data in self.backend.read_many(cache_type, missing).items():
+            if self._is_expired(cache_data):
+                if not self._is_retained(cache_data):
+                    self.backend.delete(cache_type, key)
+                continue
+            
+            data = cache_data.get('data')
+            self.backend.touch(cache_type, key)
+            self.memory.set(cache_type, key, data, self._expires_at(cache_data))
+            results[key] = data
+        
+        return results
+    
+    def set(self, key: str, data: Any, cache_type: str = "api", ttl: Optional[int] = None,
+            stale_ttl: int = 0) -> None:
         """
         Set cached data.
         
@@ -97,25 +512,55 @@ class CacheManager:
             data: Data to cache
             cache_type: Type of cache (api, metadata, config)
             ttl: Time-to-live in seconds (uses default if None)
+            stale_ttl: Seconds the data is kept after expiry for get_stale()
         """
-        cache_path = self._get_cache_path(key, cache_type)
-        
-        cache_data = {
-            'data': data,
-            'timestamp': time.time(),
-            'ttl': ttl or self.default_ttl,
-            'key': key
-        }
+        cache_data = self._make_entry(key, data, ttl, stale_ttl)
         
         try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
-            
+            self.backend.write(cache_type, key, cache_data)
+            self.memory.set(cache_type, key, data, self._expires_at(cache_data))
             logger.debug(f"Cached data for key: {key}")
+            self._enforce_quota(cache_type)
             
         except IOError as e:
             logger.warning(f"Error writing cache for key {key}: {e}")
     
+    def set_many(self, items: Dict[str, Any], cache_type: str = "api", ttl: Optional[int] = None) -> None:
+        """
+        Set several cached entries in one backend transaction.
+        
+        Args:
+            items: Mapping of cache key to data
+            cache_type: Type of cache (api, metadata, config)
+            ttl: Time-to-live in seconds (uses default if None)
+        """
+        entries = {key: self._make_entry(key, data, ttl) for key, data in items.items()}
+        
+        try:
+            self.backend.write_many(cache_type, entries)
+            for key, cache_data in entries.items():
+                self.memory.set(cache_type, key, cache_data['data'], self._expires_at(cache_data))
+            logger.debug(f"Cached {len(entries)} entries")
+            self._enforce_quota(cache_type)
+            
+        except IOError as e:
+            logger.warning(f"Error writing cache batch: {e}")
+    
+    def _enforce_quota(self, cache_type: str) -> None:
+        """Evict entries of a cache type that has grown past its quota."""
+        quota = self.quotas.get(cache_type)
+        if not quota:
+            return
+        
+        evicted = self.backend.evict(cache_type, quota.get('max_entries'),
+                                     quota.get('max_bytes'), self.eviction)
+        for key in evicted:
+            self.memory.delete(cache_type, key)
+        
+        if evicted:
+            self.evictions += len(evicted)
+            logger.debug(f"Evicted {len(evicted)} {cache_type} cache entries ({self.eviction})")
+    
     def delete(self, key: str, cache_type: str = "api") -> bool:
         """
         Delete cached data.
@@ -127,15 +572,31 @@ class CacheManager:
         Returns:
             True if deleted, False if not found
         """
-        cache_path = self._get_cache_path(key, cache_type)
+        self.memory.delete(cache_type, key)
         
-        if cache_path.exists():
-            cache_path.unlink()
+        if self.backend.delete(cache_type, key):
             logger.debug(f"Deleted cache for key: {key}")
             return True
         
         return False
     
+    def delete_prefix(self, prefix: str, cache_type: Optional[str] = None) -> int:
+        """
+        Delete every cache entry whose key starts with a prefix.
+        
+        Args:
+            prefix: Key prefix, e.g. a make_cache_key() namespace
+            cache_type: Type of cache to search (None for all)
+            
+        Returns:
+            Number of entries deleted
+        """
+        self.memory.clear(cache_type, prefix)
+        deleted_count = self.backend.delete_prefix(prefix, cache_type)
+        
+        logger.info(f"Deleted {deleted_count} cache entries with prefix {prefix}")
+        return deleted_count
+    
     def clear(self, cache_type: Optional[str] = None) -> int:
         """
         Clear cache entries.
@@ -146,55 +607,128 @@ class CacheManager:
         Returns:
             Number of entries cleared
         """
-        cleared_count = 0
-        
-        if cache_type:
-            cache_dir = self.cache_directory / cache_type
-            if cache_dir.exists():
-                for cache_file in cache_dir.glob("*.json"):
-                    cache_file.unlink()
-                    cleared_count += 1
-        else:
-            # Clear all cache types
-            for cache_dir in self.cache_directory.iterdir():
-                if cache_dir.is_dir():
-                    for cache_file in cache_dir.glob("*.json"):
-                        cache_file.unlink()
-                        cleared_count += 1
+        self.memory.clear(cache_type)
+        cleared_count = self.backend.clear(cache_type)
         
         logger.info(f"Cleared {cleared_count} cache entries")
         return cleared_count
     
-    def cleanup_expired(self) -> int:
+    def cleanup_expired(self, limit: Optional[int] = None) -> int:
         """
-        Remove all expired cache entries.
+        Remove expired cache entries, earliest expiry first.
+        
+        Args:
+            limit: Maximum number of entries to remove (None for all), so
+                large caches can be swept incrementally
         
         Returns:
             Number of entries removed
         """
-        removed_count = 0
-        
-        for cache_dir in self.cache_directory.iterdir():
-            if cache_dir.is_dir():
-                for cache_file in cache_dir.glob("*.json"):
-                    try:
-                        with open(cache_file, 'r', encoding='utf-8') as f:
-                            cache_data = json.load(f)
-                        
-                        if self._is_expired(cache_data):
-                            cache_file.unlink()
-                            removed_count += 1
-                            
-                    except (json.JSONDecodeError, IOError):
-                        # Remove corrupted cache files
-                        cache_file.unlink()
-                        removed_count += 1
+        removed_count = self.backend.cleanup_expired(time.time(), limit)
         
         if removed_count > 0:
             logger.info(f"Cleaned up {removed_count} expired cache entries")
         
         return removed_count
     
+    def start_background_cleanup(self, interval: float = 300.0, batch_size: int = 500) -> None:
+        """
+        Sweep expired entries in a daemon thread.
+        
+        Each pass removes at most batch_size entries, and passes repeat
+        without waiting while a full batch was removed.
+        
+        Args:
+            interval: Seconds between sweeps once the backlog is cleared
+            batch_size: Maximum entries removed per pass
+        """
+        if self._cleanup_thread is not None:
+            return
+        
+        self._cleanup_stop.clear()
+        
+        def sweep() -> None:
+            while not self._cleanup_stop.is_set():
+                try:
+                    removed = self.cleanup_expired(batch_size)
+                except Exception as e:
+                    logger.warning(f"Background cache cleanup failed: {e}")
+                    removed = 0
+                if removed < batch_size:
+                    self._cleanup_stop.wait(interval)
+        
+        self._cleanup_thread = threading.Thread(target=sweep, name="cache-cleanup", daemon=True)
+        self._cleanup_thread.start()
+    
+    def stop_background_cleanup(self) -> None:
+        """Stop the background sweep thread, if running."""
+        if self._cleanup_thread is None:
+            return
+        self._cleanup_stop.set()
+        self._cleanup_thread.join()
+        self._cleanup_thread = None
+    
+    def export_snapshot(self, path: str, cache_types: Iterable[str] = SNAPSHOT_CACHE_TYPES,
+                        include_expired: bool = False) -> Dict[str, int]:
+        """
+        Export cache entries to a single compressed snapshot bundle.
+        
+        The bundle can be imported on another node with import_snapshot()
+        or mounted read-only with SnapshotCacheBackend.
+        
+        Args:
+            path: Destination file
+            cache_types: Cache types to export
+            include_expired: Also export entries past their stale window
+            
+        Returns:
+            Number of entries exported per cache type
+        """
+        def entries():
+            for cache_type in cache_types:
+                for key, entry in self.backend.iter_entries(cache_type):
+                    if include_expired or not self._is_expired(entry) or self._is_retained(entry):
+                        yield cache_type, key, entry
+        
+        compression = self._encoding_options['compression']
+        counts = write_snapshot(path, entries(), "zlib" if compression == "none" else compression)
+        logger.info(f"Exported {sum(counts.values())} cache entries to {path}")
+        return counts
+    
+    def import_snapshot(self, path: str, cache_types: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Copy the entries of a snapshot bundle into this cache.
+        
+        Entries keep their original timestamps and TTLs.
+        
+        Args:
+            path: Bundle written by export_snapshot()
+            cache_types: Cache types to import (None for all in the bundle)
+            
+        Returns:
+            Number of entries imported per cache type
+        """
+        snapshot = SnapshotCacheBackend(path, self.default_ttl, frozen=False)
+        counts: Dict[str, int] = {}
+        try:
+            for cache_type in cache_types or snapshot.get_stats()['cache_types']:
+                batch: Dict[str, Dict[str, Any]] = {}
+                for key, entry in snapshot.iter_entries(cache_type):
+                    batch[key] = entry
+                    if len(batch) >= 500:
+                        self.backend.write_many(cache_type, batch)
+                        counts[cache_type] = counts.get(cache_type, 0) + len(batch)
+                        batch = {}
+                if batch:
+                    self.backend.write_many(cache_type, batch)
+                    counts[cache_type] = counts.get(cache_type, 0) + len(batch)
+                self.memory.clear(cache_type)
+        finally:
+            snapshot.close()
+        
+        logger.info(f"Imported {sum(counts.values())} cache entries from {path}")
+        return counts
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Get cache statistics.
@@ -202,39 +736,16 @@ class CacheManager:
         Returns:
             Dictionary with cache statistics
         """
-        stats = {
-            'total_files': 0,
-            'total_size': 0,
-            'expired_files': 0,
-            'cache_types': {}
-        }
-        
-        for cache_dir in self.cache_directory.iterdir():
-            if cache_dir.is_dir():
-                cache_type = cache_dir.name
-                type_stats = {
-                    'files': 0,
-                    'size': 0,
-                    'expired': 0
-                }
-                
-                for cache_file in cache_dir.glob("*.json"):
-                    type_stats['files'] += 1
-                    type_stats['size'] += cache_file.stat().st_size
-                    
-                    try:
-                        with open(cache_file, 'r', encoding='utf-8') as f:
-                            cache_data = json.load(f)
-                        
-                        if self._is_expired(cache_data):
-                            type_stats['expired'] += 1
-                            
-                    except (json.JSONDecodeError, IOError):
-                        type_stats['expired'] += 1
-                
-                stats['cache_types'][cache_type] = type_stats
-                stats['total_files'] += type_stats['files']
-                stats['total_size'] += type_stats['size']
-                stats['expired_files'] += type_stats['expired']
-        
-        return stats 
\ No newline at end of file
+        # Served from the backend's index; no cache files are opened
+        stats = self.backend.get_stats(time.time())
+        stats['backend'] = self.backend.name
+        stats['eviction'] = self.eviction
+        stats['evictions'] = self.evictions
+        stats['quotas'] = self.quotas
+        stats['memory'] = self.memory.get_stats()
+        return stats
+    
+    def close(self) -> None:
+        """Stop background cleanup and release backend resources."""
+        self.stop_background_cleanup()
+        self.backend.close()
@@ -3,9 +3,15 @@ Unified configuration for the MetadataFetcher system.
 """
 
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 from dotenv import load_dotenv
+from .limits import RateLimiter, DEFAULT_RATE_LIMITS
+from .transport import HttpTransport
+from .cache import CacheManager
+from .cache_backends import SnapshotCacheBackend
 
 load_dotenv()
 
@@ -17,9 +23,36 @@ class FetcherConfig:
     github_token: Optional[str] = None
     
     # Request Settings
-    request_delay: float = 1.0
+    request_delay: float = 1.0  # Sustained delay per host once its burst is used up
     max_retries: int = 3
     timeout: float = 10.0
+    pool_connections: int = 20  # Hosts to keep keep-alive pools for
+    pool_maxsize: int = 10  # Keep-alive connections per host
+    
+    # Parallel Fetching
+    parallel_fetch: bool = False
+    max_workers: int = 4
+    async_workers: int = 32  # Threads running sync fetchers for afetch()
+    fetch_deadline: Optional[float] = None
+    per_host_limit: int = 4
+    host_limits: Dict[str, int] = field(default_factory=dict)
+    max_response_bytes: int = 5 * 1024 * 1024  # Responses are cut off after this many bytes
+    response_byte_limits: Dict[str, int] = field(default_factory=dict)  # fetcher name -> bytes
+    
+    # Documentation crawling (DocsFetcher)
+    docs_crawl: bool = False  # Also crawl install/quickstart pages of documentation sites
+    docs_crawl_max_pages: int = 8
+    docs_crawl_max_bytes: int = 2 * 1024 * 1024
+    docs_crawl_concurrency: int = 4
+    
+    # PyPI
+    pypi_recent_releases: int = 0  # Also read the newest N releases (0 stops reading after "info")
+    pypi_mirror_index: Optional[str] = None  # Local mirror index (None uses <cache_directory>/pypi_mirror.sqlite3)
+    
+    # Rate Limiting (token bucket per host)
+    rate_limit_burst: int = 5
+    rate_limits: Dict[str, float] = field(default_factory=dict)  # host -> requests/second
+    rate_limit_bursts: Dict[str, int] = field(default_factory=dict)  # host -> burst size
     
     # Output Settings
     output_format: str = "json"
@@ -30,6 +63,27 @@ class FetcherConfig:
     enable_caching: bool = True
     cache_ttl: int = 86400
     cache_directory: str = "cache"
+    cache_backend: str = "file"  # "file" (JSON files) or "sqlite" (shared WAL database)
+    cache_snapshot: Optional[str] = None  # Mount this snapshot bundle read-only (implies offline)
+    offline: bool = False  # Serve only cached data; misses raise CacheMissError instead of fetching
+    http_cache_retention: int = 7 * 86400  # Keep stale responses this long for ETag/Last-Modified refresh
+    negative_cache_ttl: int = 3600  # Seconds misses and failed probes are remembered (0 disables)
+    negative_cache_ttls: Dict[str, int] = field(default_factory=dict)  # fetcher name -> seconds
+    fetcher_cache_ttls: Dict[str, int] = field(default_factory=dict)  # fetcher name -> result TTL (0 disables)
+    registry_cache_ttl: Optional[int] = None  # Merged registry results (None uses cache_ttl, 0 disables)
+    warm_refresh_window: float = 3600.0  # Cache warming refetches results expiring within this many seconds
+    stale_while_revalidate: bool = False  # Serve expired metadata at once and refresh it in the background
+    fetcher_max_staleness: Dict[str, int] = field(default_factory=dict)  # fetcher name -> seconds past expiry
+    cache_compression: str = "zlib"  # Codec for large entries: "zlib", "zstd" or "none"
+    cache_compress_threshold: int = 4096  # Entries at least this many bytes are compressed
+    cache_pretty_json: bool = False  # Indented JSON entries, for inspecting the cache by hand
+    cache_quotas: Dict[str, Dict[str, int]] = field(default_factory=dict)  # cache type -> {"max_entries", "max_bytes"}
+    cache_eviction: str = "lru"  # "lru" or "lfu" when a cache type is over quota
+    cache_lock_timeout: float = 120.0  # Seconds to wait for another worker fetching the same tool
+    cache_cleanup_interval: float = 0.0  # Seconds between background expiry sweeps (0 disables them)
+    cache_cleanup_batch: int = 500  # Entries removed per sweep pass
+    memory_cache_entries: int = 1024  # In-process LRU tier (0 disables it)
+    memory_cache_bytes: int = 64 * 1024 * 1024
     
     # Logging
     log_level: str = "INFO"
@@ -48,9 +102,108 @@ class FetcherConfig:
         if not self.github_token:
             self.github_token = os.getenv('GITHUB_TOKEN')
         
+        if not self.pypi_mirror_index:
+            self.pypi_mirror_index = (os.getenv('PYPI_MIRROR_INDEX') or
+                                      os.path.join(self.cache_directory, 'pypi_mirror.sqlite3'))
+        
+        if self.cache_snapshot:
+            self.offline = True
+        
+        # Shared by every fetcher using this config
+        self._rate_limiter = RateLimiter(
+            default_rate=1.0 / self.request_delay if self.request_delay > 0 else float('inf'),
+            default_burst=self.rate_limit_burst,
+            rates={**DEFAULT_RATE_LIMITS, **self.rate_limits},
+            bursts=self.rate_limit_bursts
+        )
+        self._transport = HttpTransport(
+            timeout=self.timeout,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            rate_limiter=self._rate_limiter,
+            cache_ttl=self.cache_ttl,
+            cache_retention=self.http_cache_retention,
+            offline=self.offline
+        )
+        self._cache_manager = None
+        self._cache_manager_lock = threading.Lock()
+        self._async_executor = None
+        self._async_executor_lock = threading.Lock()
+        
         # Create output directories
         self._ensure_output_directories()
     
+    def get_rate_limiter(self) -> RateLimiter:
+        """Get the per-host rate limiter shared by fetchers using this config."""
+        return self._rate_limiter
+    
+    def get_transport(self) -> HttpTransport:
+        """Get the pooled HTTP transport shared by fetchers using this config."""
+        return self._transport
+    
+    def get_async_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the worker pool that runs synchronous fetchers for afetch().
+        
+        Kept apart from the event loop's default executor, so async
+        fetches neither queue behind nor starve other blocking work, and
+        bounded by async_workers.
+        """
+        with self._async_executor_lock:
+            if self._async_executor is None:
+                self._async_executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.async_workers),
+                    thread_name_prefix="afetch"
+                )
+            return self._async_executor
+    
+    def set_transport(self, transport: HttpTransport) -> None:
+        """Inject a custom HTTP transport for all fetchers using this config."""
+        self._transport = transport
+        if self.enable_caching and transport.cache is None:
+            transport.cache = self._cache_manager
+    
+    def get_cache_manager(self) -> CacheManager:
+        """Get the cache manager shared by fetchers using this config."""
+        with self._cache_manager_lock:
+            if self._cache_manager is None:
+                self._cache_manager = CacheManager(
+                    cache_directory=self.cache_directory,
+                    default_ttl=self.cache_ttl,
+                    memory_max_entries=self.memory_cache_entries,
+                    memory_max_bytes=self.memory_cache_bytes,
+                    backend=(SnapshotCacheBackend(self.cache_snapshot, self.cache_ttl)
+                             if self.cache_snapshot else self.cache_backend),
+                    pretty=self.cache_pretty_json,
+                    compression=self.cache_compression,
+                    compress_threshold=self.cache_compress_threshold,
+                    quotas=self.cache_quotas,
+                    eviction=self.cache_eviction
+                )
+                if self.cache_cleanup_interval > 0:
+                    self._cache_manager.start_background_cleanup(
+                        self.cache_cleanup_interval, self.cache_cleanup_batch
+                    )
+                # Back the transport's conditional response cache with it
+                if self.enable_caching and self._transport.cache is None:
+                    self._transport.cache = self._cache_manager
+            return self._cache_manager
+    
+    def get_cache_fingerprint(self) -> Dict[str, Any]:
+        """
+        Get settings that change fetched results, for registry cache keys.
+        
+        Credentials are reduced to whether they are set, so keys never
+        contain secrets. Settings read by a single fetcher (docs crawl
+        limits, recent PyPI releases) are in that fetcher's own
+        fingerprint instead.
+        """
+        return {
+            'github_token': bool(self.github_token),
+            'google_cse': bool(self.google_api_keys and self.google_cse_id),
+            'pypi_mirror_index': os.path.abspath(self.pypi_mirror_index),
+        }
+    
     def _ensure_output_directories(self):
         """Ensure output directories exist."""
         formats = ['json', 'yaml', 'docs', 'pdf']
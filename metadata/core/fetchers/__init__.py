@@ -6,6 +6,7 @@ metadata from various sources like PyPI, GitHub, DockerHub, and documentation si
 """
 
 from .pypi import PyPIFetcher
+from .pypi_mirror import PyPIMirrorFetcher, PyPIMirrorIndex
 from .github import GitHubFetcher
 from .docker import DockerHubFetcher
 from .docs import DocsFetcher
@@ -18,6 +19,8 @@ from .multi_search import MultiSearchFetcher
 
 __all__ = [
     'PyPIFetcher',
+    'PyPIMirrorFetcher',
+    'PyPIMirrorIndex',
     'GitHubFetcher', 
     'DockerHubFetcher',
     'DocsFetcher',
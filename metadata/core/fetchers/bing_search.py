@@ -1,4 +1,3 @@
-import requests
 import logging
 from typing import Optional, List, Dict, Any
 from urllib.parse import urlparse, quote_plus
@@ -18,11 +17,10 @@ class BingSearchFetcher(BaseFetcher):
         super().__init__(config)
         self.api_key = os.getenv('BING_SEARCH_API_KEY')
         self.endpoint = "https://api.bing.microsoft.com/v7.0/search"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'Ocp-Apim-Subscription-Key': self.api_key,
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        }
     
     def can_fetch(self, tool_name: str) -> bool:
         """Bing Search can fetch any tool if API key is available."""
@@ -32,6 +30,9 @@ class BingSearchFetcher(BaseFetcher):
         """Lower priority than Google CSE, higher than other fallbacks."""
         return 4
     
+    def get_hosts(self) -> List[str]:
+        return ['api.bing.microsoft.com']
+    
     def get_supported_categories(self) -> List[ToolCategory]:
         return [ToolCategory.AI_ML, ToolCategory.DATA_SCIENCE, ToolCategory.DEVELOPER_TOOLS, ToolCategory.GENERIC]
     
@@ -72,10 +73,13 @@ class BingSearchFetcher(BaseFetcher):
                 'safesearch': 'moderate'
             }
             
-            response = self.session.get(self.endpoint, params=params, timeout=10)
+            # Streamed, so the byte cap also limits the download
+            response = self.transport.get(self.endpoint, params=params, headers=self.headers, stream=True)
+            if response.status_code >= 400:
+                response.close()
             response.raise_for_status()
             
-            data = response.json()
+            data = self.read_json(response)
             results = []
             
             # Extract web search results
@@ -6,7 +6,6 @@ from typing import Optional, List
 from ..base import BaseFetcher
 from ..schema import UnifiedMetadata, ToolCategory
 from ..config import FetcherConfig
-import requests
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,6 +31,10 @@ class DockerHubFetcher(BaseFetcher):
     def fetch(self, tool_name: str) -> Optional[UnifiedMetadata]:
         """Fetch metadata for a tool from DockerHub."""
         try:
+            if self._is_cached_miss(tool=tool_name):
+                logger.debug(f"DockerHub: {tool_name} is a known miss")
+                return None
+            
             # Search for Docker images
             params = {
                 "q": tool_name,
@@ -41,13 +44,14 @@ class DockerHubFetcher(BaseFetcher):
             headers = {
                 "Accept": "application/json"
             }
-            resp = requests.get(self.api_url, params=params, headers=headers, timeout=self.config.timeout)
+            resp = self.transport.get(self.api_url, params=params, headers=headers, cached=True)
             if resp.status_code != 200:
                 logger.warning(f"DockerHub: search failed for {tool_name} (status {resp.status_code})")
                 return None
-            data = resp.json()
+            data = self.read_json(resp)
             if not data.get("summaries"):
                 logger.warning(f"DockerHub: no images found for {tool_name}")
+                self._cache_miss("no images", tool=tool_name)
                 return None
             image = data["summaries"][0]
             # Build metadata
@@ -92,5 +96,8 @@ class DockerHubFetcher(BaseFetcher):
     def get_priority(self) -> int:
         return 30  # Lower priority than PyPI and GitHub
     
+    def get_hosts(self) -> List[str]:
+        return ['hub.docker.com']
+    
     def get_supported_categories(self) -> List[ToolCategory]:
         return [ToolCategory.DEVELOPER_TOOLS, ToolCategory.GENERIC] 
\ No newline at end of file
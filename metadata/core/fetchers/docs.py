@@ -2,17 +2,45 @@
 Documentation site fetcher for the unified MetadataFetcher architecture.
 """
 
-from typing import Optional, List
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Optional, List, Tuple
+from urllib.parse import urljoin, urlparse
 from ..base import BaseFetcher
+from ..cache import make_cache_key
+from ..limits import ByteBudget, HostLimiter
 from ..schema import UnifiedMetadata, ToolCategory
 from ..config import FetcherConfig
-import requests
 from bs4 import BeautifulSoup
 import re
 import logging
 
 logger = logging.getLogger(__name__)
 
+# URL keywords marking pages worth crawling, with their priority
+CRAWL_KEYWORDS = {
+    'install': 3,
+    'quickstart': 3,
+    'quick-start': 3,
+    'getting-started': 3,
+    'get-started': 3,
+    'setup': 2,
+    'download': 1,
+    'tutorial': 1,
+}
+
+# Documentation URL candidates probed at once; the rest wait in line, so
+# they can be cancelled once a better-ranked candidate answers
+PROBE_WORKERS = 4
+
+# Shell commands that install something, as found in docs code blocks
+INSTALL_COMMAND = re.compile(
+    r'^\s*(?:\$\s*)?((?:sudo\s+)?(?:pip3?|pipx|conda|mamba|brew|apt(?:-get)?|dnf|yum|pacman|'
+    r'snap|choco|winget|npm|yarn|pnpm|cargo|go|gem|docker)\s+(?:install|add|get|pull)\b.*|'
+    r'curl\s.+\|\s*(?:ba)?sh.*)$',
+    re.I | re.M
+)
+
 class DocsFetcher(BaseFetcher):
     """
     Fetches metadata by scraping official documentation sites.
@@ -21,6 +49,7 @@ class DocsFetcher(BaseFetcher):
     def __init__(self, config: Optional[FetcherConfig] = None):
         super().__init__(config)
         self.name = "DocsFetcher"
+        self.crawl_limiter = HostLimiter(self.config.per_host_limit, self.config.host_limits)
     
     def can_fetch(self, tool_name: str) -> bool:
         # This fetcher can handle any tool as a fallback
@@ -35,11 +64,12 @@ class DocsFetcher(BaseFetcher):
                 return None
             
             # Fetch and parse the documentation page
-            response = requests.get(doc_url, timeout=self.config.timeout)
+            response = self.transport.get(doc_url, stream=True)
             if response.status_code != 200:
+                response.close()
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(self.read_response(response), 'html.parser')
             
             # Extract metadata
             title = self._extract_title(soup, tool_name)
@@ -57,6 +87,10 @@ class DocsFetcher(BaseFetcher):
                 source_priority="online"
             )
             
+            # Dig through the install / quickstart pages of the site
+            if self.config.docs_crawl:
+                installation_methods += self._crawl_installation_methods(doc_url, soup, tool_name)
+            
             # Add installation methods
             for method in installation_methods:
                 metadata.add_installation_method(**method)
@@ -72,8 +106,18 @@ class DocsFetcher(BaseFetcher):
             return None
     
     def _find_documentation_url(self, tool_name: str) -> Optional[str]:
-        """Find the documentation URL for a tool."""
-        # Common documentation URL patterns
+        """
+        Find the documentation URL for a tool.
+        
+        Candidate URLs are probed concurrently (PROBE_WORKERS at a time)
+        but accepted in pattern order: the first pattern that answers 200
+        wins once every pattern before it has failed, and probes not yet
+        started are cancelled.
+        Probe answers are cached per host, both hits and HTTP errors;
+        timeouts and connection errors are not, so one network hiccup
+        does not hide a real docs host.
+        """
+        # Common documentation URL patterns, best first
         patterns = [
             f"https://docs.{tool_name}.org",
             f"https://{tool_name}.readthedocs.io",
@@ -86,15 +130,67 @@ class DocsFetcher(BaseFetcher):
             f"https://docs.{tool_name}.dev"
         ]
         
+        # Skip hosts that failed recently; only patterns ranked above the
+        # first host known to answer still need probing
+        candidates = []
+        known_good = None
         for pattern in patterns:
-            try:
-                response = requests.head(pattern, timeout=5, allow_redirects=True)
-                if response.status_code == 200:
-                    return pattern
-            except:
+            host = urlparse(pattern).hostname
+            if self._is_cached_miss(host=host):
                 continue
+            if self._is_cached_probe_hit(host):
+                known_good = pattern
+                break
+            candidates.append(pattern)
         
-        return None
+        if not candidates:
+            return known_good
+        
+        executor = ThreadPoolExecutor(max_workers=min(len(candidates), PROBE_WORKERS),
+                                      thread_name_prefix="docs-probe")
+        try:
+            futures = [executor.submit(self._probe, pattern) for pattern in candidates]
+            for pattern, future in zip(candidates, futures):
+                if future.result():
+                    return pattern
+            return known_good
+        finally:
+            # Don't wait on lower-priority probes once the answer is known
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _probe(self, url: str) -> bool:
+        """Check whether a candidate documentation URL answers, caching the outcome for its host."""
+        host = urlparse(url).hostname
+        try:
+            response = self.transport.head(url, timeout=5, allow_redirects=True)
+        except Exception as e:
+            logger.debug(f"Docs probe of {url} failed: {e}")
+            return False
+        
+        if response.status_code != 200:
+            self._cache_miss(f"status {response.status_code}", host=host)
+            return False
+        
+        if self.config.enable_caching:
+            self.cache_manager.set(self._probe_cache_key(host), {'url': url}, "api")
+        return True
+    
+    def _probe_cache_key(self, host: str) -> str:
+        """Build the cache key for a host's successful probe."""
+        # Probes do not depend on the crawl settings in the fingerprint
+        return make_cache_key(self.get_cache_namespace("probe"), host=host)
+    
+    def _negative_cache_key(self, **parts: Any) -> str:
+        # Failed probes are keyed on the host alone, like successful ones
+        if set(parts) == {'host'}:
+            return make_cache_key(self.get_cache_namespace("negative"), **parts)
+        return super()._negative_cache_key(**parts)
+    
+    def _is_cached_probe_hit(self, host: str) -> bool:
+        """Check whether a host answered a documentation probe recently."""
+        if not self.config.enable_caching or self._cache_reads_skipped():
+            return False
+        return self.cache_manager.get(self._probe_cache_key(host), "api") is not None
     
     def _extract_title(self, soup: BeautifulSoup, tool_name: str) -> str:
         """Extract the page title."""
@@ -141,6 +237,145 @@ class DocsFetcher(BaseFetcher):
         
         return methods
     
+    def _crawl_installation_methods(self, doc_url: str, landing: BeautifulSoup,
+                                    tool_name: str) -> List[dict]:
+        """
+        Crawl a documentation site's install pages for install commands.
+        
+        Candidate pages come from the site's sitemap.xml, or from same-site
+        links on the landing page when there is none, ranked by
+        CRAWL_KEYWORDS. They are fetched concurrently (docs_crawl_concurrency
+        overall, per_host_limit per host) and parsed as each one arrives,
+        until docs_crawl_max_pages pages or docs_crawl_max_bytes bytes.
+        
+        Args:
+            doc_url: Documentation landing page
+            landing: Parsed landing page
+            tool_name: Tool being fetched
+            
+        Returns:
+            Installation method dictionaries, one per distinct command
+        """
+        pages = self._rank_crawl_pages(doc_url, self._sitemap_urls(doc_url) or
+                                       [link['href'] for link in landing.find_all('a', href=True)])
+        pages = pages[:self.config.docs_crawl_max_pages]
+        if not pages:
+            return []
+        
+        budget = ByteBudget(self.config.docs_crawl_max_bytes)
+        methods = {}
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, self.config.docs_crawl_concurrency),
+                                      thread_name_prefix="docs-crawl")
+        try:
+            # Run pages in this fetch's context so their bytes count in its download metrics
+            futures = {executor.submit(contextvars.copy_context().run,
+                                       self._fetch_crawl_page, url, budget): url
+                       for url in pages}
+            for future in as_completed(futures):
+                try:
+                    html = future.result()
+                except Exception as e:
+                    # One bad page must not cost the landing page's results
+                    logger.debug(f"Docs crawl failed for {futures[future]}: {e}")
+                    continue
+                if not html:
+                    continue
+                
+                for command in self._extract_install_commands(BeautifulSoup(html, 'html.parser')):
+                    methods.setdefault(command, {
+                        'method': command.split()[1] if command.startswith('sudo ') else command.split()[0],
+                        'command': command,
+                        'description': f"Installation command from {futures[future]}"
+                    })
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        logger.info(f"Docs crawl of {doc_url} found {len(methods)} install commands for {tool_name}")
+        return list(methods.values())
+    
+    def _sitemap_urls(self, doc_url: str) -> List[str]:
+        """
+        List the page URLs of a site's sitemap.xml, following one level of sitemap index.
+        
+        Each sitemap is streamed and cut off at docs_crawl_max_bytes (or the
+        fetcher's byte cap, if lower); URLs before the cut are still used.
+        """
+        max_bytes = min(self.get_response_byte_limit(), self.config.docs_crawl_max_bytes)
+        
+        def locations(url: str) -> Tuple[List[str], bool]:
+            try:
+                response = self.transport.get(url, timeout=5, stream=True)
+                if response.status_code != 200:
+                    response.close()
+                    return [], False
+                text = self.read_response(response, max_bytes=max_bytes)
+            except Exception as e:
+                logger.debug(f"No sitemap at {url}: {e}")
+                return [], False
+            return re.findall(r'<loc>\s*([^<\s]+)\s*</loc>', text), '<sitemapindex' in text
+        
+        urls, is_index = locations(urljoin(doc_url, '/sitemap.xml'))
+        if not is_index:
+            return urls
+        
+        # Only nested sitemaps that look relevant, to bound the extra requests
+        pages = []
+        for sitemap in self._rank_crawl_pages(doc_url, urls, keep_unranked=True)[:3]:
+            pages.extend(locations(sitemap)[0])
+        return pages
+    
+    def _rank_crawl_pages(self, doc_url: str, urls: List[str],
+                          keep_unranked: bool = False) -> List[str]:
+        """Order same-site URLs by CRAWL_KEYWORDS priority, dropping unrelated pages."""
+        host = urlparse(doc_url).hostname
+        ranked = {}
+        for url in urls:
+            url = urljoin(doc_url, url).split('#')[0]
+            parsed = urlparse(url)
+            if parsed.scheme not in ('http', 'https') or parsed.hostname != host or url == doc_url:
+                continue
+            
+            path = parsed.path.lower()
+            score = max((weight for keyword, weight in CRAWL_KEYWORDS.items() if keyword in path),
+                        default=0)
+            if score or keep_unranked:
+                ranked[url] = (-score, len(path))
+        
+        return sorted(ranked, key=ranked.get)
+    
+    def _fetch_crawl_page(self, url: str, budget: ByteBudget) -> Optional[str]:
+        """
+        Fetch one crawled page, streaming it against the crawl's byte budget.
+        
+        Returns:
+            The page text, cut off where the budget ran out, or None
+        """
+        if budget.exhausted():
+            return None
+        
+        with self.crawl_limiter.slot(url):
+            try:
+                response = self.transport.get(url, timeout=5, stream=True)
+            except Exception as e:
+                logger.debug(f"Docs crawl failed for {url}: {e}")
+                return None
+            
+            if response.status_code != 200 or 'html' not in response.headers.get('Content-Type', 'html'):
+                response.close()
+                return None
+            return self.read_response(response, budget=budget)
+    
+    def _extract_install_commands(self, soup: BeautifulSoup) -> List[str]:
+        """Find install commands in a page's code blocks, wherever they are."""
+        commands = []
+        for block in soup.find_all(['pre', 'code']):
+            for match in INSTALL_COMMAND.finditer(block.get_text()):
+                command = ' '.join(match.group(1).split())
+                if len(command) < 200 and command not in commands:
+                    commands.append(command)
+        return commands
+    
     def _extract_links(self, soup: BeautifulSoup, base_url: str) -> List[dict]:
         """Extract relevant links from documentation."""
         links = []
@@ -175,5 +410,12 @@ class DocsFetcher(BaseFetcher):
     def get_priority(self) -> int:
         return 40  # Lower priority than PyPI, GitHub, and DockerHub
     
+    def get_cache_fingerprint(self) -> Dict[str, Any]:
+        # Crawled pages add installation methods the landing page lacks
+        if not self.config.docs_crawl:
+            return {'crawl': False}
+        return {'crawl': True, 'max_pages': self.config.docs_crawl_max_pages,
+                'max_bytes': self.config.docs_crawl_max_bytes}
+    
     def get_supported_categories(self) -> List[ToolCategory]:
         return [ToolCategory.GENERIC] 
\ No newline at end of file
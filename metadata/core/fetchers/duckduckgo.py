@@ -1,4 +1,3 @@
-import requests
 import logging
 from typing import Optional, List, Dict, Any
 from urllib.parse import urlparse, quote_plus
@@ -17,10 +16,9 @@ class DuckDuckGoFetcher(BaseFetcher):
         super().__init__(config)
         self.base_url = "https://api.duckduckgo.com/"
         self.search_url = "https://html.duckduckgo.com/html/"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        }
     
     def can_fetch(self, tool_name: str) -> bool:
         """DuckDuckGo can fetch any tool."""
@@ -30,6 +28,9 @@ class DuckDuckGoFetcher(BaseFetcher):
         """Lower priority than Google CSE, higher than other fallbacks."""
         return 5
     
+    def get_hosts(self) -> List[str]:
+        return ['api.duckduckgo.com', 'html.duckduckgo.com']
+    
     def get_supported_categories(self) -> List[ToolCategory]:
         return [ToolCategory.AI_ML, ToolCategory.DATA_SCIENCE, ToolCategory.DEVELOPER_TOOLS, ToolCategory.GENERIC]
     
@@ -65,10 +66,13 @@ class DuckDuckGoFetcher(BaseFetcher):
                 'skip_disambig': '1'
             }
             
-            response = self.session.get(self.base_url, params=params, timeout=10)
+            # Streamed, so the byte cap also limits the download
+            response = self.transport.get(self.base_url, params=params, headers=self.headers, stream=True)
+            if response.status_code >= 400:
+                response.close()
             response.raise_for_status()
             
-            data = response.json()
+            data = self.read_json(response)
             results = []
             
             # Extract Instant Answer data
@@ -112,7 +116,7 @@ class DuckDuckGoFetcher(BaseFetcher):
                 't': 'MetadataFetcher'
             }
             
-            response = self.session.get(self.search_url, params=params, timeout=10)
+            response = self.transport.get(self.search_url, params=params, headers=self.headers)
             response.raise_for_status()
             
             # Parse HTML results (simplified)
@@ -2,11 +2,10 @@
 GitHub fetcher for the unified MetadataFetcher architecture.
 """
 
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from ..base import BaseFetcher
 from ..schema import UnifiedMetadata, ToolCategory
 from ..config import FetcherConfig
-import requests
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,6 +27,10 @@ class GitHubFetcher(BaseFetcher):
     def fetch(self, tool_name: str) -> Optional[UnifiedMetadata]:
         """Fetch metadata for a tool from GitHub."""
         try:
+            if self._is_cached_miss(tool=tool_name):
+                logger.debug(f"GitHub: {tool_name} is a known miss")
+                return None
+            
             # Search for the most relevant repository
             search_url = f"{self.api_url}/search/repositories"
             params = {
@@ -39,21 +42,22 @@ class GitHubFetcher(BaseFetcher):
             headers = {}
             if self.config.github_token:
                 headers["Authorization"] = f"token {self.config.github_token}"
-            resp = requests.get(search_url, params=params, headers=headers, timeout=self.config.timeout)
+            resp = self.transport.get(search_url, params=params, headers=headers, cached=True)
             if resp.status_code != 200:
                 logger.warning(f"GitHub: search failed for {tool_name} (status {resp.status_code})")
                 return None
-            items = resp.json().get("items", [])
+            items = self.read_json(resp).get("items", [])
             if not items:
                 logger.warning(f"GitHub: no repositories found for {tool_name}")
+                self._cache_miss("no repositories", tool=tool_name)
                 return None
             repo = items[0]
             # Fetch README
             readme_url = f"{self.api_url}/repos/{repo['full_name']}/readme"
-            readme_resp = requests.get(readme_url, headers=headers, timeout=self.config.timeout)
+            readme_resp = self.transport.get(readme_url, headers=headers, cached=True)
             readme_content = None
             if readme_resp.status_code == 200:
-                readme_json = readme_resp.json()
+                readme_json = self.read_json(readme_resp)
                 import base64
                 if 'content' in readme_json:
                     readme_content = base64.b64decode(readme_json['content']).decode('utf-8', errors='replace')
@@ -98,5 +102,12 @@ class GitHubFetcher(BaseFetcher):
     def get_priority(self) -> int:
         return 20  # Lower priority than PyPI
     
+    def get_hosts(self) -> List[str]:
+        return ['api.github.com']
+    
+    def get_cache_fingerprint(self) -> Dict[str, Any]:
+        # Authenticated searches can see repositories anonymous ones cannot
+        return {'authenticated': bool(self.config.github_token)}
+    
     def get_supported_categories(self) -> List[ToolCategory]:
         return [ToolCategory.DEVELOPER_TOOLS, ToolCategory.GENERIC] 
\ No newline at end of file
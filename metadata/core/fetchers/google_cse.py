@@ -4,7 +4,6 @@ Uses Google CSE API to search multiple sources and gather comprehensive informat
 """
 
 import os
-import requests
 import logging
 from typing import Optional, List, Dict, Any
 from ..base import BaseFetcher
@@ -143,10 +142,13 @@ class GoogleCSEFetcher(BaseFetcher):
                     'safe': 'active'
                 }
                 
-                response = requests.get(url, params=params, timeout=self.config.timeout)
+                # Streamed, so the byte cap also limits the download
+                response = self.transport.get(url, params=params, stream=True)
+                if response.status_code != 200:
+                    response.close()
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = self.read_json(response)
                     items = data.get('items', [])
                     
                     for item in items:
@@ -435,6 +437,13 @@ class GoogleCSEFetcher(BaseFetcher):
     def get_priority(self) -> int:
         return 3  # High priority - use Google CSE for comprehensive data
     
+    def get_hosts(self) -> List[str]:
+        return ['www.googleapis.com']
+    
+    def get_cache_fingerprint(self) -> Dict[str, Any]:
+        # Results depend on which custom search engine is queried
+        return {'cse_id': self.cse_id}
+    
     def get_supported_categories(self) -> List[ToolCategory]:
         return [ToolCategory.AI_ML, ToolCategory.DATA_SCIENCE, ToolCategory.DEVELOPER_TOOLS, ToolCategory.GENERIC]
     
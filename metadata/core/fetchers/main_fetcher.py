@@ -3,8 +3,6 @@ Enhanced Main Fetcher that combines hardcoded data with online search capabiliti
 Handles programming languages and special tools with comprehensive data and online fallbacks.
 """
 
-import requests
-import time
 import random
 from typing import Optional, Dict, Any, List
 from urllib.parse import urlparse, quote_plus
@@ -474,7 +472,6 @@ class MainFetcher(BaseFetcher):
                 data = self._fetch_from_single_source(tool_name, source)
                 if data:
                     self._merge_collected_data(collected_data, data)
-                time.sleep(0.5)  # Rate limiting
             except Exception as e:
                 logger.debug(f"Error fetching from {source}: {e}")
                 continue
@@ -519,7 +516,6 @@ class MainFetcher(BaseFetcher):
                 data = self._fetch_from_single_source(tool_name, source)
                 if data:
                     self._merge_collected_data(collected_data, data)
-                time.sleep(0.5)
             except Exception as e:
                 logger.debug(f"Error fetching from {source}: {e}")
                 continue
@@ -533,9 +529,10 @@ class MainFetcher(BaseFetcher):
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             
-            response = requests.get(source_url, headers=headers, timeout=10)
+            response = self.transport.get(source_url, headers=headers, stream=True)
             if response.status_code == 200:
-                return self._parse_source_content(tool_name, response.text, source_url)
+                return self._parse_source_content(tool_name, self.read_response(response), source_url)
+            response.close()
             
         except Exception as e:
             logger.debug(f"Error fetching from {source_url}: {e}")
@@ -612,10 +609,13 @@ class MainFetcher(BaseFetcher):
         """Search using DuckDuckGo Instant Answer API."""
         try:
             url = f"https://api.duckduckgo.com/?q={quote_plus(tool_name)}&format=json&no_html=1&skip_disambig=1"
-            response = requests.get(url, timeout=10)
+            # Streamed, so the byte cap also limits the download
+            response = self.transport.get(url, stream=True)
             
-            if response.status_code == 200:
-                data = response.json()
+            if response.status_code != 200:
+                response.close()
+            else:
+                data = self.read_json(response)
                 results = []
                 
                 if data.get('Abstract'):
@@ -874,5 +874,8 @@ class MainFetcher(BaseFetcher):
     def get_priority(self) -> int:
         return 2  # Medium priority to allow MultiSearchFetcher to run
     
+    def get_hosts(self) -> List[str]:
+        return ['api.duckduckgo.com']
+    
     def get_supported_categories(self) -> list:
         return [ToolCategory.AI_ML, ToolCategory.DATA_SCIENCE, ToolCategory.DEVELOPER_TOOLS, ToolCategory.CREATIVE_MEDIA, ToolCategory.GENERIC] 
\ No newline at end of file
@@ -3,8 +3,6 @@ Multi-Search Engine Fetcher that combines multiple free search engines.
 This fetcher uses various free search engines to get comprehensive results without API keys.
 """
 
-import requests
-import time
 import random
 from typing import Optional, Dict, Any, List
 from urllib.parse import urlparse, quote_plus
@@ -51,8 +49,7 @@ class MultiSearchFetcher(BaseFetcher):
             }
         }
         
-        # Rate limiting and delays
-        self.delay_between_searches = 1.0
+        # Requests are spaced per host by the shared rate limiter
         self.max_results_per_engine = 5
         
     def can_fetch(self, tool_name: str) -> bool:
@@ -78,9 +75,6 @@ class MultiSearchFetcher(BaseFetcher):
                         all_results.extend(results)
                         logger.info(f"MultiSearchFetcher: Found {len(results)} results from {engine_config['name']}")
                     
-                    # Rate limiting
-                    time.sleep(self.delay_between_searches)
-                    
                 except Exception as e:
                     logger.warning(f"MultiSearchFetcher: Error with {engine_config['name']}: {str(e)}")
                     continue
@@ -116,6 +110,7 @@ class MultiSearchFetcher(BaseFetcher):
             
             for query in search_queries:
                 try:
+                    self._wait_for_rate_limit("www.google.com")
                     for url in search(query, num_results=3):  # Reduced to 3 per query to avoid rate limiting
                         try:
                             # Extract domain and title from URL
@@ -136,9 +131,6 @@ class MultiSearchFetcher(BaseFetcher):
                             logger.debug(f"MultiSearchFetcher: Error processing Google result: {str(e)}")
                             continue
                     
-                    # Rate limiting between queries
-                    time.sleep(0.5)
-                    
                 except Exception as e:
                     logger.debug(f"MultiSearchFetcher: Error with Google query '{query}': {str(e)}")
                     continue
@@ -171,9 +163,12 @@ class MultiSearchFetcher(BaseFetcher):
                         'skip_disambig': '1'
                     }
                     
-                    response = requests.get(url, params=params, timeout=10)
-                    if response.status_code == 200:
-                        data = response.json()
+                    # Streamed, so the byte cap also limits the download
+                    response = self.transport.get(url, params=params, stream=True)
+                    if response.status_code != 200:
+                        response.close()
+                    else:
+                        data = self.read_json(response)
                         
                         # Extract Abstract
                         if data.get('Abstract'):
@@ -198,9 +193,6 @@ class MultiSearchFetcher(BaseFetcher):
                                     'query': query
                                 })
                     
-                    # Rate limiting between queries
-                    time.sleep(0.5)
-                    
                 except Exception as e:
                     logger.debug(f"MultiSearchFetcher: Error with DuckDuckGo query '{query}': {str(e)}")
                     continue
@@ -235,11 +227,12 @@ class MultiSearchFetcher(BaseFetcher):
                         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
                     }
                     
-                    response = requests.get(url, params=params, headers=headers, timeout=10)
+                    response = self.transport.get(url, params=params, headers=headers, stream=True)
                     if response.status_code == 200:
-                        # Simple parsing of Bing results
+                        # Simple parsing of Bing results; nothing after </main> is needed
                         from bs4 import BeautifulSoup
-                        soup = BeautifulSoup(response.text, 'html.parser')
+                        soup = BeautifulSoup(self.read_response(response, stop_at=(b'</main>',)),
+                                             'html.parser')
                         
                         # Find search results
                         for result in soup.find_all('li', class_='b_algo')[:3]:
@@ -265,9 +258,8 @@ class MultiSearchFetcher(BaseFetcher):
                             except Exception as e:
                                 logger.debug(f"MultiSearchFetcher: Error parsing Bing result: {str(e)}")
                                 continue
-                    
-                    # Rate limiting between queries
-                    time.sleep(0.5)
+                    else:
+                        response.close()
                     
                 except Exception as e:
                     logger.debug(f"MultiSearchFetcher: Error with Bing query '{query}': {str(e)}")
@@ -1246,6 +1238,10 @@ class MultiSearchFetcher(BaseFetcher):
         """Get the priority of this fetcher."""
         return 1  # Highest priority to ensure comprehensive data
     
+    def get_hosts(self) -> List[str]:
+        """Get the search hosts this fetcher queries."""
+        return ['www.google.com', 'api.duckduckgo.com', 'www.bing.com']
+    
     def get_supported_categories(self) -> List[ToolCategory]:
         """Get supported tool categories."""
         return [
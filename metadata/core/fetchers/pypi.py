@@ -2,12 +2,15 @@
 PyPI fetcher for the unified MetadataFetcher architecture.
 """
 
-from typing import Optional, List
+from contextlib import closing
+from typing import Any, Dict, Optional, List, Tuple
 from ..base import BaseFetcher
+from ..cache import make_cache_key
+from ..jsonstream import JsonStreamReader
 from ..schema import UnifiedMetadata, ToolCategory
 from ..config import FetcherConfig
-import requests
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -30,88 +33,194 @@ class PyPIFetcher(BaseFetcher):
     def fetch(self, tool_name: str) -> Optional[UnifiedMetadata]:
         """Fetch metadata from PyPI."""
         try:
-            # Check cache first
-            cached_metadata = self._get_cached_metadata(tool_name)
-            if cached_metadata:
-                logger.info(f"Using cached metadata for {tool_name}")
-                return cached_metadata
+            if self._is_cached_miss(tool=tool_name):
+                logger.debug(f"PyPI: {tool_name} is a known miss")
+                return None
             
-            # Make API request
+            # Parsed documents are kept with their ETag / Last-Modified, so
+            # a stale one is renewed by a 304 instead of downloaded again
             url = f"https://pypi.org/pypi/{tool_name}/json"
-            response = requests.get(url, timeout=self.config.timeout)
+            cache_key = make_cache_key(self.get_cache_namespace("project"), url=url,
+                                       config=self.get_cache_fingerprint())
+            entry = self.cache_manager.get(cache_key, "api") if self.config.enable_caching else None
+            if entry and (self.transport.offline or
+                          (time.time() < entry['fresh_until'] and not self._cache_reads_skipped())):
+                return self._build_metadata(tool_name, entry['info'], entry['releases'])
             
-            if response.status_code == 404:
-                logger.warning(f"PyPI: {tool_name} not found (status 404)")
-                return None
+            # Make API request; the body is parsed as it streams in
+            headers = {}
+            if entry and entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry and entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+            response = self.transport.get(url, stream=True, headers=headers)
+            
+            if response.status_code == 304 and entry:
+                response.close()
+                logger.debug(f"PyPI: {tool_name} not modified since it was cached")
+                self._store_project(cache_key, entry, response)
+                return self._build_metadata(tool_name, entry['info'], entry['releases'])
             
             if response.status_code != 200:
-                logger.warning(f"PyPI: {tool_name} request failed (status {response.status_code})")
+                response.close()
+                if response.status_code == 404:
+                    logger.warning(f"PyPI: {tool_name} not found (status 404)")
+                    self._cache_miss("status 404", tool=tool_name)
+                else:
+                    logger.warning(f"PyPI: {tool_name} request failed (status {response.status_code})")
                 return None
             
-            data = response.json()
+            info, releases = self._read_project(response, tool_name)
             
             # Ensure data has the expected structure
-            if not data or 'info' not in data:
+            if not isinstance(info, dict):
                 logger.warning(f"PyPI: Invalid response structure for {tool_name}")
                 return None
             
-            info = data['info']
-            
-            # Build metadata
-            metadata = UnifiedMetadata(
-                name=tool_name,
-                display_name=info.get('name', tool_name),
-                description=info.get('summary', ''),
-                version=info.get('version', ''),
-                latest_version=info.get('version', ''),
-                category=ToolCategory.AI_ML,  # Default for Python packages
-                homepage=info.get('home_page'),
-                documentation=info.get('docs_url'),
-                repository=info.get('project_urls', {}).get('Repository') if info.get('project_urls') else None,
-                license=info.get('license'),
-                author=info.get('author'),
-                maintainer=info.get('maintainer'),
-                source_priority="online"
-            )
-            
-            # Add installation method
-            metadata.add_installation_method(
-                method="pip",
-                command=f"pip install {tool_name}",
-                description=f"Install {tool_name} using pip"
-            )
-            
-            # Add dependencies
-            if 'requires_dist' in info:
-                # requires_dist can be None or a list of dependency strings
-                if info['requires_dist'] is not None:
-                    if isinstance(info['requires_dist'], list):
-                        metadata.dependencies['latest'] = info['requires_dist']
-                    else:
-                        # If it's a string, split it into a list
-                        metadata.dependencies['latest'] = [info['requires_dist']]
-                else:
-                    metadata.dependencies['latest'] = []
-            
-            # Add comprehensive category fields
-            try:
-                self._add_comprehensive_fields(metadata, tool_name, info)
-                logger.info(f"Added comprehensive fields for {tool_name}")
-            except Exception as e:
-                logger.error(f"Error adding comprehensive fields for {tool_name}: {e}")
-            
-            # Cache the result
-            self._cache_metadata(tool_name, metadata)
-            
-            return metadata
+            self._store_project(cache_key, {'info': info, 'releases': releases}, response)
+            return self._build_metadata(tool_name, info, releases)
             
         except Exception as e:
             logger.error(f"Error fetching {tool_name} from PyPI: {e}")
             return None
     
+    def _store_project(self, cache_key: str, entry: Dict[str, Any], response) -> None:
+        """
+        Cache a parsed project document with the response's validators.
+        
+        Like the transport's response cache, entries are fresh for the
+        transport's cache_ttl and, when they have validators, kept for
+        cache_retention past that for conditional refresh.
+        """
+        if (not self.config.enable_caching
+                or 'no-store' in response.headers.get('Cache-Control', '')):
+            return
+        
+        ttl = self.transport.cache_ttl
+        entry['etag'] = response.headers.get('ETag', entry.get('etag'))
+        entry['last_modified'] = response.headers.get('Last-Modified', entry.get('last_modified'))
+        entry['fresh_until'] = time.time() + ttl
+        retention = self.transport.cache_retention if entry['etag'] or entry['last_modified'] else 0
+        self.cache_manager.set(cache_key, entry, "api", ttl=ttl + retention)
+    
+    def _build_metadata(self, tool_name: str, info: dict,
+                        releases: Optional[List[dict]] = None) -> UnifiedMetadata:
+        """Build metadata from a project's "info" section."""
+        # Build metadata
+        metadata = UnifiedMetadata(
+            name=tool_name,
+            display_name=info.get('name', tool_name),
+            description=info.get('summary', ''),
+            version=info.get('version', ''),
+            latest_version=info.get('version', ''),
+            category=ToolCategory.AI_ML,  # Default for Python packages
+            homepage=info.get('home_page'),
+            documentation=info.get('docs_url'),
+            repository=info.get('project_urls', {}).get('Repository') if info.get('project_urls') else None,
+            license=info.get('license'),
+            author=info.get('author'),
+            maintainer=info.get('maintainer'),
+            source_priority="online"
+        )
+        
+        # Add installation method
+        metadata.add_installation_method(
+            method="pip",
+            command=f"pip install {tool_name}",
+            description=f"Install {tool_name} using pip"
+        )
+        
+        # Add dependencies
+        if 'requires_dist' in info:
+            # requires_dist can be None or a list of dependency strings
+            if info['requires_dist'] is not None:
+                if isinstance(info['requires_dist'], list):
+                    metadata.dependencies['latest'] = info['requires_dist']
+                else:
+                    # If it's a string, split it into a list
+                    metadata.dependencies['latest'] = [info['requires_dist']]
+            else:
+                metadata.dependencies['latest'] = []
+        
+        if releases:
+            metadata.set_field("recent_releases", releases)
+        
+        # Add comprehensive category fields
+        try:
+            self._add_comprehensive_fields(metadata, tool_name, info)
+            logger.info(f"Added comprehensive fields for {tool_name}")
+        except Exception as e:
+            logger.error(f"Error adding comprehensive fields for {tool_name}: {e}")
+        
+        return metadata
+    
+    def _read_project(self, response, tool_name: str) -> Tuple[Optional[dict], List[dict]]:
+        """
+        Extract "info" (and the newest releases, if configured) from a
+        project's JSON document while it downloads.
+        
+        "info" comes first in PyPI's documents, so by default reading stops
+        right after it and the release and file listings, megabytes for
+        projects like torch, are never downloaded or parsed. With
+        pypi_recent_releases set, "releases" is walked one version at a
+        time, keeping only the newest ones.
+        
+        Returns:
+            The info dictionary (None if missing) and the newest releases
+            as {"version", "upload_time"} dictionaries, newest first
+        """
+        wanted = self.config.pypi_recent_releases
+        info = None
+        releases: List[dict] = []
+        releases_read = wanted <= 0
+        
+        with closing(self.iter_response(response)) as chunks:
+            reader = JsonStreamReader(chunks)
+            for key in reader.members():
+                if key == 'info':
+                    info = reader.value()
+                elif key == 'releases' and not releases_read:
+                    try:
+                        releases = self._read_recent_releases(reader, wanted)
+                    except Exception as e:
+                        # Releases are optional; keep the info read so far
+                        logger.warning(f"PyPI: could not read releases of {tool_name}: {e}")
+                        break
+                    releases_read = True
+                
+                if info is not None and releases_read:
+                    break
+        
+        return info, releases
+    
+    def _read_recent_releases(self, reader: JsonStreamReader, count: int) -> List[dict]:
+        """Walk the "releases" object, keeping the count most recently uploaded versions."""
+        newest: List[dict] = []
+        for version in reader.members():
+            files = reader.value()
+            upload_times = [file.get('upload_time_iso_8601') or file.get('upload_time') or ''
+                            for file in files if isinstance(file, dict)]
+            if not upload_times:
+                continue  # Releases without files were never installable
+            
+            newest.append({'version': version, 'upload_time': min(upload_times)})
+            if len(newest) > 2 * count:
+                newest.sort(key=lambda release: release['upload_time'], reverse=True)
+                del newest[count:]
+        
+        newest.sort(key=lambda release: release['upload_time'], reverse=True)
+        return newest[:count]
+    
     def get_priority(self) -> int:
         return 5  # High priority for PyPI
     
+    def get_hosts(self) -> List[str]:
+        return ['pypi.org']
+    
+    def get_cache_fingerprint(self) -> Dict[str, Any]:
+        # Recent releases are only read when asked for
+        return {'recent_releases': self.config.pypi_recent_releases}
+    
     def get_supported_categories(self) -> List[ToolCategory]:
         return [ToolCategory.AI_ML, ToolCategory.DATA_SCIENCE, ToolCategory.GENERIC]
     
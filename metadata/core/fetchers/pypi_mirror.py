@@ -0,0 +1,368 @@
+"""
+Offline PyPI mirror fetcher for the unified MetadataFetcher architecture.
+Answers PyPI lookups from a local SQLite index built from PyPI JSON
+documents, so well-known packages cost an index lookup instead of an
+HTTPS round-trip.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .pypi import PyPIFetcher
+from ..jsonstream import JsonStreamReader
+from ..schema import UnifiedMetadata
+from ..config import FetcherConfig
+import logging
+
+logger = logging.getLogger(__name__)
+
+# "info" fields kept in the index; enough to build PyPIFetcher metadata
+MIRRORED_INFO_FIELDS = (
+    'name', 'summary', 'version', 'requires_dist', 'home_page', 'docs_url',
+    'project_urls', 'license', 'author', 'maintainer',
+)
+
+# File suffixes picked up when ingesting a directory
+MIRROR_FILE_SUFFIXES = ('.json', '.jsonl', '.jsonl.gz', '.json.gz')
+
+# Projects written per transaction while ingesting
+INGEST_BATCH_SIZE = 500
+
+READ_CHUNK_SIZE = 65536
+
+# Bytes hashed at the start and at the end of the part of a JSON Lines dump
+# already ingested, to tell a dump that grew from one rewritten in place
+DIGEST_SPAN = 4096
+
+def normalize_project_name(name: str) -> str:
+    """Normalize a project name the way PyPI compares them (PEP 503)."""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+class PyPIMirrorIndex:
+    """
+    On-disk index of PyPI project metadata.
+    
+    Documents are either one PyPI JSON API response per file or JSON Lines
+    dumps with one response (or bare "info" object) per line. Ingesting is
+    incremental: files whose size and modification time are unchanged are
+    skipped, and JSON Lines dumps that only grew (their already-read part
+    is unchanged) are read from where the last ingest stopped. When a
+    project appears more than once, the document with the highest
+    last_serial wins.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS projects (
+            name TEXT PRIMARY KEY,
+            serial INTEGER NOT NULL,
+            info TEXT NOT NULL,
+            updated REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS ingested_files (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            offset INTEGER NOT NULL,
+            records INTEGER NOT NULL,
+            ingested_at REAL NOT NULL,
+            digest TEXT
+        );
+    """
+    
+    def __init__(self, path: str, busy_timeout: float = 30.0):
+        """
+        Open (or create) an index.
+        
+        Args:
+            path: Path of the SQLite database file
+            busy_timeout: Seconds to wait for a concurrent ingest's lock
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(self.SCHEMA)
+        
+        # Indexes created before digests were recorded
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(ingested_files)")]
+        if 'digest' not in columns:
+            conn.execute("ALTER TABLE ingested_files ADD COLUMN digest TEXT")
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, reconnecting after a fork."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        
+        conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout,
+                               isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+    
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a project's "info" section.
+        
+        Args:
+            name: Project name, in any PEP 503 spelling
+        
+        Returns:
+            The mirrored info fields, or None if the project is not indexed
+        """
+        row = self._connect().execute(
+            "SELECT info FROM projects WHERE name = ?", (normalize_project_name(name),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def ingest(self, sources: Iterable[str], force: bool = False) -> Dict[str, int]:
+        """
+        Add new and changed mirror files to the index.
+        
+        Args:
+            sources: Files or directories (searched recursively for
+                MIRROR_FILE_SUFFIXES)
+            force: Re-read every file, even unchanged ones
+        
+        Returns:
+            Counts of files read, files skipped as unchanged, project
+            documents ingested and documents that could not be parsed
+        """
+        report = {'files': 0, 'skipped': 0, 'projects': 0, 'errors': 0}
+        for path in self._mirror_files(sources):
+            stat = path.stat()
+            row = self._connect().execute(
+                "SELECT size, mtime, offset, digest FROM ingested_files WHERE path = ?", (str(path),)
+            ).fetchone()
+            if row and not force and (row[0], row[1]) == (stat.st_size, stat.st_mtime):
+                report['skipped'] += 1
+                continue
+            
+            # Appended JSON Lines dumps continue after the last complete line
+            # read; dumps rewritten in place are read again from the start
+            offset = 0
+            if (row and not force and path.suffix == '.jsonl' and stat.st_size >= row[2]
+                    and row[3] == self._digest(path, row[2])):
+                offset = row[2]
+            
+            projects, errors = self._ingest_file(path, offset, stat)
+            report['files'] += 1
+            report['projects'] += projects
+            report['errors'] += errors
+            logger.info(f"PyPI mirror: ingested {projects} projects from {path}")
+        
+        return report
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the number of indexed projects and files."""
+        conn = self._connect()
+        return {
+            'path': str(self.path),
+            'projects': conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0],
+            'files': conn.execute("SELECT COUNT(*) FROM ingested_files").fetchone()[0],
+        }
+    
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
+    @staticmethod
+    def _mirror_files(sources: Iterable[str]) -> Iterator[Path]:
+        for source in sources:
+            source = Path(source)
+            if source.is_dir():
+                for path in sorted(source.rglob('*')):
+                    if path.is_file() and path.name.endswith(MIRROR_FILE_SUFFIXES):
+                        yield path.resolve()
+            elif source.is_file():
+                yield source.resolve()
+            else:
+                logger.warning(f"PyPI mirror: {source} does not exist")
+    
+    def _ingest_file(self, path: Path, offset: int, stat: os.stat_result) -> Tuple[int, int]:
+        """Ingest one file from offset, recording how far it was read."""
+        conn = self._connect()
+        projects = 0
+        errors = 0
+        batch: List[tuple] = []
+        position = offset
+        
+        def flush(done: bool) -> None:
+            # Until the file is done its size is left unset, so it is never
+            # mistaken for unchanged; JSON Lines resume from position
+            size, mtime = (stat.st_size, stat.st_mtime) if done else (-1, -1)
+            digest = self._digest(path, position) if path.suffix == '.jsonl' else None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO projects (name, serial, info, updated) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET serial = excluded.serial, info = excluded.info, "
+                    "updated = excluded.updated WHERE excluded.serial >= projects.serial",
+                    batch
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO ingested_files "
+                    "(path, size, mtime, offset, records, ingested_at, digest) VALUES "
+                    "(?, ?, ?, ?, COALESCE((SELECT records FROM ingested_files WHERE path = ?), 0) + ?, ?, ?)",
+                    (str(path), size, mtime, position, str(path), len(batch), time.time(), digest)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            batch.clear()
+        
+        if offset == 0:
+            conn.execute("DELETE FROM ingested_files WHERE path = ?", (str(path),))
+        
+        now = time.time()
+        for document, end in self._read_documents(path, offset):
+            position = end
+            project = self._project_row(document, now) if document is not None else None
+            if project is None:
+                errors += 1
+                continue
+            
+            batch.append(project)
+            projects += 1
+            if len(batch) >= INGEST_BATCH_SIZE:
+                flush(done=False)
+        flush(done=True)
+        
+        return projects, errors
+    
+    @staticmethod
+    def _digest(path: Path, offset: int) -> str:
+        """Hash the first and last DIGEST_SPAN bytes of a file's first offset bytes."""
+        digest = hashlib.sha1(str(offset).encode())
+        with open(path, 'rb') as handle:
+            digest.update(handle.read(min(offset, DIGEST_SPAN)))
+            handle.seek(max(0, offset - DIGEST_SPAN))
+            digest.update(handle.read(min(offset, DIGEST_SPAN)))
+        return digest.hexdigest()
+    
+    def _read_documents(self, path: Path, offset: int) -> Iterator[Tuple[Optional[Dict[str, Any]], int]]:
+        """
+        Yield the documents of a file with the offset just past each.
+        
+        Unparseable documents are yielded as None.
+        """
+        opener = gzip.open if path.suffix == '.gz' else open
+        with opener(path, 'rb') as handle:
+            if not path.name.endswith(('.jsonl', '.jsonl.gz')):
+                yield self._read_document(iter(lambda: handle.read(READ_CHUNK_SIZE), b'')), 0
+                return
+            
+            handle.seek(offset)
+            for line in handle:
+                if not line.endswith(b'\n'):
+                    break  # Still being written; picked up by the next ingest
+                offset += len(line)
+                if line.strip():
+                    yield self._read_document([line]), offset
+    
+    @staticmethod
+    def _read_document(chunks: Iterable[bytes]) -> Optional[Dict[str, Any]]:
+        """
+        Extract "info" and "last_serial" from one document.
+        
+        The release listings that make up most of a full PyPI document are
+        skipped without being decoded.
+        """
+        document: Dict[str, Any] = {}
+        bare_info: Dict[str, Any] = {}
+        try:
+            reader = JsonStreamReader(chunks)
+            for key in reader.members():
+                if key in ('info', 'last_serial'):
+                    document[key] = reader.value()
+                elif key in MIRRORED_INFO_FIELDS:
+                    bare_info[key] = reader.value()
+                if len(document) == 2:
+                    break
+        except ValueError as e:
+            logger.debug(f"PyPI mirror: skipping unparseable document: {e}")
+            return None
+        
+        if 'info' not in document and bare_info.get('name'):
+            document['info'] = bare_info
+        return document
+    
+    @staticmethod
+    def _project_row(document: Dict[str, Any], now: float) -> Optional[tuple]:
+        info = document.get('info')
+        if not isinstance(info, dict) or not info.get('name'):
+            return None
+        
+        mirrored = {field: info.get(field) for field in MIRRORED_INFO_FIELDS if field in info}
+        serial = document.get('last_serial')
+        return (normalize_project_name(info['name']), serial if isinstance(serial, int) else 0,
+                json.dumps(mirrored, separators=(',', ':')), now)
+
+class PyPIMirrorFetcher(PyPIFetcher):
+    """
+    Serves PyPIFetcher metadata from a local PyPIMirrorIndex.
+    
+    Runs ahead of PyPIFetcher and needs no network, so it also answers in
+    offline mode. Projects missing from the index fall through to the
+    other fetchers.
+    """
+    
+    # Index lookups are as cheap as cache reads
+    result_cache_ttl = 0
+    works_offline = True
+    
+    def __init__(self, config: Optional[FetcherConfig] = None):
+        super().__init__(config)
+        self.name = "PyPIMirrorFetcher"
+        self._index: Optional[PyPIMirrorIndex] = None
+        self._index_lock = threading.Lock()
+    
+    def can_fetch(self, tool_name: str) -> bool:
+        return super().can_fetch(tool_name) and os.path.exists(self.config.pypi_mirror_index)
+    
+    def fetch(self, tool_name: str) -> Optional[UnifiedMetadata]:
+        """Fetch metadata from the local mirror index."""
+        try:
+            info = self.get_index().lookup(tool_name)
+        except sqlite3.Error as e:
+            logger.error(f"PyPI mirror: error looking up {tool_name}: {e}")
+            return None
+        
+        if info is None:
+            logger.debug(f"PyPI mirror: {tool_name} is not indexed")
+            return None
+        
+        metadata = self._build_metadata(tool_name, info)
+        metadata.source_priority = "mirror"
+        return metadata
+    
+    def get_index(self) -> PyPIMirrorIndex:
+        """Get the mirror index, opening it on first use."""
+        with self._index_lock:
+            if self._index is None:
+                self._index = PyPIMirrorIndex(self.config.pypi_mirror_index)
+            return self._index
+    
+    def get_priority(self) -> int:
+        return 4  # Ahead of PyPIFetcher: a local lookup instead of a request
+    
+    def get_hosts(self) -> List[str]:
+        return []
+    
+    def get_cache_fingerprint(self) -> Dict[str, Any]:
+        # The index holds no releases, so pypi_recent_releases does not apply
+        return {}
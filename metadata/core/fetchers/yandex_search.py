@@ -1,4 +1,3 @@
-import requests
 import logging
 from typing import Optional, List, Dict, Any
 from urllib.parse import urlparse, quote_plus
@@ -18,10 +17,9 @@ class YandexSearchFetcher(BaseFetcher):
         super().__init__(config)
         self.api_key = os.getenv('YANDEX_SEARCH_API_KEY')
         self.endpoint = "https://yandex.com/search/xml"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        }
     
     def can_fetch(self, tool_name: str) -> bool:
         """Yandex Search can fetch any tool if API key is available."""
@@ -31,6 +29,9 @@ class YandexSearchFetcher(BaseFetcher):
         """Lower priority than Google CSE, higher than other fallbacks."""
         return 6
     
+    def get_hosts(self) -> List[str]:
+        return ['yandex.com']
+    
     def get_supported_categories(self) -> List[ToolCategory]:
         return [ToolCategory.AI_ML, ToolCategory.DATA_SCIENCE, ToolCategory.DEVELOPER_TOOLS, ToolCategory.GENERIC]
     
@@ -73,7 +74,7 @@ class YandexSearchFetcher(BaseFetcher):
                 'groupby': 'attr=d.mode=deep.groups-on-page=10'
             }
             
-            response = self.session.get(self.endpoint, params=params, timeout=10)
+            response = self.transport.get(self.endpoint, params=params, headers=self.headers)
             response.raise_for_status()
             
             # Parse XML response (simplified)
@@ -0,0 +1,205 @@
+"""
+Incremental JSON reading for the MetadataFetcher system.
+Walks a JSON document as its bytes arrive, decoding only the members a
+fetcher asks for and skipping the rest without building them, so a caller
+can stop reading a large response as soon as it has what it needs.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator, Optional
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Next character that matters while skipping a container
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+
+# Rest of a string after its opening quote, up to the closing quote
+_STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+
+# End of a number, true, false or null
+_SCALAR_END = re.compile(r'[ \t\n\r,\]}]')
+
+class JsonStreamReader:
+    """
+    Pull reader over a JSON document delivered in byte chunks.
+    
+    Iterating members() walks an object's keys. For each key the caller
+    either decodes the value with value(), walks into it with members(),
+    or moves on; values left alone are skipped without being decoded.
+    
+    Example:
+        reader = JsonStreamReader(response.iter_content(16384))
+        for key in reader.members():
+            if key == 'info':
+                info = reader.value()
+                break
+    """
+    
+    def __init__(self, chunks: Iterable[bytes], encoding: str = 'utf-8'):
+        """
+        Initialize the reader.
+        
+        Args:
+            chunks: The document's bytes, in order
+            encoding: Text encoding of the document
+        """
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._pending = False
+    
+    def members(self) -> Iterator[str]:
+        """
+        Iterate over the keys of the object at the current position.
+        
+        Yields:
+            Each key, with the reader positioned at its value
+        
+        Raises:
+            ValueError: If the current value is not an object
+        """
+        self._pending = False
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        
+        while True:
+            self._expect('"')
+            key = self._string_tail()
+            self._expect(':')
+            self._pending = True
+            yield key
+            
+            if self._pending:
+                self.skip()
+            separator = self._peek()
+            self._pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or '}}' in JSON object, got {separator!r}")
+    
+    def value(self) -> Any:
+        """Decode the value at the current position."""
+        self._pending = False
+        first = self._peek()
+        if first and first not in '{["':
+            # A number may continue in the next chunk ("0" then ".1"), so
+            # buffer up to the delimiter after it before decoding
+            while _SCALAR_END.search(self._buffer, self._pos) is None and self._fill():
+                pass
+        
+        while True:
+            try:
+                result, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill(len(self._buffer) - self._pos):
+                    raise
+                continue
+            
+            self._pos = end
+            return result
+    
+    def skip(self) -> None:
+        """Move past the value at the current position without decoding it."""
+        self._pending = False
+        first = self._peek()
+        if first == '"':
+            self._pos += 1
+            self._string_tail(decode=False)
+            return
+        if first not in '{[':
+            self._scalar_end()
+            return
+        
+        self._pos += 1
+        depth = 1
+        while depth:
+            match = _STRUCTURAL.search(self._buffer, self._pos)
+            if match is None:
+                self._pos = len(self._buffer)
+                if not self._fill():
+                    raise ValueError("Truncated JSON document")
+                continue
+            
+            self._pos = match.end()
+            char = match.group()
+            if char == '"':
+                self._string_tail(decode=False)
+            elif char in '{[':
+                depth += 1
+            else:
+                depth -= 1
+    
+    def _string_tail(self, decode: bool = True) -> Optional[str]:
+        """Read the rest of a string whose opening quote was consumed."""
+        while True:
+            match = _STRING_TAIL.match(self._buffer, self._pos)
+            if match is not None:
+                break
+            if not self._fill(len(self._buffer) - self._pos):
+                raise ValueError("Truncated JSON string")
+        
+        start, self._pos = self._pos, match.end()
+        if decode:
+            return json.decoder.scanstring(self._buffer, start)[0]
+        return None
+    
+    def _scalar_end(self) -> None:
+        while True:
+            match = _SCALAR_END.search(self._buffer, self._pos)
+            if match is not None:
+                self._pos = match.start()
+                return
+            self._pos = len(self._buffer)
+            if not self._fill():
+                return
+    
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON document, got {found!r}")
+        self._pos += 1
+    
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character ('' at the end)."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+    
+    def _fill(self, at_least: int = 1) -> bool:
+        """
+        Append more of the document to the buffer.
+        
+        Args:
+            at_least: Characters to add before returning, so retried
+                decodes of a large value grow the buffer geometrically
+        
+        Returns:
+            False if the document has ended
+        """
+        # Drop what has been consumed
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        
+        added = 0
+        while added < max(at_least, 1) and not self._eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+                text = self._decoder.decode(b'', final=True)
+            else:
+                text = self._decoder.decode(chunk)
+            self._buffer += text
+            added += len(text)
+        return added > 0
@@ -0,0 +1,350 @@
+"""
+Per-host concurrency and rate limits for the MetadataFetcher system.
+Keeps bulk fetches from opening too many simultaneous requests to one API,
+spaces requests out only when a host's request budget is used up,
+coalesces identical concurrent requests into one, and bounds the bytes
+shared downloads may read.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+class HostLimiter:
+    """
+    Caps the number of concurrent requests to each host.
+
+    Hosts without an explicit limit share the default limit. Limits are
+    enforced across all threads using the same limiter.
+    """
+
+    def __init__(self, default_limit: int = 4, limits: Optional[Dict[str, int]] = None):
+        """
+        Initialize the host limiter.
+
+        Args:
+            default_limit: Concurrent requests allowed per host
+            limits: Per-host overrides, keyed by hostname
+        """
+        self.default_limit = max(1, default_limit)
+        self.limits = {host.lower(): max(1, limit) for host, limit in (limits or {}).items()}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url_or_host: str) -> str:
+        """Normalize a URL or bare hostname to a lowercase hostname."""
+        if '://' in url_or_host:
+            return (urlparse(url_or_host).hostname or '').lower()
+        return url_or_host.lower()
+
+    def get_limit(self, host: str) -> int:
+        """Get the concurrency limit for a host."""
+        return self.limits.get(self.host_of(host), self.default_limit)
+
+    def _get_semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.get_limit(host))
+                self._semaphores[host] = semaphore
+            return semaphore
+
+    @contextmanager
+    def slot(self, *hosts: str) -> Iterator[None]:
+        """
+        Hold one request slot on each of the given hosts.
+
+        Slots are acquired in sorted order so callers holding several hosts
+        cannot deadlock each other.
+
+        Args:
+            *hosts: URLs or hostnames to acquire slots for
+        """
+        names = sorted({self.host_of(host) for host in hosts if host})
+        acquired = []
+        try:
+            for host in names:
+                semaphore = self._get_semaphore(host)
+                semaphore.acquire()
+                acquired.append(semaphore)
+            yield
+        finally:
+            for semaphore in reversed(acquired):
+                semaphore.release()
+
+    @asynccontextmanager
+    async def aslot(self, *hosts: str, poll_interval: float = 0.01) -> AsyncIterator[None]:
+        """
+        Async counterpart of slot().
+
+        Takes the same slots as slot(), so sync and async callers share the
+        limits; a busy host is polled instead of blocking the event loop.
+
+        Args:
+            *hosts: URLs or hostnames to acquire slots for
+            poll_interval: Seconds between attempts on a busy host
+        """
+        names = sorted({self.host_of(host) for host in hosts if host})
+        acquired = []
+        try:
+            for host in names:
+                semaphore = self._get_semaphore(host)
+                while not semaphore.acquire(blocking=False):
+                    await asyncio.sleep(poll_interval)
+                acquired.append(semaphore)
+            yield
+        finally:
+            for semaphore in reversed(acquired):
+                semaphore.release()
+
+
+# Sustained requests per second for well-known hosts. Hosts not listed here
+# fall back to FetcherConfig.request_delay (one request per delay).
+DEFAULT_RATE_LIMITS: Dict[str, float] = {
+    'pypi.org': 10.0,
+    'api.github.com': 1.0,
+    'hub.docker.com': 2.0,
+    'www.googleapis.com': 2.0,
+    'www.google.com': 2.0,
+    'api.duckduckgo.com': 2.0,
+    'html.duckduckgo.com': 2.0,
+    'www.bing.com': 2.0,
+    'api.bing.microsoft.com': 2.0,
+    'yandex.com': 2.0,
+}
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at `rate` per second up to `burst`. A caller
+    only waits when the bucket is empty.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize the bucket full.
+
+        Args:
+            rate: Tokens added per second
+            burst: Maximum number of tokens held
+        """
+        self.rate = max(rate, 1e-6)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take one token, going into debt if none are available.
+
+        Returns:
+            Seconds the caller must wait before using the token
+        """
+        if self.rate == float('inf'):
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """
+        Block until a token is available.
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+class RateLimiter:
+    """
+    Per-host token-bucket rate limiter shared by all fetchers.
+
+    One bucket is kept per hostname, so a request only waits when that
+    host's budget is used up, regardless of which thread or tool issued it.
+    """
+
+    def __init__(self, default_rate: float = 1.0, default_burst: int = 5,
+                 rates: Optional[Dict[str, float]] = None,
+                 bursts: Optional[Dict[str, int]] = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            default_rate: Requests per second for hosts without an override
+            default_burst: Burst size for hosts without an override
+            rates: Per-host requests per second, keyed by hostname
+            bursts: Per-host burst sizes, keyed by hostname
+        """
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.rates = {host.lower(): rate for host, rate in (rates or {}).items()}
+        self.bursts = {host.lower(): burst for host, burst in (bursts or {}).items()}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def get_bucket(self, url_or_host: str) -> TokenBucket:
+        """Get the bucket for a URL's host, creating it on first use."""
+        host = HostLimiter.host_of(url_or_host)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rates.get(host, self.default_rate),
+                                     self.bursts.get(host, self.default_burst))
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url_or_host: str) -> float:
+        """
+        Wait until a request to the given host is within budget.
+
+        Args:
+            url_or_host: Request URL or hostname
+
+        Returns:
+            Seconds spent waiting
+        """
+        if not url_or_host:
+            return 0.0
+        wait = self.get_bucket(url_or_host).acquire()
+        if wait > 0:
+            logger.debug(f"Rate limited {HostLimiter.host_of(url_or_host)} for {wait:.2f}s")
+        return wait
+
+
+class ByteBudget:
+    """
+    Thread-safe byte allowance shared by several downloads.
+
+    Lets concurrent readers stop together once their combined bytes reach
+    a total, such as the page budget of a documentation crawl.
+    """
+
+    def __init__(self, total: int):
+        self.remaining = total
+        self._lock = threading.Lock()
+
+    def take(self, size: int) -> int:
+        """
+        Take up to size bytes from the budget.
+
+        Returns:
+            Bytes granted; fewer than size once the budget runs out
+        """
+        with self._lock:
+            granted = min(size, max(self.remaining, 0))
+            self.remaining -= granted
+            return granted
+
+    def exhausted(self) -> bool:
+        """Check whether the budget is used up."""
+        with self._lock:
+            return self.remaining <= 0
+
+class _Flight:
+    """One in-flight SingleFlight call."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.followers = 0
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls.
+
+    The first caller for a key runs the function; callers arriving with the
+    same key while it runs wait and receive its result (or exception)
+    instead of running it again. Nothing is remembered once the call
+    finishes, so this never serves old results.
+    """
+
+    def __init__(self, copy_result: Optional[Callable[[Any], Any]] = None):
+        """
+        Initialize the coalescer.
+
+        Args:
+            copy_result: Applied to the result for each waiting caller, so
+                callers never share a mutable object (None shares it)
+        """
+        self.copy_result = copy_result
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, bool]:
+        """
+        Run fn(*args, **kwargs), or wait for the identical call in flight.
+
+        Args:
+            key: Identifies calls that may share a result
+            fn: Function to run
+
+        Returns:
+            (result, shared) tuple; shared is True for callers that waited
+            on another caller's call
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.followers += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            result = flight.result
+            return (self.copy_result(result) if self.copy_result else result), True
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            flight.error = e
+            self._land(key, flight)
+            raise
+
+        if self._land(key, flight):
+            # Followers copy this snapshot, not the object the leader may mutate
+            try:
+                flight.result = self.copy_result(result) if self.copy_result else result
+            except Exception as e:
+                flight.error = e
+        flight.done.set()
+        return result, False
+
+    def _land(self, key: Hashable, flight: _Flight) -> int:
+        """
+        Close a flight to new followers.
+
+        Failed flights release their followers at once; successful ones are
+        released by the caller after storing the result.
+
+        Returns:
+            Number of callers waiting on the flight
+        """
+        with self._lock:
+            del self._flights[key]
+            followers = flight.followers
+        if flight.error is not None:
+            flight.done.set()
+        return followers
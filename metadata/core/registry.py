@@ -2,15 +2,25 @@
 Fetcher registry for managing and coordinating all data source fetchers.
 """
 
+import copy
 import logging
-from typing import List, Optional, Dict, Any, Type
-from .base import BaseFetcher
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from typing import List, Optional, Dict, Any, Callable, Type, Iterable, Iterator, Tuple, Union
+from .base import BaseFetcher, FetchTimeoutError, metadata_cache_entry
 from .schema import UnifiedMetadata, ToolCategory
 from .config import FetcherConfig
+from .limits import HostLimiter, SingleFlight
+from .transport import request_deadline
+from .cache import CacheMissError, make_cache_key
+import threading
 import time
 
 logger = logging.getLogger(__name__)
 
+# (fetcher, metadata, error) as produced by the sequential and parallel runners
+FetchResult = Tuple[BaseFetcher, Optional[UnifiedMetadata], Optional[Exception]]
+
 class FetcherRegistry:
     """
     Registry for managing all available fetchers.
@@ -19,17 +29,28 @@ class FetcherRegistry:
     fetchers for different data sources.
     """
     
-    def __init__(self, config: Optional[FetcherConfig] = None):
+    def __init__(self, config: Optional[FetcherConfig] = None,
+                 normalizer: Optional[Callable[[str], str]] = None):
         """
         Initialize the fetcher registry.
         
         Args:
             config: Configuration for the registry
+            normalizer: Maps tool-name aliases to one canonical name; tools
+                are fetched, cached and coalesced under that name
         """
         self.config = config or FetcherConfig()
+        self.normalizer = normalizer
         self._fetchers: List[BaseFetcher] = []
         self._fetcher_map: Dict[str, BaseFetcher] = {}
         self._category_map: Dict[ToolCategory, List[BaseFetcher]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.host_limiter = HostLimiter(self.config.per_host_limit, self.config.host_limits)
+        self._refreshing: set = set()
+        self._refresh_lock = threading.Lock()
+        self._flights = SingleFlight(copy_result=copy.deepcopy)
+        self._async_flights: Dict[Tuple[Any, ...], List[Any]] = {}  # key -> [task, followers]
         
         # Initialize category map
         for category in ToolCategory:
@@ -162,21 +183,374 @@ class FetcherRegistry:
     
     def fetch_metadata(self, tool_name: str, 
                       category: Optional[ToolCategory] = None,
-                      max_fetchers: Optional[int] = None) -> UnifiedMetadata:
+                      max_fetchers: Optional[int] = None,
+                      parallel: Optional[bool] = None,
+                      deadline: Optional[float] = None,
+                      refresh: bool = False) -> UnifiedMetadata:
         """
         Fetch metadata for a tool using available fetchers.
         
+        In parallel mode all eligible fetchers run at once on the registry's
+        worker pool; their results are still merged in priority order, so the
+        output matches the sequential path. Merged results are cached, so a
+        repeat request returns without calling any fetcher. In offline mode
+        (config.offline) only cached results are used. Identical calls made
+        while one is in flight wait for it and get a copy of its result.
+        
+        Args:
+            tool_name: Name of the tool to fetch metadata for
+            category: Optional tool category to limit fetchers
+            max_fetchers: Maximum number of fetchers to try
+            parallel: Run fetchers concurrently (defaults to config.parallel_fetch)
+            deadline: Per-tool deadline in seconds for parallel mode
+                (defaults to config.fetch_deadline)
+            refresh: Ignore cached merged and fetcher results and fetch live
+            
+        Returns:
+            UnifiedMetadata object with combined results
+            
+        Raises:
+            CacheMissError: In offline mode, if nothing is cached for the tool
+        """
+        return self._fetch_shared(tool_name, self.host_limiter, category, max_fetchers,
+                                  parallel, deadline, refresh)
+    
+    def _fetch_shared(self, tool_name: str, host_limiter: HostLimiter,
+                      category: Optional[ToolCategory] = None,
+                      max_fetchers: Optional[int] = None,
+                      parallel: Optional[bool] = None,
+                      deadline: Optional[float] = None,
+                      refresh: bool = False,
+                      reuse_fetcher_results: bool = False) -> UnifiedMetadata:
+        """
+        Run fetch_metadata() with fetchers holding slots on host_limiter.
+        
+        With reuse_fetcher_results, refresh only skips the cached merged
+        result; fetchers still serve their own cached results.
+        """
+        tool_name = self._canonical_name(tool_name)
+        flight_key = ('sync', tool_name.strip().lower(), category, max_fetchers,
+                      parallel, deadline, refresh, reuse_fetcher_results)
+        metadata, shared = self._flights.do(flight_key, self._fetch_metadata, tool_name, category,
+                                            max_fetchers, parallel, deadline, refresh, host_limiter,
+                                            reuse_fetcher_results)
+        if shared:
+            logger.info(f"Shared an in-flight fetch of {tool_name}")
+        return metadata
+    
+    def _fetch_metadata(self, tool_name: str, category: Optional[ToolCategory],
+                        max_fetchers: Optional[int], parallel: Optional[bool],
+                        deadline: Optional[float], refresh: bool,
+                        host_limiter: HostLimiter,
+                        reuse_fetcher_results: bool = False) -> UnifiedMetadata:
+        """Run one fetch_metadata() call (see there and _fetch_shared())."""
+        start_time = time.time()
+        
+        if parallel is None:
+            parallel = self.config.parallel_fetch
+        if deadline is None:
+            deadline = self.config.fetch_deadline
+        
+        fetchers = self._select_fetchers(tool_name, category, max_fetchers)
+        
+        if not fetchers:
+            logger.warning(f"No fetchers available for tool: {tool_name}")
+            return self._create_empty_metadata(tool_name, category)
+        
+        cache_key = self._merged_cache_key(tool_name, fetchers, category)
+        if not refresh:
+            cached = self._get_cached_result(cache_key, start_time)
+            if cached:
+                return cached
+        
+        if self.config.offline:
+            return self._fetch_offline(tool_name, fetchers, category, start_time)
+        
+        mode = 'parallel' if parallel and len(fetchers) > 1 else 'sequential'
+        logger.info(f"Using {len(fetchers)} fetchers for {tool_name} ({mode}): "
+                   f"{[f.name for f in fetchers]}")
+        
+        # Merge results in priority order
+        outcome = _FetchOutcome(self, tool_name)
+        
+        use_cache = not refresh or reuse_fetcher_results
+        if mode == 'parallel':
+            results = self._run_parallel(fetchers, tool_name, host_limiter, deadline, use_cache)
+        else:
+            results = self._run_sequential(fetchers, tool_name, host_limiter, use_cache)
+        
+        try:
+            for fetcher, metadata, error in results:
+                if outcome.add(fetcher, metadata, error):
+                    break
+        finally:
+            results.close()
+        
+        return outcome.finish(category, len(fetchers), start_time, mode, cache_key)
+    
+    def fetch_many(self, tool_names: Iterable[str],
+                   concurrency: Optional[int] = None,
+                   per_host_limit: Optional[Union[int, Dict[str, int]]] = None,
+                   **kwargs) -> Iterator[Tuple[str, Optional[UnifiedMetadata]]]:
+        """
+        Fetch metadata for many tools at once.
+        
+        Tools are processed on a dedicated worker pool and yielded as each
+        one finishes, not in input order. Requests to the same API host are
+        capped across all tools by the registry's host limiter.
+        
+        Args:
+            tool_names: Names of the tools to fetch
+            concurrency: Maximum number of tools in flight at once
+                (defaults to config.max_workers)
+            per_host_limit: Concurrent fetches allowed per host, either one
+                limit for every host or a mapping of hostname to limit.
+                Applies to this call only, in place of the registry's limits.
+            **kwargs: Passed through to fetch_metadata
+            
+        Yields:
+            (tool_name, metadata) tuples; metadata is None if the tool failed
+        """
+        tool_names = list(tool_names)
+        
+        host_limiter = self.host_limiter
+        if isinstance(per_host_limit, dict):
+            host_limiter = HostLimiter(self.config.per_host_limit, per_host_limit)
+        elif per_host_limit is not None:
+            host_limiter = HostLimiter(per_host_limit, self.config.host_limits)
+        
+        workers = max(1, concurrency or self.config.max_workers)
+        logger.info(f"Fetching {len(tool_names)} tools with concurrency {workers}")
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tool") as executor:
+            futures = {executor.submit(self._fetch_shared, tool_name, host_limiter, **kwargs): tool_name
+                       for tool_name in tool_names}
+            try:
+                for future in as_completed(futures):
+                    tool_name = futures[future]
+                    try:
+                        metadata = future.result()
+                    except Exception as e:
+                        logger.error(f"Registry failed to fetch {tool_name}: {e}")
+                        metadata = None
+                    yield tool_name, metadata
+            finally:
+                for future in futures:
+                    future.cancel()
+    
+    def warm(self, tool_names: Iterable[str],
+             concurrency: Optional[int] = None,
+             refresh_window: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Prime the merged-result cache for many tools.
+        
+        Tools whose cached result stays fresh for longer than refresh_window
+        are skipped; the rest are merged again on a worker pool, under the
+        shared rate and host limits. Only fetchers without a fresh cached
+        result of their own are called.
+        
+        Args:
+            tool_names: Names of the tools to warm
+            concurrency: Maximum number of tools in flight at once
+                (defaults to config.max_workers)
+            refresh_window: Refetch results expiring within this many seconds
+                (defaults to config.warm_refresh_window)
+            
+        Returns:
+            Report with per-tool status ("fresh", "warmed" or "failed"),
+            counts, coverage (share of tools now cached) and duration
+        """
+        start_time = time.time()
+        tool_names = list(dict.fromkeys(tool_names))
+        if refresh_window is None:
+            refresh_window = self.config.warm_refresh_window
+        
+        workers = max(1, concurrency or self.config.max_workers)
+        logger.info(f"Warming cache for {len(tool_names)} tools with concurrency {workers}")
+        
+        statuses: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warm") as executor:
+            futures = {executor.submit(self._warm_one, tool_name, refresh_window): tool_name
+                       for tool_name in tool_names}
+            for future in as_completed(futures):
+                tool_name = futures[future]
+                try:
+                    statuses[tool_name] = future.result()
+                except Exception as e:
+                    logger.error(f"Registry failed to warm {tool_name}: {e}")
+                    statuses[tool_name] = 'failed'
+        
+        counts = {status: sum(1 for s in statuses.values() if s == status)
+                  for status in ('fresh', 'warmed', 'failed')}
+        report = {
+            'total': len(tool_names),
+            **counts,
+            'coverage': (counts['fresh'] + counts['warmed']) / len(tool_names) if tool_names else 1.0,
+            'duration': time.time() - start_time,
+            'tools': {tool_name: statuses[tool_name] for tool_name in tool_names}
+        }
+        logger.info(f"Cache warm finished in {report['duration']:.2f}s: {counts['warmed']} warmed, "
+                   f"{counts['fresh']} already fresh, {counts['failed']} failed")
+        return report
+    
+    def _warm_one(self, tool_name: str, refresh_window: float) -> str:
+        """Warm one tool's cached result, returning its warm status."""
+        tool_name = self._canonical_name(tool_name)
+        fetchers = self._select_fetchers(tool_name)
+        if not fetchers or self._merged_result_ttl() <= 0:
+            return 'failed'
+        
+        cache_key = self._merged_cache_key(tool_name, fetchers)
+        cache = self.config.get_cache_manager()
+        remaining = cache.time_to_expiry(cache_key, "metadata")
+        if remaining is not None and remaining > refresh_window:
+            return 'fresh'
+        
+        # Fetcher results that are still fresh are reused; expired ones
+        # kept for stale-while-revalidate are refetched rather than served
+        if self.config.stale_while_revalidate:
+            for fetcher in fetchers:
+                expires_in = cache.time_to_expiry(fetcher._metadata_cache_key(tool_name), "metadata")
+                if fetcher.get_result_cache_ttl() > 0 and expires_in is not None and expires_in <= 0:
+                    with self.host_limiter.slot(*fetcher.get_hosts()):
+                        fetcher.refresh(tool_name)
+        
+        self._fetch_shared(tool_name, self.host_limiter, refresh=True, reuse_fetcher_results=True)
+        warmed = cache.time_to_expiry(cache_key, "metadata") is not None
+        return 'warmed' if warmed else 'failed'
+    
+    async def afetch_metadata(self, tool_name: str,
+                              category: Optional[ToolCategory] = None,
+                              max_fetchers: Optional[int] = None,
+                              deadline: Optional[float] = None,
+                              refresh: bool = False) -> UnifiedMetadata:
+        """
+        Fetch metadata for a tool on the running event loop.
+        
+        All eligible fetchers are started at once through BaseFetcher.afetch
+        and merged in priority order, exactly like the parallel sync path,
+        under the same per-host limits. Identical calls on the same event
+        loop share one in-flight fetch.
+        
         Args:
             tool_name: Name of the tool to fetch metadata for
             category: Optional tool category to limit fetchers
             max_fetchers: Maximum number of fetchers to try
+            deadline: Per-tool deadline in seconds (defaults to config.fetch_deadline)
+            refresh: Ignore cached merged and fetcher results and fetch live
             
         Returns:
             UnifiedMetadata object with combined results
+            
+        Raises:
+            CacheMissError: In offline mode, if nothing is cached for the tool
         """
+        tool_name = self._canonical_name(tool_name)
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, tool_name.strip().lower(), category, max_fetchers, deadline, refresh)
+        
+        flight = self._async_flights.get(flight_key)
+        if flight is None:
+            task = asyncio.ensure_future(self._afetch_metadata(
+                tool_name, category, max_fetchers, deadline, refresh, self.host_limiter))
+            flight = self._async_flights[flight_key] = [task, 0]
+            task.add_done_callback(lambda _: self._async_flights.pop(flight_key, None))
+        else:
+            flight[1] += 1
+            logger.info(f"Sharing an in-flight fetch of {tool_name}")
+        
+        # Shielded so one cancelled caller does not cancel the others' fetch
+        metadata = await asyncio.shield(flight[0])
+        
+        # Once shared, every caller gets its own copy to mutate
+        return copy.deepcopy(metadata) if flight[1] else metadata
+    
+    async def _afetch_metadata(self, tool_name: str, category: Optional[ToolCategory],
+                               max_fetchers: Optional[int], deadline: Optional[float],
+                               refresh: bool, host_limiter: HostLimiter) -> UnifiedMetadata:
+        """Run one afetch_metadata() call (see there)."""
         start_time = time.time()
         
-        # Determine which fetchers to use
+        if deadline is None:
+            deadline = self.config.fetch_deadline
+        
+        fetchers = self._select_fetchers(tool_name, category, max_fetchers)
+        
+        if not fetchers:
+            logger.warning(f"No fetchers available for tool: {tool_name}")
+            return self._create_empty_metadata(tool_name, category)
+        
+        cache_key = self._merged_cache_key(tool_name, fetchers, category)
+        if not refresh:
+            cached = self._get_cached_result(cache_key, start_time)
+            if cached:
+                return cached
+        
+        if self.config.offline:
+            return self._fetch_offline(tool_name, fetchers, category, start_time)
+        
+        logger.info(f"Using {len(fetchers)} fetchers for {tool_name} (async): "
+                   f"{[f.name for f in fetchers]}")
+        
+        outcome = _FetchOutcome(self, tool_name)
+        end_time = time.time() + deadline if deadline else None
+        tasks = [(fetcher, asyncio.ensure_future(
+                      self._acall_fetcher(fetcher, tool_name, host_limiter, not refresh, end_time)))
+                 for fetcher in fetchers]
+        
+        try:
+            for fetcher, task in tasks:
+                timeout = max(0.0, end_time - time.time()) if end_time else None
+                try:
+                    metadata = await asyncio.wait_for(asyncio.shield(task), timeout)
+                    error = None
+                except asyncio.TimeoutError:
+                    metadata = None
+                    error = FetchTimeoutError(f"no result within {deadline:.2f}s deadline")
+                except Exception as e:
+                    metadata = None
+                    error = e
+                
+                if outcome.add(fetcher, metadata, error):
+                    break
+        finally:
+            for _, task in tasks:
+                task.cancel()
+        
+        return outcome.finish(category, len(fetchers), start_time, 'async', cache_key)
+    
+    async def afetch_many(self, tool_names: Iterable[str],
+                          concurrency: Optional[int] = None,
+                          **kwargs) -> Dict[str, UnifiedMetadata]:
+        """
+        Fetch metadata for many tools on one event loop.
+        
+        Args:
+            tool_names: Names of the tools to fetch
+            concurrency: Maximum number of tools in flight at once
+                (defaults to config.max_workers)
+            **kwargs: Passed through to afetch_metadata
+            
+        Returns:
+            Mapping of tool name to UnifiedMetadata, in input order
+        """
+        tool_names = list(tool_names)
+        semaphore = asyncio.Semaphore(max(1, concurrency or self.config.max_workers))
+        
+        async def fetch_one(tool_name: str) -> UnifiedMetadata:
+            async with semaphore:
+                return await self.afetch_metadata(tool_name, **kwargs)
+        
+        results = await asyncio.gather(*(fetch_one(name) for name in tool_names))
+        return dict(zip(tool_names, results))
+    
+    def _canonical_name(self, tool_name: str) -> str:
+        """Map a tool name through the registry's normalizer, if any."""
+        return self.normalizer(tool_name) if self.normalizer else tool_name
+    
+    def _select_fetchers(self, tool_name: str, category: Optional[ToolCategory] = None,
+                         max_fetchers: Optional[int] = None) -> List[BaseFetcher]:
+        """Determine which fetchers to use for a tool, in priority order."""
         if category:
             fetchers = self.get_fetchers_for_category(category)
         else:
@@ -186,65 +560,208 @@ class FetcherRegistry:
         if max_fetchers:
             fetchers = fetchers[:max_fetchers]
         
-        if not fetchers:
-            logger.warning(f"No fetchers available for tool: {tool_name}")
-            return self._create_empty_metadata(tool_name, category)
+        return fetchers
+    
+    def _fetch_offline(self, tool_name: str, fetchers: List[BaseFetcher],
+                       category: Optional[ToolCategory], start_time: float) -> UnifiedMetadata:
+        """
+        Merge the fetchers' cached results without network access.
         
-        logger.info(f"Using {len(fetchers)} fetchers for {tool_name}: "
-                   f"{[f.name for f in fetchers]}")
+        Only fetchers that work offline (local data) are run. Other
+        fetchers with nothing cached are listed under
+        raw_data['registry']['cache_misses'].
         
-        # Try fetchers in priority order
-        best_metadata = None
-        successful_fetchers = []
-        failed_fetchers = []
+        Raises:
+            CacheMissError: If no fetcher has a cached result for the tool
+        """
+        outcome = _FetchOutcome(self, tool_name)
+        misses = []
+        for fetcher in fetchers:
+            if fetcher.works_offline:
+                metadata = fetcher.fetch_with_timing(tool_name)
+            else:
+                metadata = fetcher._get_cached_metadata(tool_name)
+            if metadata is None and not fetcher.works_offline:
+                misses.append(fetcher.name)
+            if outcome.add(fetcher, metadata):
+                break
+        
+        if outcome.best_metadata is None:
+            raise CacheMissError(f"Offline: no cached metadata for {tool_name}")
+        
+        if misses:
+            logger.warning(f"Offline: no cached {', '.join(misses)} results for {tool_name}")
+        metadata = outcome.finish(category, len(fetchers), start_time, 'offline')
+        metadata.raw_data['registry']['cache_misses'] = misses
+        return metadata
+    
+    def _merged_result_ttl(self) -> int:
+        """Get how long merged results are cached (0 disables caching)."""
+        if not self.config.enable_caching:
+            return 0
+        ttl = self.config.registry_cache_ttl
+        return self.config.cache_ttl if ttl is None else ttl
+    
+    def _merged_cache_key(self, tool_name: str, fetchers: List[BaseFetcher],
+                          category: Optional[ToolCategory] = None) -> str:
+        """
+        Build the cache key for a merged result.
         
+        Covers the normalized tool name, the fetchers that would run (with
+        their cache versions and fingerprints) and the config fingerprint,
+        so registering a fetcher or changing credentials or settings that
+        change results misses the cache.
+        """
+        return make_cache_key(
+            "registry/merged",
+            tool=tool_name.strip().lower(),
+            category=category.value if category else None,
+            fetchers=[[fetcher.name, fetcher.cache_version, fetcher.get_cache_fingerprint()]
+                      for fetcher in fetchers],
+            config=self.config.get_cache_fingerprint()
+        )
+    
+    def _get_cached_result(self, cache_key: str, start_time: float) -> Optional[UnifiedMetadata]:
+        """Get a cached merged result, marked as served from the cache."""
+        if self._merged_result_ttl() <= 0:
+            return None
+        
+        data = self.config.get_cache_manager().get(cache_key, "metadata")
+        if not data:
+            return None
+        
+        try:
+            metadata = UnifiedMetadata.from_dict(data)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cached result {cache_key}: {e}")
+            return None
+        
+        metadata.fetch_duration = time.time() - start_time
+        metadata.raw_data.setdefault('registry', {})['cached'] = True
+        logger.info(f"Using cached merged metadata for {metadata.name}")
+        return metadata
+    
+    def _cache_result(self, cache_key: str, metadata: UnifiedMetadata) -> None:
+        """Cache a merged result."""
+        ttl = self._merged_result_ttl()
+        if ttl > 0:
+            self.config.get_cache_manager().set(cache_key, metadata_cache_entry(metadata), "metadata", ttl=ttl)
+    
+    def _run_sequential(self, fetchers: List[BaseFetcher], tool_name: str,
+                        host_limiter: HostLimiter, use_cache: bool = True) -> Iterator[FetchResult]:
+        """Run fetchers one after another, yielding results in priority order."""
         for fetcher in fetchers:
+            logger.debug(f"Trying {fetcher.name} for {tool_name}")
             try:
-                logger.debug(f"Trying {fetcher.name} for {tool_name}")
-                
-                metadata = fetcher.fetch_with_timing(tool_name)
-                
-                if metadata and fetcher.validate_metadata(metadata):
-                    successful_fetchers.append(fetcher.name)
-                    
-                    if best_metadata is None:
-                        best_metadata = metadata
-                    else:
-                        # Merge with existing metadata
-                        best_metadata = self._merge_metadata(best_metadata, metadata)
-                        
-                    logger.info(f"{fetcher.name} successfully fetched metadata for {tool_name}")
-                    
-                    # If we have complete metadata, we can stop early
-                    if best_metadata.is_complete():
-                        logger.info(f"Complete metadata obtained for {tool_name}, stopping early")
-                        break
-                        
-                else:
-                    logger.debug(f"{fetcher.name} returned invalid metadata for {tool_name}")
-                    
+                yield fetcher, self._call_fetcher(fetcher, tool_name, host_limiter, use_cache), None
             except Exception as e:
-                failed_fetchers.append(fetcher.name)
-                logger.warning(f"{fetcher.name} failed to fetch {tool_name}: {e}")
-        
-        # If no fetcher succeeded, create empty metadata
-        if best_metadata is None:
-            logger.warning(f"All fetchers failed for {tool_name}")
-            best_metadata = self._create_empty_metadata(tool_name, category)
+                yield fetcher, None, e
+    
+    def _run_parallel(self, fetchers: List[BaseFetcher], tool_name: str,
+                      host_limiter: HostLimiter, deadline: Optional[float] = None,
+                      use_cache: bool = True) -> Iterator[FetchResult]:
+        """
+        Run fetchers concurrently, yielding results in priority order.
+        
+        Fetchers that have not finished by the deadline are reported with a
+        FetchTimeoutError. Pending work is cancelled once the consumer stops
+        iterating (e.g. after complete metadata was obtained). A fetcher
+        already running cannot be cancelled; it runs under the deadline
+        (see request_deadline()), so it frees its worker at its next
+        request instead of holding it for a full request timeout.
+        """
+        executor = self._get_executor()
+        end_time = time.time() + deadline if deadline else None
+        futures = [(fetcher, executor.submit(self._call_fetcher, fetcher, tool_name,
+                                                     host_limiter, use_cache, end_time))
+                   for fetcher in fetchers]
+        
+        try:
+            for fetcher, future in futures:
+                timeout = max(0.0, end_time - time.time()) if end_time else None
+                try:
+                    yield fetcher, future.result(timeout=timeout), None
+                except FuturesTimeoutError:
+                    future.cancel()
+                    yield fetcher, None, FetchTimeoutError(
+                        f"no result within {deadline:.2f}s deadline")
+                except Exception as e:
+                    yield fetcher, None, e
+        finally:
+            for _, future in futures:
+                future.cancel()
+    
+    def _call_fetcher(self, fetcher: BaseFetcher, tool_name: str, host_limiter: HostLimiter,
+                      use_cache: bool = True,
+                      end_time: Optional[float] = None) -> Optional[UnifiedMetadata]:
+        """
+        Run one fetcher while holding a slot on each host it contacts.
         
-        # Add registry information
-        end_time = time.time()
-        best_metadata.fetch_duration = end_time - start_time
-        best_metadata.raw_data['registry'] = {
-            'successful_fetchers': successful_fetchers,
-            'failed_fetchers': failed_fetchers,
-            'total_fetchers_tried': len(fetchers)
-        }
+        Its requests are bounded by end_time (a time.time() deadline), and
+        a fetcher whose host slot only frees up after end_time is not run.
+        """
+        with host_limiter.slot(*fetcher.get_hosts()):
+            if end_time is not None and time.time() >= end_time:
+                raise FetchTimeoutError("deadline passed while waiting for a host slot")
+            with request_deadline(end_time):
+                return fetcher.fetch_with_timing(tool_name, use_cache)
+    
+    async def _acall_fetcher(self, fetcher: BaseFetcher, tool_name: str, host_limiter: HostLimiter,
+                             use_cache: bool = True,
+                             end_time: Optional[float] = None) -> Optional[UnifiedMetadata]:
+        """Async counterpart of _call_fetcher(), sharing its host slots."""
+        async with host_limiter.aslot(*fetcher.get_hosts()):
+            if end_time is not None and time.time() >= end_time:
+                raise FetchTimeoutError("deadline passed while waiting for a host slot")
+            with request_deadline(end_time):
+                return await fetcher.afetch_with_timing(tool_name, use_cache)
+    
+    def _schedule_refresh(self, tool_name: str, fetchers: List[BaseFetcher]) -> None:
+        """Refresh stale cached results on the worker pool, once per fetcher and tool."""
+        if self.config.offline:
+            return
         
-        logger.info(f"Registry completed fetch for {tool_name} in {best_metadata.fetch_duration:.2f}s "
-                   f"(successful: {len(successful_fetchers)}, failed: {len(failed_fetchers)})")
+        for fetcher in fetchers:
+            refresh_id = (fetcher.name, tool_name.strip().lower())
+            with self._refresh_lock:
+                if refresh_id in self._refreshing:
+                    continue
+                self._refreshing.add(refresh_id)
+            
+            logger.info(f"Serving stale {fetcher.name} result for {tool_name}, refreshing in background")
+            self._get_executor().submit(self._refresh, fetcher, tool_name, refresh_id)
+    
+    def _refresh(self, fetcher: BaseFetcher, tool_name: str, refresh_id: Tuple[str, str]) -> None:
+        try:
+            with self.host_limiter.slot(*fetcher.get_hosts()):
+                fetcher.refresh(tool_name)
+        except Exception as e:
+            logger.warning(f"Background refresh of {tool_name} by {fetcher.name} failed: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(refresh_id)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the worker pool used for parallel fetches, creating it on demand."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.config.max_workers),
+                    thread_name_prefix="fetcher"
+                )
+            return self._executor
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the worker pool used for parallel fetches.
         
-        return best_metadata
+        Args:
+            wait: Wait for running fetchers to finish
+        """
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
     
     def _create_empty_metadata(self, tool_name: str, 
                               category: Optional[ToolCategory] = None) -> UnifiedMetadata:
@@ -341,4 +858,112 @@ class FetcherRegistry:
         return f"FetcherRegistry(fetchers={len(self._fetchers)})"
     
     def __repr__(self) -> str:
-        return f"FetcherRegistry(config={self.config}, fetchers={len(self._fetchers)})" 
\ No newline at end of file
+        return f"FetcherRegistry(config={self.config}, fetchers={len(self._fetchers)})"
+
+
+class _FetchOutcome:
+    """
+    Accumulates fetcher results for one tool in priority order.
+    
+    Shared by the sequential, parallel and async registry paths so they all
+    merge and report results the same way.
+    """
+    
+    def __init__(self, registry: FetcherRegistry, tool_name: str):
+        self.registry = registry
+        self.tool_name = tool_name
+        self.best_metadata: Optional[UnifiedMetadata] = None
+        self.successful_fetchers: List[str] = []
+        self.failed_fetchers: List[str] = []
+        self.timed_out_fetchers: List[str] = []
+        self.stale_fetchers: List[BaseFetcher] = []
+        self.downloads: Dict[str, Dict[str, int]] = {}
+    
+    def add(self, fetcher: BaseFetcher, metadata: Optional[UnifiedMetadata],
+            error: Optional[Exception] = None) -> bool:
+        """
+        Record one fetcher's result.
+        
+        Returns:
+            True once the merged metadata is complete and fetching can stop
+        """
+        tool_name = self.tool_name
+        
+        if error is not None:
+            if isinstance(error, FetchTimeoutError):
+                self.timed_out_fetchers.append(fetcher.name)
+            self.failed_fetchers.append(fetcher.name)
+            logger.warning(f"{fetcher.name} failed to fetch {tool_name}: {error}")
+            return False
+        
+        if metadata and 'downloads' in metadata.raw_data:
+            self.downloads[fetcher.name] = metadata.raw_data.pop('downloads')
+        
+        if not (metadata and fetcher.validate_metadata(metadata)):
+            logger.debug(f"{fetcher.name} returned invalid metadata for {tool_name}")
+            return False
+        
+        self.successful_fetchers.append(fetcher.name)
+        if metadata.raw_data.pop('cache_stale', False):
+            self.stale_fetchers.append(fetcher)
+        
+        if self.best_metadata is None:
+            self.best_metadata = metadata
+        else:
+            # Merge with existing metadata
+            self.best_metadata = self.registry._merge_metadata(self.best_metadata, metadata)
+        
+        logger.info(f"{fetcher.name} successfully fetched metadata for {tool_name}")
+        
+        # If we have complete metadata, we can stop early
+        if self.best_metadata.is_complete():
+            logger.info(f"Complete metadata obtained for {tool_name}, stopping early")
+            return True
+        
+        return False
+    
+    def finish(self, category: Optional[ToolCategory], total_fetchers: int,
+               start_time: float, mode: str,
+               cache_key: Optional[str] = None) -> UnifiedMetadata:
+        """
+        Build the final metadata with registry information attached.
+        
+        Complete outcomes are cached under cache_key; results that are
+        empty, stale or missing a fetcher that failed or timed out are not,
+        so a transient error is retried on the next call.
+        """
+        tool_name = self.tool_name
+        best_metadata = self.best_metadata
+        
+        # If no fetcher succeeded, create empty metadata
+        if best_metadata is None:
+            logger.warning(f"All fetchers failed for {tool_name}")
+            best_metadata = self.registry._create_empty_metadata(tool_name, category)
+        
+        # Add registry information
+        end_time = time.time()
+        best_metadata.fetch_duration = end_time - start_time
+        best_metadata.raw_data['registry'] = {
+            'successful_fetchers': self.successful_fetchers,
+            'failed_fetchers': self.failed_fetchers,
+            'timed_out_fetchers': self.timed_out_fetchers,
+            'stale_fetchers': [fetcher.name for fetcher in self.stale_fetchers],
+            'stale': bool(self.stale_fetchers),
+            'total_fetchers_tried': total_fetchers,
+            'mode': mode,
+            'cached': False,
+            'downloads': self.downloads,
+            'bytes_read': sum(counts['bytes_read'] for counts in self.downloads.values()),
+            'truncated_responses': sum(counts['truncated'] for counts in self.downloads.values())
+        }
+        
+        if self.stale_fetchers:
+            self.registry._schedule_refresh(tool_name, self.stale_fetchers)
+        elif cache_key and self.successful_fetchers and not self.failed_fetchers:
+            self.registry._cache_result(cache_key, best_metadata)
+        
+        logger.info(f"Registry completed fetch for {tool_name} in {best_metadata.fetch_duration:.2f}s "
+                   f"(successful: {len(self.successful_fetchers)}, "
+                   f"failed: {len(self.failed_fetchers)})")
+        
+        return best_metadata
@@ -0,0 +1,337 @@
+"""
+Shared HTTP transport for the MetadataFetcher system.
+Keeps one pooled keep-alive session per configuration so connections are
+reused across fetchers and across tools in a batch, and optionally caches
+GET responses with conditional revalidation.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from .limits import ByteBudget, RateLimiter, SingleFlight
+from .cache import CacheManager, CacheMissError, make_cache_key
+import logging
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode "br" responses)
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Request headers that change the response and so belong in the cache key
+CACHE_KEY_HEADERS = ('accept', 'accept-language', 'authorization')
+
+# Response headers kept with a cached body
+CACHED_RESPONSE_HEADERS = ('content-type', 'etag', 'last-modified')
+
+# GET options under which identical concurrent requests may share one response
+COALESCABLE_OPTIONS = {'params', 'headers', 'timeout', 'allow_redirects'}
+
+# Chunk size for streamed response bodies
+STREAM_CHUNK_SIZE = 16384
+
+# time.time() by which requests made in this context must be done (see
+# request_deadline()). A context variable so it follows a fetcher into the
+# threads running it.
+_request_deadline = contextvars.ContextVar('request_deadline', default=None)
+
+@contextmanager
+def request_deadline(deadline: Optional[float]) -> Iterator[None]:
+    """
+    Bound the requests made inside a with block by a wall-clock deadline.
+    
+    Request timeouts are shortened to the time left, and requests started
+    after the deadline raise requests.Timeout, so a fetcher abandoned at
+    its deadline stops at its next request instead of running on.
+    
+    Args:
+        deadline: time.time() value, or None for no deadline; an enclosing
+            earlier deadline still applies
+    """
+    current = _request_deadline.get()
+    if deadline is None or (current is not None and current <= deadline):
+        yield
+        return
+    
+    token = _request_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+class HttpTransport:
+    """
+    Pooled HTTP client used by every fetcher.
+    
+    Wraps a single requests.Session with per-host keep-alive pools, applies
+    compression and default timeouts uniformly, and waits on the shared
+    rate limiter before each request.
+    
+    GET requests made with cached=True are stored in the response cache
+    together with their ETag / Last-Modified validators. Once an entry is
+    stale it is refreshed with If-None-Match / If-Modified-Since, and a
+    304 Not Modified renews it without transferring the body.
+    
+    Identical GET requests issued concurrently (same URL, parameters and
+    headers) are coalesced: one goes out and the others share its response.
+    
+    An offline transport never touches the network: cached GET requests
+    are answered from the cache however old the entry, and everything
+    else raises CacheMissError.
+    """
+    
+    def __init__(self, timeout: float = 10.0, pool_connections: int = 20,
+                 pool_maxsize: int = 10, rate_limiter: Optional[RateLimiter] = None,
+                 headers: Optional[Dict[str, str]] = None,
+                 cache: Optional[CacheManager] = None, cache_ttl: int = 86400,
+                 cache_retention: int = 7 * 86400, offline: bool = False):
+        """
+        Initialize the transport.
+        
+        Args:
+            timeout: Default request timeout in seconds
+            pool_connections: Number of hosts to keep connection pools for
+            pool_maxsize: Keep-alive connections kept per host
+            rate_limiter: Per-host rate limiter applied to every request
+            headers: Extra default headers sent with every request
+            cache: Response cache for cached=True requests (None disables it)
+            cache_ttl: Seconds a cached response is used without revalidation
+            cache_retention: Seconds a stale response with validators is kept
+                for conditional refresh
+            offline: Serve only from the response cache (see class docstring)
+        """
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.cache_retention = cache_retention
+        self.offline = offline
+        self._flights = SingleFlight(copy_result=self._copy_response)
+        self._lock = threading.Lock()
+        self._closed = False
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        encodings = 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate'
+        self.session.headers['Accept-Encoding'] = encodings
+        if headers:
+            self.session.headers.update(headers)
+    
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a request through the pooled session.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed to requests.Session.request; timeout defaults
+                to the transport timeout
+        
+        Returns:
+            The response
+            
+        Raises:
+            CacheMissError: If the transport is offline
+        """
+        if self.offline:
+            raise CacheMissError(f"Offline: {method} {url} is not in the cache")
+        kwargs.setdefault('timeout', self.timeout)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url)
+        
+        deadline = _request_deadline.get()
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise requests.Timeout(f"Deadline passed before {method} {url}")
+            timeout = kwargs['timeout']
+            if isinstance(timeout, tuple):
+                kwargs['timeout'] = tuple(remaining if part is None else min(part, remaining)
+                                          for part in timeout)
+            else:
+                kwargs['timeout'] = remaining if timeout is None else min(timeout, remaining)
+        return self.session.request(method, url, **kwargs)
+    
+    def get(self, url: str, cached: bool = False, cache_ttl: Optional[int] = None,
+            **kwargs: Any) -> requests.Response:
+        """
+        Send a GET request.
+        
+        Args:
+            url: Request URL
+            cached: Serve and store the response through the response cache
+            cache_ttl: Freshness lifetime for this response (defaults to
+                the transport's cache_ttl)
+            **kwargs: Passed to request()
+            
+        Returns:
+            The response; responses served from the cache have
+            from_cache set to True
+        """
+        if not set(kwargs) <= COALESCABLE_OPTIONS:
+            return self._get(url, cached, cache_ttl, **kwargs)
+        
+        flight_key = make_cache_key("http/GET", url=url, params=kwargs.get('params') or {},
+                                    headers=kwargs.get('headers') or {},
+                                    allow_redirects=kwargs.get('allow_redirects', True),
+                                    cached=cached and self.cache is not None)
+        response, shared = self._flights.do(flight_key, self._get, url, cached, cache_ttl, **kwargs)
+        if shared:
+            logger.debug(f"Shared an in-flight GET {url}")
+        return response
+    
+    def _get(self, url: str, cached: bool, cache_ttl: Optional[int], **kwargs: Any) -> requests.Response:
+        if cached and self.cache is not None:
+            return self._cached_get(url, cache_ttl or self.cache_ttl, **kwargs)
+        return self.request('GET', url, **kwargs)
+    
+    def head(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a HEAD request."""
+        return self.request('HEAD', url, **kwargs)
+    
+    def _cache_key(self, url: str, params: Any, headers: Optional[Dict[str, str]]) -> str:
+        """Build the response cache key for a GET request."""
+        relevant_headers = {
+            name.lower(): value for name, value in (headers or {}).items()
+            if name.lower() in CACHE_KEY_HEADERS
+        }
+        return make_cache_key("http/GET", url=url, params=params or {}, headers=relevant_headers)
+    
+    def _cached_get(self, url: str, ttl: int, **kwargs: Any) -> requests.Response:
+        """Serve a GET request from the response cache, revalidating stale entries."""
+        key = self._cache_key(url, kwargs.get('params'), kwargs.get('headers'))
+        entry = self.cache.get(key, "api")
+        now = time.time()
+        
+        if entry and (self.offline or now < entry['fresh_until']):
+            return self._response_from_entry(entry)
+        
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        
+        response = self.request('GET', url, headers=headers, **kwargs)
+        
+        if response.status_code == 304 and entry:
+            logger.debug(f"Revalidated cached response for {url}")
+            entry['fresh_until'] = now + ttl
+            entry['etag'] = response.headers.get('ETag', entry.get('etag'))
+            entry['last_modified'] = response.headers.get('Last-Modified', entry.get('last_modified'))
+            self._store_entry(key, entry, ttl)
+            return self._response_from_entry(entry)
+        
+        if response.status_code == 200 and 'no-store' not in response.headers.get('Cache-Control', ''):
+            self._store_entry(key, self._entry_from_response(response, now + ttl), ttl)
+        
+        return response
+    
+    def _store_entry(self, key: str, entry: Dict[str, Any], ttl: int) -> None:
+        """Store a response entry, keeping it past expiry when it can be revalidated."""
+        retention = self.cache_retention if entry.get('etag') or entry.get('last_modified') else 0
+        self.cache.set(key, entry, "api", ttl=ttl + retention)
+    
+    @staticmethod
+    def read_body(response: requests.Response, max_bytes: Optional[int] = None,
+                  stop_at: Sequence[bytes] = (), budget: Optional[ByteBudget] = None) -> Tuple[bytes, bool]:
+        """
+        Read a response body incrementally, stopping early when possible.
+        
+        Works on streamed responses (stream=True), which are closed
+        afterwards so their connection returns to the pool, and on
+        responses already read into memory, such as cached ones.
+        
+        Args:
+            response: Response to read
+            max_bytes: Stop after this many bytes (None reads everything)
+            stop_at: Markers (matched case-insensitively) after which the
+                rest of the body is not needed, e.g. b'</head>'
+            budget: Shared allowance the bytes are also taken from
+            
+        Returns:
+            The body read, and whether it was cut short by max_bytes or
+            budget (stopping at a marker is not a truncation)
+        """
+        markers = [marker.lower() for marker in stop_at]
+        overlap = max((len(marker) for marker in markers), default=1) - 1
+        chunks = []
+        size = 0
+        truncated = False
+        try:
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                allowed = len(chunk) if max_bytes is None else min(len(chunk), max_bytes - size)
+                if budget is not None:
+                    allowed = budget.take(allowed)
+                if allowed < len(chunk):
+                    chunk = chunk[:allowed]
+                    truncated = True
+                
+                # Search the new chunk plus enough of the previous one for split markers
+                window = (chunks[-1][-overlap:] if chunks and overlap else b'') + chunk
+                chunks.append(chunk)
+                size += len(chunk)
+                if truncated or any(marker in window.lower() for marker in markers):
+                    break
+        finally:
+            response.close()
+        return b''.join(chunks), truncated
+    
+    @staticmethod
+    def _entry_from_response(response: requests.Response, fresh_until: float) -> Dict[str, Any]:
+        return {
+            'url': response.url,
+            'status_code': response.status_code,
+            'headers': {
+                name: response.headers[name] for name in CACHED_RESPONSE_HEADERS
+                if name in response.headers
+            },
+            'text': response.text,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fresh_until': fresh_until
+        }
+    
+    @staticmethod
+    def _copy_response(response: requests.Response) -> requests.Response:
+        """Shallow-copy a fully read response, keeping attributes like from_cache."""
+        clone = requests.Response.__new__(requests.Response)
+        clone.__dict__.update(response.__dict__)
+        return clone
+    
+    @staticmethod
+    def _response_from_entry(entry: Dict[str, Any]) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry['status_code']
+        response.url = entry['url']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = entry['text'].encode('utf-8')
+        response._content_consumed = True
+        response.encoding = 'utf-8'
+        response.from_cache = True
+        return response
+    
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self.session.close()
+    
+    def __enter__(self) -> 'HttpTransport':
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
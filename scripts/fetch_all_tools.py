@@ -10,7 +10,6 @@ import json
 import yaml
 from pathlib import Path
 from datetime import datetime
-import time
 
 # Add the project root to the path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -111,30 +110,34 @@ class ComprehensiveToolFetcher:
         try:
             print(f"\n🔍 Fetching metadata for: {tool_name}")
             
-            # Get category for the tool
-            category = self.tool_classifications.get(tool_name, ["Unknown"])[0]
-            print(f"📂 Category: {category}")
-            
             # Fetch metadata
             metadata = self.registry.fetch_metadata(tool_name)
             
-            if not metadata:
-                print(f"❌ No metadata found for {tool_name}")
-                return None
-            
-            print(f"✅ Metadata fetched successfully")
-            print(f"  - Name: {metadata.name}")
-            print(f"  - Display Name: {metadata.display_name}")
-            print(f"  - Category: {metadata.category.value if metadata.category else 'Unknown'}")
-            print(f"  - Description: {metadata.description[:100]}..." if metadata.description else "No description")
-            print(f"  - Sources: {metadata.sources}")
-            
-            return metadata
+            return self._report_metadata(tool_name, metadata)
             
         except Exception as e:
             print(f"❌ Error fetching {tool_name}: {e}")
             return None
     
+    def _report_metadata(self, tool_name, metadata):
+        """Print a short report for fetched metadata."""
+        # Get category for the tool
+        category = self.tool_classifications.get(tool_name, ["Unknown"])[0]
+        print(f"📂 Category: {category}")
+        
+        if not metadata:
+            print(f"❌ No metadata found for {tool_name}")
+            return None
+        
+        print(f"✅ Metadata fetched successfully")
+        print(f"  - Name: {metadata.name}")
+        print(f"  - Display Name: {metadata.display_name}")
+        print(f"  - Category: {metadata.category.value if metadata.category else 'Unknown'}")
+        print(f"  - Description: {metadata.description[:100]}..." if metadata.description else "No description")
+        print(f"  - Sources: {metadata.sources}")
+        
+        return metadata
+    
     def export_single_format(self, metadata, tool_name, format_name):
         """Export metadata to a single format."""
         try:
@@ -394,15 +397,14 @@ class ComprehensiveToolFetcher:
         for fmt in self.formats:
             self.results['format_results'][fmt] = {'success': 0, 'failed': 0}
         
-        # Process each tool
-        for i, tool_name in enumerate(self.tools, 1):
+        # Process tools as they finish; the registry caps concurrent requests per host
+        for i, (tool_name, metadata) in enumerate(self.registry.fetch_many(self.tools), 1):
             print(f"\n[{i}/{len(self.tools)}] Processing tool: {tool_name}")
             
             # Initialize tool results
             self.results['tool_results'][tool_name] = {'success': 0, 'failed': 0}
             
-            # Fetch metadata for the tool
-            metadata = self.fetch_single_tool(tool_name)
+            metadata = self._report_metadata(tool_name, metadata)
             
             if metadata:
                 self.results['successful_tools'] += 1
@@ -440,9 +442,6 @@ class ComprehensiveToolFetcher:
                     'metadata': None,
                     'formats_exported': 0
                 })
-            
-            # Add delay to avoid overwhelming APIs
-            time.sleep(1)
         
         # Print final summary
         self._print_final_summary()
@@ -0,0 +1,348 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from metadata.core import FetcherConfig
+from metadata.core.cache import CacheManager, KeyLocks, make_cache_key
+from metadata.core.cache_backends import SnapshotCacheBackend
+from metadata.core.fetchers import PyPIFetcher
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cache_key_is_stable_across_processes():
+    code = ("from metadata.core.cache import make_cache_key; "
+            "print(make_cache_key('ns', url='https://pypi.org', params={'b': 2, 'a': 1}))")
+    keys = {
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                       env={**os.environ, "PYTHONHASHSEED": seed}, check=True).stdout.strip()
+        for seed in ("1", "2")
+    }
+
+    assert keys == {make_cache_key('ns', url='https://pypi.org', params={'a': 1, 'b': 2})}
+
+
+def test_fetcher_cache_keys_ignore_irrelevant_headers_and_track_version(tmp_path):
+    config = FetcherConfig(output_directory=str(tmp_path / "outputs"),
+                           cache_directory=str(tmp_path / "cache"))
+    fetcher = PyPIFetcher(config)
+    url = "https://pypi.org/pypi/requests/json"
+
+    key = fetcher._response_cache_key(url, headers={"Authorization": "token a"})
+    assert key == fetcher._response_cache_key(url, headers={"Authorization": "token b"})
+    assert key != fetcher._response_cache_key(url, headers={"Accept": "application/json"})
+    assert key.startswith("v1/PyPIFetcher@1/api/")
+
+    fetcher.cache_version = "2"
+    assert fetcher._response_cache_key(url) != key
+
+
+def test_delete_prefix_invalidates_namespace(tmp_path):
+    cache = CacheManager(cache_directory=str(tmp_path / "cache"))
+    cache.set(make_cache_key("A@1/metadata", tool="x"), {"v": 1}, "metadata")
+    cache.set(make_cache_key("A@1/metadata", tool="y"), {"v": 2}, "metadata")
+    cache.set(make_cache_key("B@1/metadata", tool="x"), {"v": 3}, "metadata")
+
+    assert cache.delete_prefix("v1/A@1/") == 2
+    assert cache.get(make_cache_key("B@1/metadata", tool="x"), "metadata") == {"v": 3}
+
+
+def test_memory_tier_serves_repeat_lookups_without_disk(tmp_path):
+    cache = CacheManager(cache_directory=str(tmp_path / "cache"))
+    cache.set("key", {"items": [1]}, "api")
+
+    for path in (tmp_path / "cache" / "api").glob("*.json"):
+        path.unlink()
+
+    first = cache.get("key", "api")
+    first["items"].append(2)
+    assert cache.get("key", "api") == {"items": [1]}
+    assert cache.get_stats()['memory']['hits'] == 2
+
+
+def test_memory_tier_respects_entry_and_byte_budgets(tmp_path):
+    cache = CacheManager(cache_directory=str(tmp_path / "cache"),
+                         memory_max_entries=2, memory_max_bytes=40)
+    cache.set("a", "x" * 10, "api")
+    cache.set("b", "y" * 10, "api")
+    cache.get("a", "api")
+    cache.set("c", "z" * 10, "api")
+
+    stats = cache.memory.get_stats()
+    assert stats['entries'] == 2
+    assert stats['bytes'] <= 40
+    assert cache.memory.get("api", "b") == (False, None)
+    assert cache.memory.get("api", "a")[0]
+
+
+def test_memory_tier_expires_with_disk_ttl(tmp_path):
+    cache = CacheManager(cache_directory=str(tmp_path / "cache"))
+    cache.set("short", {"v": 1}, "api", ttl=1)
+    entry = cache.memory._entries[("api", "short")]
+    cache.memory._entries[("api", "short")] = (entry[0], entry[1] - 5)
+
+    assert cache.memory.get("api", "short") == (False, None)
+
+
+def test_sqlite_backend_roundtrip_batch_and_stats(tmp_path):
+    cache = CacheManager(cache_directory=str(tmp_path / "cache"), backend="sqlite",
+                         memory_max_entries=0)
+    cache.set("one", {"v": 1}, "api")
+    cache.set_many({"two": [2], "three": "3"}, "metadata")
+
+    assert cache.get("one", "api") == {"v": 1}
+    assert cache.get_many(["two", "three", "missing"], "metadata") == {"two": [2], "three": "3"}
+
+    stats = cache.get_stats()
+    assert stats['backend'] == "sqlite"
+    assert stats['total_files'] == 3
+    assert stats['cache_types']['metadata']['files'] == 2
+
+    assert cache.delete("one", "api")
+    assert cache.get("one", "api") is None
+    assert cache.clear("metadata") == 2
+
+
+def test_sqlite_backend_cleanup_and_prefix_delete(tmp_path):
+    cache = CacheManager(cache_directory=str(tmp_path / "cache"), backend="sqlite")
+    cache.set("v1/A@1/x", 1, "api", ttl=1)
+    cache.set("v1/A@1/y", 2, "api")
+    cache.set("v1/B@1/z", 3, "api")
+
+    assert cache.backend.cleanup_expired(time.time() + 10) == 1
+    assert cache.delete_prefix("v1/A@1/") == 1
+    assert cache.get("v1/B@1/z", "api") == 3
+
+
+def test_sqlite_backend_is_shared_between_processes(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    code = ("from metadata.core.cache import CacheManager; "
+            f"CacheManager(cache_directory={cache_dir!r}, backend='sqlite').set('shared', {{'pid': 1}}, 'api')")
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+    cache = CacheManager(cache_directory=cache_dir, backend="sqlite")
+    assert cache.get("shared", "api") == {"pid": 1}
+
+
+def test_file_backend_stats_come_from_index(tmp_path):
+    cache = CacheManager(cache_directory=str(tmp_path / "cache"))
+    cache.set("a", {"v": 1}, "api")
+    cache.set("b", {"v": 2}, "metadata", ttl=1)
+
+    for path in (tmp_path / "cache").glob("*/*.json"):
+        path.write_text("not json")
+
+    stats = cache.get_stats()
+    assert stats['total_files'] == 2
+    assert stats['cache_types']['api']['files'] == 1
+    assert stats['expired_files'] == 0
+
+
+def test_incremental_expiry_sweep(tmp_path):
+    for backend in ("file", "sqlite"):
+        cache = CacheManager(cache_directory=str(tmp_path / backend), backend=backend)
+        for i in range(5):
+            cache.set(f"old{i}", i, "api", ttl=1)
+        cache.set("fresh", "x", "api")
+
+        later = time.time() + 10
+        assert cache.backend.cleanup_expired(later, limit=2) == 2
+        assert cache.backend.get_stats(later)['expired_files'] == 3
+        assert cache.backend.cleanup_expired(later) == 3
+        assert cache.get_stats()['total_files'] == 1
+
+
+def test_file_backend_indexes_existing_cache(tmp_path):
+    cache_dir = tmp_path / "cache"
+    CacheManager(cache_directory=str(cache_dir)).set("kept", 1, "api")
+    (cache_dir / "index.sqlite3").unlink()
+    (cache_dir / "api" / "corrupt.json").write_text("{")
+
+    cache = CacheManager(cache_directory=str(cache_dir))
+    assert cache.get_stats()['total_files'] == 1
+    assert not (cache_dir / "api" / "corrupt.json").exists()
+
+
+def test_large_entries_are_compressed_and_old_entries_still_read(tmp_path):
+    cache_dir = tmp_path / "cache"
+    legacy = CacheManager(cache_directory=str(cache_dir), pretty=True, compression="none")
+    legacy.set("old", {"readme_content": "x" * 10000}, "metadata")
+    legacy_size = legacy.get_stats()['total_size']
+
+    cache = CacheManager(cache_directory=str(cache_dir), memory_max_entries=0)
+    cache.set("new", {"readme_content": "x" * 10000}, "metadata")
+    cache.set("small", {"v": 1}, "metadata")
+
+    new_path = cache.backend._get_cache_path("new", "metadata")
+    assert new_path.read_bytes().startswith(b"MFz1")
+    assert new_path.stat().st_size * 10 < legacy_size
+    small = cache.backend._get_cache_path("small", "metadata").read_bytes()
+    assert small.startswith(b'{"data":{"v":1},') and b"\n" not in small
+    assert cache.get("old", "metadata") == {"readme_content": "x" * 10000}
+    assert cache.get("new", "metadata") == {"readme_content": "x" * 10000}
+
+
+def test_sqlite_backend_compresses_large_entries(tmp_path):
+    cache = CacheManager(cache_directory=str(tmp_path / "cache"), backend="sqlite",
+                         memory_max_entries=0)
+    cache.set("big", ["y" * 10000], "api")
+
+    assert cache.get_stats()['total_size'] < 1000
+    assert cache.get("big", "api") == ["y" * 10000]
+
+
+def test_negative_cache_can_be_disabled_per_fetcher(tmp_path):
+    config = FetcherConfig(output_directory=str(tmp_path / "outputs"),
+                           cache_directory=str(tmp_path / "cache"),
+                           negative_cache_ttls={"PyPIFetcher": 0})
+    fetcher = PyPIFetcher(config)
+    fetcher._cache_miss("status 404", tool="missing")
+
+    assert not fetcher._is_cached_miss(tool="missing")
+    assert config.get_cache_manager().get_stats()['cache_types'].get('negative') is None
+
+
+def test_quota_evicts_least_recently_used(tmp_path):
+    for backend in ("file", "sqlite"):
+        cache = CacheManager(cache_directory=str(tmp_path / backend), backend=backend,
+                             quotas={"api": {"max_entries": 3}})
+        for key in ("a", "b", "c"):
+            cache.set(key, key, "api")
+            time.sleep(0.01)
+        cache.get("a", "api")
+        cache.set("d", "d", "api")
+
+        assert cache.get_stats()['cache_types']['api']['files'] == 2
+        assert cache.get("a", "api") == "a" and cache.get("d", "api") == "d"
+        assert cache.get("b", "api") is None and cache.get("c", "api") is None
+        assert cache.evictions == 2
+
+
+def test_quota_evicts_least_frequently_used_within_byte_budget(tmp_path):
+    cache = CacheManager(cache_directory=str(tmp_path / "cache"), backend="sqlite",
+                         eviction="lfu", quotas={"metadata": {"max_bytes": 300}})
+    for key in ("hot", "warm", "cold"):
+        cache.set(key, key * 20, "metadata")
+    for _ in range(3):
+        cache.get("hot", "metadata")
+    cache.get("warm", "metadata")
+    cache.set("new", "n" * 200, "metadata")
+
+    stats = cache.get_stats()['cache_types']['metadata']
+    assert stats['size'] <= 300
+    assert cache.get("cold", "metadata") is None
+    assert cache.get("hot", "metadata") == "hot" * 20
+
+
+def test_snapshot_export_mount_and_import(tmp_path, monkeypatch):
+    source = CacheManager(cache_directory=str(tmp_path / "source"), default_ttl=60)
+    source.set("api-key", {"text": "x" * 5000}, "api")
+    source.set("meta-key", {"name": "requests"}, "metadata")
+    source.set("config-key", {"skip": True}, "config")
+    bundle = tmp_path / "bundle.mfsnap"
+
+    assert source.export_snapshot(str(bundle)) == {"api": 1, "metadata": 1}
+
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 3600)
+    mounted = CacheManager(backend=SnapshotCacheBackend(str(bundle)), memory_max_entries=0)
+    assert mounted.get("meta-key", "metadata") == {"name": "requests"}
+    assert mounted.get("api-key", "api") == {"text": "x" * 5000}
+    assert mounted.get("config-key", "config") is None
+    mounted.set("new-key", {}, "metadata")
+    assert mounted.get("new-key", "metadata") is None
+    assert mounted.get_stats()['total_files'] == 2
+    mounted.close()
+
+    monkeypatch.setattr(time, "time", real_time)
+    target = CacheManager(cache_directory=str(tmp_path / "target"), backend="sqlite")
+    assert target.import_snapshot(str(bundle)) == {"api": 1, "metadata": 1}
+    assert target.get("meta-key", "metadata") == {"name": "requests"}
+
+
+def test_snapshot_rejects_other_files(tmp_path):
+    path = tmp_path / "not-a-snapshot"
+    path.write_bytes(b"{}" * 20)
+
+    with pytest.raises(ValueError):
+        SnapshotCacheBackend(str(path))
+
+
+def test_concurrent_file_writes_never_expose_partial_entries(tmp_path):
+    cache = CacheManager(cache_directory=str(tmp_path / "cache"), memory_max_entries=0,
+                         compress_threshold=10 ** 9)
+    reader = CacheManager(cache_directory=str(tmp_path / "cache"), memory_max_entries=0)
+    cache.set("key", {"n": 0, "pad": "x" * 100000}, "metadata")
+    stop = threading.Event()
+
+    def write():
+        n = 0
+        while not stop.is_set():
+            n += 1
+            cache.set("key", {"n": n, "pad": "x" * 100000}, "metadata")
+
+    writers = [threading.Thread(target=write) for _ in range(2)]
+    for writer in writers:
+        writer.start()
+    try:
+        reads = [reader.get("key", "metadata") for _ in range(200)]
+    finally:
+        stop.set()
+        for writer in writers:
+            writer.join()
+
+    assert all(data is not None and len(data["pad"]) == 100000 for data in reads)
+
+
+def test_key_locks_are_shared_between_processes(tmp_path):
+    lock_dir = str(tmp_path / "locks")
+    code = ("import sys, time; from metadata.core.cache import KeyLocks; "
+            f"locks = KeyLocks({lock_dir!r}); "
+            "handle = locks.acquire('tool'); print('locked', flush=True); "
+            "time.sleep(1); locks.release(handle)")
+    holder = subprocess.Popen([sys.executable, "-c", code], cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+        locks = KeyLocks(lock_dir)
+
+        with locks.hold("other", timeout=0) as acquired:
+            assert acquired
+        with locks.hold("tool", timeout=0.1) as acquired:
+            assert not acquired
+
+        start = time.time()
+        with locks.hold("tool", timeout=10) as acquired:
+            assert acquired and time.time() - start > 0.3
+    finally:
+        holder.wait()
+
+    # Lock files only exist while their key is locked
+    assert os.listdir(lock_dir) == []
+
+
+def test_key_locks_serialize_threads_across_deleted_lock_files(tmp_path):
+    locks = [KeyLocks(tmp_path / "locks", poll_interval=0.001) for _ in range(4)]
+    active = []
+    peak = []
+
+    def work(locks):
+        for _ in range(25):
+            with locks.hold("tool") as acquired:
+                assert acquired
+                active.append(1)
+                peak.append(len(active))
+                time.sleep(0.0005)
+                active.pop()
+
+    threads = [threading.Thread(target=work, args=(instance,)) for instance in locks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 1 and len(peak) == 100
+    assert os.listdir(tmp_path / "locks") == []
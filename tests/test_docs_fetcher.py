@@ -0,0 +1,193 @@
+import time
+
+from bs4 import BeautifulSoup
+
+from metadata.core import FetcherConfig, FetcherRegistry
+from metadata.core.fetchers import DocsFetcher
+from metadata.core.fetchers.docs import PROBE_WORKERS
+
+
+def make_config(tmp_path, **kwargs):
+    return FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "cache"),
+        **kwargs
+    )
+
+
+def test_docs_probe_misses_are_remembered_and_purgeable(tmp_path, monkeypatch):
+    config = make_config(tmp_path, negative_cache_ttl=60)
+    fetcher = DocsFetcher(config)
+    probes = []
+
+    def fake_head(url, **kwargs):
+        probes.append(url)
+        if "://docs." in url:
+            raise TimeoutError(url)
+        return type("Response", (), {"status_code": 404})()
+
+    monkeypatch.setattr(fetcher.transport, "head", fake_head)
+
+    assert fetcher._find_documentation_url("nothing") is None
+    assert len(probes) == 9
+
+    # Only the 404s are remembered; timed-out hosts are probed again
+    assert fetcher._find_documentation_url("nothing") is None
+    assert len(probes) == 13 and all("://docs." in url for url in probes[9:])
+
+    assert fetcher.purge_cached_misses() == 5
+    fetcher._find_documentation_url("nothing")
+    assert len(probes) == 22
+
+
+def test_docs_probes_run_concurrently_in_priority_order(tmp_path, monkeypatch):
+    config = make_config(tmp_path)
+    fetcher = DocsFetcher(config)
+    probes = []
+
+    def fake_head(url, **kwargs):
+        probes.append(url)
+        # The best pattern answers last, a lower-ranked one answers first
+        time.sleep(0.3 if "docs.tool.org" in url else 0.05)
+        status = 200 if url in ("https://docs.tool.org", "https://tool.dev") else 404
+        return type("Response", (), {"status_code": status})()
+
+    monkeypatch.setattr(fetcher.transport, "head", fake_head)
+
+    start = time.time()
+    assert fetcher._find_documentation_url("tool") == "https://docs.tool.org"
+    assert time.time() - start < 0.6
+    assert len(probes) == 9
+
+    assert fetcher._find_documentation_url("tool") == "https://docs.tool.org"
+    assert len(probes) == 9
+
+
+def test_docs_probes_below_the_answer_are_cancelled(tmp_path, monkeypatch):
+    fetcher = DocsFetcher(make_config(tmp_path))
+    probes = []
+
+    def fake_head(url, **kwargs):
+        probes.append(url)
+        time.sleep(0.1 if "docs.tool.org" in url else 0.3)
+        status = 200 if "docs.tool.org" in url else 404
+        return type("Response", (), {"status_code": status})()
+
+    monkeypatch.setattr(fetcher.transport, "head", fake_head)
+
+    assert fetcher._find_documentation_url("tool") == "https://docs.tool.org"
+    # Only the first batch (and at most one probe picked up as the answer
+    # arrived) ever starts
+    assert len(probes) <= PROBE_WORKERS + 1 < 9
+
+
+class FakeResponse:
+    def __init__(self, url, status_code, text, error=None):
+        self.url, self.status_code, self.text, self.error = url, status_code, text, error
+        self.headers, self.encoding = {"Content-Type": "text/html"}, "utf-8"
+        self.bytes_served = 0
+
+    def iter_content(self, chunk_size):
+        data = self.text.encode()
+        for start in range(0, len(data), chunk_size):
+            if self.error:
+                raise self.error
+            self.bytes_served += len(data[start:start + chunk_size])
+            yield data[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+def serve(monkeypatch, fetcher, responses):
+    """Answer GETs from a url -> FakeResponse map (404 otherwise), recording the URLs."""
+    fetched = []
+
+    def fake_get(url, **kwargs):
+        fetched.append(url)
+        return responses.get(url) or FakeResponse(url, 404, "")
+
+    monkeypatch.setattr(fetcher.transport, "get", fake_get)
+    return fetched
+
+
+INSTALL_PAGE = "<pre>$ pip install tool\nconda install -c bioconda tool</pre>" + "x" * 100
+
+
+def test_docs_crawl_reads_install_pages_within_budget(tmp_path, monkeypatch):
+    fetcher = DocsFetcher(make_config(tmp_path, docs_crawl=True, docs_crawl_max_pages=2,
+                                      docs_crawl_max_bytes=600))
+    sitemap = "".join(f"<url><loc>https://docs.tool.org/{page}</loc></url>" for page in
+                      ("blog/news", "en/latest/installation", "setup", "quickstart", "api",
+                       "https://elsewhere.org/install"))
+    pages = {
+        "https://docs.tool.org/en/latest/installation": INSTALL_PAGE,
+        "https://docs.tool.org/quickstart": "<code>tool run</code>" + "y" * 300,
+    }
+    responses = {url: FakeResponse(url, 200, text) for url, text in pages.items()}
+    responses["https://docs.tool.org/sitemap.xml"] = FakeResponse(
+        "https://docs.tool.org/sitemap.xml", 200, f"<urlset>{sitemap}</urlset>")
+    fetched = serve(monkeypatch, fetcher, responses)
+
+    landing = BeautifulSoup("<a href='/install'>Install</a>", "html.parser")
+    methods = fetcher._crawl_installation_methods("https://docs.tool.org/", landing, "tool")
+
+    assert [m["command"] for m in methods] == ["pip install tool", "conda install -c bioconda tool"]
+    assert methods[0]["method"] == "pip"
+    assert sorted(fetched[1:]) == sorted(pages)
+
+
+def test_docs_crawl_cuts_pages_off_at_the_byte_budget(tmp_path, monkeypatch):
+    fetcher = DocsFetcher(make_config(tmp_path, docs_crawl=True, docs_crawl_max_bytes=10))
+    url = "https://docs.tool.org/install"
+    serve(monkeypatch, fetcher, {url: FakeResponse(url, 200, INSTALL_PAGE)})
+
+    # No sitemap, so the landing page's links are crawled
+    landing = BeautifulSoup("<a href='/install'>Install</a>", "html.parser")
+    assert fetcher._crawl_installation_methods("https://docs.tool.org/", landing, "tool") == []
+
+
+def test_docs_crawl_survives_failing_pages_and_huge_sitemaps(tmp_path, monkeypatch):
+    fetcher = DocsFetcher(make_config(tmp_path, docs_crawl=True, docs_crawl_max_bytes=2000))
+    good, bad = "https://docs.tool.org/install", "https://docs.tool.org/quickstart"
+    sitemap_url = "https://docs.tool.org/sitemap.xml"
+    sitemap = FakeResponse(sitemap_url, 200, "<urlset>" + "".join(
+        f"<url><loc>{url}</loc></url>" for url in [good, bad] + [
+            f"https://docs.tool.org/page{i}" for i in range(10000)]))
+    serve(monkeypatch, fetcher, {
+        sitemap_url: sitemap,
+        good: FakeResponse(good, 200, INSTALL_PAGE),
+        bad: FakeResponse(bad, 200, "<pre>pip install other</pre>", error=ConnectionError("reset")),
+    })
+
+    landing = BeautifulSoup("", "html.parser")
+    methods = fetcher._crawl_installation_methods("https://docs.tool.org/", landing, "tool")
+
+    assert [m["command"] for m in methods] == ["pip install tool", "conda install -c bioconda tool"]
+    assert sitemap.bytes_served < 2000 + 16384
+
+
+def test_crawl_settings_are_part_of_cache_keys(tmp_path):
+    keys = set()
+    for settings in ({}, {"docs_crawl": True}, {"docs_crawl": True, "docs_crawl_max_pages": 3}):
+        config = make_config(tmp_path, **settings)
+        fetcher = DocsFetcher(config)
+        registry = FetcherRegistry(config)
+        keys.add((fetcher._metadata_cache_key("tool"), registry._merged_cache_key("tool", [fetcher])))
+
+    assert len({fetcher_key for fetcher_key, _ in keys}) == 3
+    assert len({merged_key for _, merged_key in keys}) == 3
+
+
+def test_probe_answers_survive_crawl_setting_changes(tmp_path, monkeypatch):
+    probes = []
+
+    def fake_head(url, **kwargs):
+        probes.append(url)
+        return type("Response", (), {"status_code": 200 if url == "https://tool.dev" else 404})()
+
+    for settings in ({}, {"docs_crawl": True}):
+        fetcher = DocsFetcher(make_config(tmp_path, **settings))
+        monkeypatch.setattr(fetcher.transport, "head", fake_head)
+        assert fetcher._find_documentation_url("tool") == "https://tool.dev"
+        assert len(probes) == 9
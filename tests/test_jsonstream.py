@@ -0,0 +1,158 @@
+import json
+import time
+
+import pytest
+
+from metadata.core import FetcherConfig
+from metadata.core.fetchers import PyPIFetcher
+from metadata.core.jsonstream import JsonStreamReader
+
+
+DOCUMENT = {
+    "info": {"name": "tool", "summary": "Say \"hi\" \\ é ☃", "version": "2.0", "requires_dist": None},
+    "last_serial": 1234567,
+    "releases": {
+        "1.0": [{"upload_time_iso_8601": "2020-01-01T00:00:00Z", "digests": {"md5": "x" * 32}}],
+        "0.9": [],
+        "2.0": [{"upload_time_iso_8601": "2022-01-01T00:00:00Z"}, {"upload_time_iso_8601": "2021-12-31T00:00:00Z"}],
+        "1.5": [{"upload_time": "2021-06-01T00:00:00"}],
+    },
+    "urls": [{"url": "https://files/[x]{y}", "size": -1.5e3, "yanked": False}],
+}
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 16384])
+def test_reader_decodes_requested_members_and_skips_the_rest(size):
+    reader = JsonStreamReader(chunked(json.dumps(DOCUMENT, ensure_ascii=False).encode(), size))
+    seen = {}
+    for key in reader.members():
+        if key == "releases":
+            seen[key] = {version: reader.value() for version in reader.members()}
+        elif key != "urls":
+            seen[key] = reader.value()
+
+    assert seen == {key: value for key, value in DOCUMENT.items() if key != "urls"}
+
+
+NUMBERS = {"float": 0.1, "exponent": 1e5, "negative": -2, "signed_exponent": -2.5E-3,
+           "literal": True, "last": 10}
+
+
+@pytest.mark.parametrize("size", range(1, 24))
+def test_reader_decodes_numbers_split_across_chunks(size):
+    data = b'{"float":0.1,"exponent":1e5,"negative":-2,"signed_exponent":-2.5E-3,"literal":true,"last":10}'
+    reader = JsonStreamReader(chunked(data, size))
+
+    assert {key: reader.value() for key in reader.members()} == NUMBERS
+    assert JsonStreamReader(chunked(b"-12.5e1", size)).value() == -125.0
+
+
+def test_reader_stops_consuming_chunks_once_done():
+    chunks = chunked(json.dumps(DOCUMENT).encode(), 16)
+    consumed = []
+
+    def source():
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    reader = JsonStreamReader(source())
+    for key in reader.members():
+        if key == "info":
+            assert reader.value() == DOCUMENT["info"]
+            break
+
+    assert len(consumed) < len(chunks) / 2
+
+
+def test_reader_rejects_truncated_documents():
+    reader = JsonStreamReader([json.dumps(DOCUMENT).encode()[:-40]])
+    with pytest.raises(ValueError):
+        list(reader.members())
+
+
+class StreamedResponse:
+    def __init__(self, body, size=64, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.url = "https://pypi.org/pypi/tool/json"
+        self.chunks = chunked(body, size)
+        self.read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+def make_fetcher(tmp_path, **kwargs):
+    config = FetcherConfig(output_directory=str(tmp_path / "outputs"),
+                           cache_directory=str(tmp_path / "cache"), **kwargs)
+    return PyPIFetcher(config)
+
+
+def test_pypi_reads_only_info_by_default(tmp_path, monkeypatch):
+    fetcher = make_fetcher(tmp_path)
+    response = StreamedResponse(json.dumps(DOCUMENT).encode())
+    monkeypatch.setattr(fetcher.transport, "get", lambda url, **kwargs: response)
+
+    metadata = fetcher.fetch("tool")
+
+    assert metadata.version == "2.0" and metadata.description == DOCUMENT["info"]["summary"]
+    assert "recent_releases" not in metadata.category_fields
+    assert response.closed and response.read < len(response.chunks) / 2
+
+
+def test_pypi_keeps_newest_releases_when_configured(tmp_path, monkeypatch):
+    fetcher = make_fetcher(tmp_path, pypi_recent_releases=2)
+    response = StreamedResponse(json.dumps(DOCUMENT).encode())
+    monkeypatch.setattr(fetcher.transport, "get", lambda url, **kwargs: response)
+
+    metadata = fetcher.fetch("tool")
+
+    assert metadata.category_fields["recent_releases"] == [
+        {"version": "2.0", "upload_time": "2021-12-31T00:00:00Z"},
+        {"version": "1.5", "upload_time": "2021-06-01T00:00:00"},
+    ]
+    # "urls" follows "releases" and is never read
+    assert response.read < len(response.chunks)
+
+
+def test_recent_releases_setting_is_part_of_the_cache_key(tmp_path):
+    from metadata.core.fetchers import PyPIMirrorFetcher
+
+    default, with_releases = make_fetcher(tmp_path), make_fetcher(tmp_path, pypi_recent_releases=5)
+    assert default._metadata_cache_key("tool") != with_releases._metadata_cache_key("tool")
+    assert PyPIMirrorFetcher(with_releases.config).get_cache_fingerprint() == {}
+
+
+def test_pypi_revalidates_cached_documents(tmp_path, monkeypatch):
+    fetcher = make_fetcher(tmp_path)
+    requests = []
+
+    def fake_get(url, headers=None, **kwargs):
+        requests.append(headers or {})
+        if (headers or {}).get("If-None-Match") == '"v1"':
+            return StreamedResponse(b"", status_code=304, headers={"ETag": '"v1"'})
+        return StreamedResponse(json.dumps(DOCUMENT).encode(), headers={"ETag": '"v1"'})
+
+    monkeypatch.setattr(fetcher.transport, "get", fake_get)
+
+    assert fetcher.fetch("tool").version == "2.0"
+    assert fetcher.fetch("tool").version == "2.0"
+    assert requests == [{}]
+
+    # Once stale, the document is revalidated instead of downloaded again
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + fetcher.transport.cache_ttl + 1)
+    metadata = fetcher.fetch("tool")
+    assert requests[1] == {"If-None-Match": '"v1"'}
+    assert metadata.version == "2.0" and metadata.description == DOCUMENT["info"]["summary"]
@@ -0,0 +1,55 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from metadata.core.limits import HostLimiter, RateLimiter, SingleFlight, TokenBucket
+
+
+def test_token_bucket_waits_only_after_burst():
+    bucket = TokenBucket(rate=10.0, burst=3)
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() > 0.05
+
+
+def test_rate_limiter_keeps_hosts_independent():
+    limiter = RateLimiter(default_rate=5.0, default_burst=1, rates={"slow.example": 1.0})
+
+    start = time.monotonic()
+    limiter.acquire("https://slow.example/a")
+    limiter.acquire("https://fast.example/a")
+    limiter.acquire("https://other.example/a")
+    assert time.monotonic() - start < 0.1
+
+    assert limiter.get_bucket("https://SLOW.example/b").rate == 1.0
+    assert limiter.acquire("fast.example") > 0.1
+
+
+def test_host_of_normalizes_urls_and_hostnames():
+    assert HostLimiter.host_of("https://PyPI.org/pypi/x/json") == "pypi.org"
+    assert HostLimiter.host_of("API.github.com") == "api.github.com"
+
+
+def test_single_flight_shares_results_and_errors():
+    flights = SingleFlight(copy_result=list)
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        time.sleep(0.2)
+        if value == "bad":
+            raise ValueError(value)
+        return [value]
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(lambda _: flights.do("key", slow, "good"), range(3)))
+        errors = [executor.submit(flights.do, "other", slow, "bad") for _ in range(2)]
+
+    assert calls.count("good") == 1
+    assert sorted(shared for _, shared in results) == [False, True, True]
+    assert all(result == ["good"] for result, _ in results)
+    assert len({id(result) for result, _ in results}) == 3
+    for future in errors:
+        with pytest.raises(ValueError):
+            future.result()
@@ -0,0 +1,123 @@
+import gzip
+import json
+import sqlite3
+
+from metadata.core import FetcherConfig, FetcherRegistry
+from metadata.core.fetchers import PyPIMirrorFetcher, PyPIMirrorIndex
+
+
+def project(name, version, serial, **info):
+    return {
+        "info": {"name": name, "summary": f"{name} summary", "version": version,
+                 "requires_dist": ["numpy>=1.0"], "classifiers": ["unused"], **info},
+        "last_serial": serial,
+        "releases": {version: [{"upload_time_iso_8601": "2024-01-01T00:00:00Z"}]},
+    }
+
+
+def test_ingest_indexes_documents_and_dumps(tmp_path):
+    mirror = tmp_path / "mirror"
+    (mirror / "json").mkdir(parents=True)
+    (mirror / "json" / "requests.json").write_text(json.dumps(project("requests", "2.31.0", 10)))
+    with gzip.open(mirror / "dump.jsonl.gz", "wt") as dump:
+        dump.write(json.dumps(project("Scikit_Learn", "1.4.0", 20)) + "\n")
+        dump.write("{not json\n")
+        dump.write(json.dumps({"name": "bare", "summary": "info only", "version": "0.1"}) + "\n")
+    (mirror / "notes.txt").write_text("ignored")
+
+    index = PyPIMirrorIndex(str(tmp_path / "index.sqlite3"))
+    report = index.ingest([str(mirror)])
+
+    assert report == {"files": 2, "skipped": 0, "projects": 3, "errors": 1}
+    assert index.lookup("scikit-learn") == {
+        "name": "Scikit_Learn", "summary": "Scikit_Learn summary", "version": "1.4.0",
+        "requires_dist": ["numpy>=1.0"],
+    }
+    assert index.lookup("Requests")["version"] == "2.31.0"
+    assert index.lookup("bare")["summary"] == "info only"
+    assert index.lookup("missing") is None
+
+
+def test_ingest_is_incremental(tmp_path):
+    dump = tmp_path / "dump.jsonl"
+    dump.write_text(json.dumps(project("requests", "2.31.0", 10)) + "\n")
+    index = PyPIMirrorIndex(str(tmp_path / "index.sqlite3"))
+    index.ingest([str(dump)])
+
+    assert index.ingest([str(dump)])["skipped"] == 1
+
+    # Appended lines are read from where the last ingest stopped; an
+    # older serial never replaces a newer document, and a partial last
+    # line waits for the next ingest
+    with open(dump, "a") as handle:
+        handle.write(json.dumps(project("requests", "2.0.0", 5)) + "\n")
+        handle.write(json.dumps(project("flask", "3.0.0", 30)) + "\n")
+        handle.write(json.dumps(project("django", "5.0", 40))[:20])
+    assert index.ingest([str(dump)])["projects"] == 2
+    assert index.lookup("requests")["version"] == "2.31.0"
+    assert index.lookup("django") is None
+
+    with open(dump, "a") as handle:
+        handle.write(json.dumps(project("django", "5.0", 40))[20:] + "\n")
+    assert index.ingest([str(dump)])["projects"] == 1
+    assert index.lookup("django")["version"] == "5.0"
+    assert index.get_stats()["projects"] == 3
+
+
+def test_ingest_rereads_dumps_rewritten_in_place(tmp_path):
+    dump = tmp_path / "dump.jsonl"
+    dump.write_text(json.dumps(project("requests", "2.31.0", 10)) + "\n")
+    index = PyPIMirrorIndex(str(tmp_path / "index.sqlite3"))
+    index.ingest([str(dump)])
+
+    # Same length or longer, but not an append: nothing read before is kept
+    dump.write_text(json.dumps(project("flasks", "2.31.0", 11)) + "\n" +
+                    json.dumps(project("django", "5.0", 40)) + "\n")
+    assert index.ingest([str(dump)])["projects"] == 2
+    assert index.lookup("flasks")["version"] == "2.31.0"
+    assert index.lookup("django")["version"] == "5.0"
+
+
+def test_indexes_without_digests_are_upgraded(tmp_path):
+    path = tmp_path / "index.sqlite3"
+    conn = sqlite3.connect(str(path))
+    conn.executescript(PyPIMirrorIndex.SCHEMA.replace(",\n            digest TEXT", ""))
+    conn.execute("INSERT INTO ingested_files VALUES (?, 1, 1, 1, 1, 1)", (str(tmp_path / "dump.jsonl"),))
+    conn.commit()
+    conn.close()
+
+    dump = tmp_path / "dump.jsonl"
+    dump.write_text(json.dumps(project("requests", "2.31.0", 10)) + "\n")
+    index = PyPIMirrorIndex(str(path))
+    assert index.ingest([str(dump)])["projects"] == 1
+    assert index.ingest([str(dump)])["skipped"] == 1
+
+
+def test_mirror_fetcher_answers_ahead_of_pypi_and_offline(tmp_path):
+    index_path = tmp_path / "index.sqlite3"
+    config = FetcherConfig(output_directory=str(tmp_path / "outputs"),
+                           cache_directory=str(tmp_path / "cache"),
+                           pypi_mirror_index=str(index_path))
+    fetcher = PyPIMirrorFetcher(config)
+    assert not fetcher.can_fetch("requests")
+
+    dump = tmp_path / "dump.jsonl"
+    dump.write_text(json.dumps(project("requests", "2.31.0", 10)) + "\n")
+    PyPIMirrorIndex(str(index_path)).ingest([str(dump)])
+
+    assert fetcher.can_fetch("requests")
+    metadata = fetcher.fetch("requests")
+    assert metadata.version == "2.31.0" and metadata.description == "requests summary"
+    assert metadata.source_priority == "mirror"
+    assert metadata.dependencies["latest"] == ["numpy>=1.0"]
+    assert fetcher.fetch("missing") is None
+
+    offline = FetcherConfig(output_directory=str(tmp_path / "outputs"),
+                            cache_directory=str(tmp_path / "cache"),
+                            pypi_mirror_index=str(index_path), offline=True)
+    registry = FetcherRegistry(offline)
+    registry.register(PyPIMirrorFetcher(offline))
+
+    metadata = registry.fetch_metadata("requests")
+    assert metadata.version == "2.31.0"
+    assert metadata.raw_data["registry"]["cache_misses"] == []
@@ -0,0 +1,538 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from metadata.core import BaseFetcher, FetcherConfig, FetcherRegistry, UnifiedMetadata
+from metadata.core.cache import CacheMissError
+
+
+class StubFetcher(BaseFetcher):
+    def __init__(self, config, name, priority, delay=0.0, **fields):
+        super().__init__(config)
+        self.name = name
+        self.priority = priority
+        self.delay = delay
+        self.fields = fields
+        self.calls = 0
+
+    def can_fetch(self, tool_name):
+        return True
+
+    def fetch(self, tool_name):
+        self.calls += 1
+        time.sleep(self.delay)
+        metadata = UnifiedMetadata(name=tool_name, source_priority="online", **self.fields)
+        metadata.add_installation_method("pip", f"pip install {tool_name}")
+        return metadata
+
+    def get_priority(self):
+        return self.priority
+
+
+@pytest.fixture
+def config(tmp_path):
+    return FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "cache"),
+        enable_caching=False,
+    )
+
+
+def build_registry(config):
+    registry = FetcherRegistry(config)
+    # Slowest fetcher has the highest priority, so completion order differs from priority order
+    registry.register(StubFetcher(config, "Slow", 1, delay=0.2, version="1.0"))
+    registry.register(StubFetcher(config, "Fast", 2, homepage="https://fast.example"))
+    registry.register(StubFetcher(config, "Fallback", 3, description="fallback"))
+    return registry
+
+
+def test_parallel_merge_matches_sequential(config):
+    sequential = build_registry(config).fetch_metadata("tool")
+    registry = build_registry(config)
+    parallel = registry.fetch_metadata("tool", parallel=True)
+    registry.shutdown()
+
+    assert parallel.version == sequential.version == "1.0"
+    assert parallel.homepage == sequential.homepage
+    assert parallel.description == sequential.description
+    assert (parallel.raw_data['registry']['successful_fetchers']
+            == sequential.raw_data['registry']['successful_fetchers'])
+
+
+def test_parallel_deadline_reports_timed_out_fetchers(config):
+    registry = FetcherRegistry(config)
+    registry.register(StubFetcher(config, "Slow", 1, delay=0.5, description="slow"))
+    registry.register(StubFetcher(config, "Fast", 2, version="2.0"))
+
+    start = time.time()
+    metadata = registry.fetch_metadata("tool", parallel=True, deadline=0.1)
+    elapsed = time.time() - start
+    registry.shutdown()
+
+    assert elapsed < 0.4
+    assert metadata.version == "2.0"
+    assert metadata.raw_data['registry']['timed_out_fetchers'] == ["Slow"]
+
+
+def test_fetchers_abandoned_at_the_deadline_stop_at_their_next_request(config, monkeypatch):
+    import threading
+
+    finished = threading.Event()
+    sent = []
+
+    class RequestingStub(StubFetcher):
+        def fetch(self, tool_name):
+            try:
+                time.sleep(0.2)
+                self.transport.get("https://slow.example")
+                return super().fetch(tool_name)
+            finally:
+                finished.set()
+
+    monkeypatch.setattr(config.get_transport().session, "request", lambda *args, **kwargs: sent.append(args))
+    registry = FetcherRegistry(config)
+    registry.register(RequestingStub(config, "Slow", 1))
+    registry.register(StubFetcher(config, "Fast", 2, version="2.0"))
+
+    metadata = registry.fetch_metadata("tool", parallel=True, deadline=0.1)
+    assert metadata.raw_data['registry']['timed_out_fetchers'] == ["Slow"]
+    assert finished.wait(2) and sent == []
+    registry.shutdown()
+
+
+def test_afetch_many_adapts_sync_fetchers(config):
+    registry = build_registry(config)
+
+    results = asyncio.run(registry.afetch_many(["alpha", "beta"], concurrency=2))
+
+    assert list(results) == ["alpha", "beta"]
+    for name, metadata in results.items():
+        assert metadata.name == name
+        assert metadata.version == "1.0"
+        assert metadata.description == "fallback"
+        assert metadata.raw_data['registry']['mode'] == 'async'
+
+
+def test_afetch_many_runs_on_the_async_pool_under_host_limits(config):
+    import threading
+
+    class HostStub(StubFetcher):
+        active = 0
+        peak = 0
+        threads = set()
+        lock = threading.Lock()
+
+        def get_hosts(self):
+            return ["api.example.com"]
+
+        def fetch(self, tool_name):
+            with HostStub.lock:
+                HostStub.threads.add(threading.current_thread().name)
+                HostStub.active += 1
+                HostStub.peak = max(HostStub.peak, HostStub.active)
+            try:
+                return super().fetch(tool_name)
+            finally:
+                with HostStub.lock:
+                    HostStub.active -= 1
+
+    config.host_limits = {"api.example.com": 1}
+    registry = FetcherRegistry(config)
+    registry.register(HostStub(config, "Host", 1, delay=0.05, description="d"))
+
+    results = asyncio.run(registry.afetch_many(["a", "b", "c", "d"], concurrency=4))
+
+    assert all(metadata.description == "d" for metadata in results.values())
+    assert HostStub.peak == 1
+    assert all(name.startswith("afetch") for name in HostStub.threads)
+
+
+def test_fetch_many_respects_per_host_limit(config):
+    import threading
+
+    class HostStub(StubFetcher):
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def get_hosts(self):
+            return ["api.example.com"]
+
+        def fetch(self, tool_name):
+            with HostStub.lock:
+                HostStub.active += 1
+                HostStub.peak = max(HostStub.peak, HostStub.active)
+            try:
+                return super().fetch(tool_name)
+            finally:
+                with HostStub.lock:
+                    HostStub.active -= 1
+
+    registry = FetcherRegistry(config)
+    registry.register(HostStub(config, "Host", 1, delay=0.05, description="d"))
+    host_limiter = registry.host_limiter
+
+    results = dict(registry.fetch_many(["a", "b", "c", "d"], concurrency=4, per_host_limit=1))
+
+    assert sorted(results) == ["a", "b", "c", "d"]
+    assert all(metadata.description == "d" for metadata in results.values())
+    assert HostStub.peak == 1
+
+    # The limit applied to that call only
+    assert registry.host_limiter is host_limiter
+    HostStub.peak = 0
+    list(registry.fetch_many(["e", "f", "g", "h"], concurrency=4))
+    assert HostStub.peak > 1
+
+
+class CachingStubFetcher(StubFetcher):
+    def fetch(self, tool_name):
+        metadata = super().fetch(tool_name)
+        metadata.version = str(self.calls)
+        return metadata
+
+
+def test_stale_results_are_served_and_refreshed_in_background(tmp_path, monkeypatch):
+    config = FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "cache"),
+        cache_ttl=60,
+        memory_cache_entries=0,
+        stale_while_revalidate=True,
+        fetcher_max_staleness={"Cached": 3600},
+    )
+    registry = FetcherRegistry(config)
+    fetcher = CachingStubFetcher(config, "Cached", 1)
+    registry.register(fetcher)
+
+    assert registry.fetch_metadata("tool").version == "1"
+
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 120)
+    stale = registry.fetch_metadata("tool")
+    assert stale.version == "1"
+    assert stale.raw_data['registry']['stale_fetchers'] == ["Cached"]
+
+    registry.shutdown(wait=True)
+    assert fetcher.calls == 2
+    fresh = registry.fetch_metadata("tool")
+    assert fresh.version == "2" and not fresh.raw_data['registry']['stale']
+
+    monkeypatch.setattr(time, "time", lambda: real_time() + 120 + 7200)
+    assert registry.fetch_metadata("tool").version == "3"
+
+
+def test_every_fetcher_result_is_cached_unless_refreshed(tmp_path):
+    config = FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "cache"),
+        fetcher_cache_ttls={"Uncached": 0},
+        registry_cache_ttl=0,
+    )
+    registry = FetcherRegistry(config)
+    cached = CachingStubFetcher(config, "Cached", 1)
+    uncached = CachingStubFetcher(config, "Uncached", 2, description="live")
+    registry.register(cached)
+    registry.register(uncached)
+
+    assert registry.fetch_metadata("tool").version == "1"
+    assert registry.fetch_metadata("tool", parallel=True).version == "1"
+    assert asyncio.run(registry.afetch_metadata("tool")).version == "1"
+    assert cached.calls == 1 and uncached.calls == 3
+
+    assert registry.fetch_metadata("tool", refresh=True).version == "2"
+    assert registry.fetch_metadata("tool").version == "2"
+    assert cached.calls == 2
+    registry.shutdown()
+
+
+class SearchStubFetcher(StubFetcher):
+    def fetch(self, tool_name):
+        metadata = super().fetch(tool_name)
+        metadata.raw_data = {"urls": ["https://tool.example"], "search_sources": ["stub"]}
+        return metadata
+
+
+def test_cached_fetcher_results_keep_raw_data(tmp_path):
+    config = FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "cache"),
+        memory_cache_entries=0,
+    )
+    fetcher = SearchStubFetcher(config, "Search", 1)
+
+    assert fetcher.fetch_with_timing("tool").raw_data["downloads"]["responses"] == 0
+    cached = fetcher.fetch_with_timing("tool")
+    assert fetcher.calls == 1
+    assert cached.raw_data == {"urls": ["https://tool.example"], "search_sources": ["stub"]}
+
+
+def test_merged_results_are_cached_per_fetcher_set(tmp_path):
+    config = FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "cache"),
+        fetcher_cache_ttls={"Primary": 0, "Secondary": 0},
+    )
+    registry = FetcherRegistry(config)
+    primary = CachingStubFetcher(config, "Primary", 1)
+    secondary = CachingStubFetcher(config, "Secondary", 2, description="merged")
+    registry.register(primary)
+    registry.register(secondary)
+
+    first = registry.fetch_metadata("Tool")
+    again = registry.fetch_metadata("tool ")
+    assert primary.calls == secondary.calls == 1
+    assert again.raw_data['registry']['cached'] and not first.raw_data['registry']['cached']
+    assert (again.version, again.description) == ("1", "merged")
+    assert asyncio.run(registry.afetch_metadata("tool")).raw_data['registry']['cached']
+
+    assert registry.fetch_metadata("tool", refresh=True).version == "2"
+    registry.register(StubFetcher(config, "Extra", 3))
+    assert not registry.fetch_metadata("tool").raw_data['registry']['cached']
+    assert primary.calls == 3
+
+
+def test_merged_results_keep_raw_data_and_track_result_settings(tmp_path):
+    from metadata.core.fetchers import DocsFetcher, PyPIFetcher
+
+    def make_config(**kwargs):
+        return FetcherConfig(output_directory=str(tmp_path / "outputs"),
+                             cache_directory=str(tmp_path / "cache"),
+                             fetcher_cache_ttls={"Search": 0}, **kwargs)
+
+    registry = FetcherRegistry(make_config())
+    search = SearchStubFetcher(registry.config, "Search", 1)
+    registry.register(search)
+    registry.fetch_metadata("tool")
+    cached = registry.fetch_metadata("tool")
+    assert search.calls == 1 and cached.raw_data["registry"]["cached"]
+    assert cached.raw_data["urls"] == ["https://tool.example"]
+    assert "downloads" not in cached.raw_data["registry"]
+
+    def merged_key(config):
+        registry = FetcherRegistry(config)
+        fetchers = [DocsFetcher(config), PyPIFetcher(config)]
+        return registry._merged_cache_key("tool", fetchers)
+
+    default = merged_key(make_config())
+    assert merged_key(make_config()) == default
+    assert merged_key(make_config(docs_crawl=True)) != default
+    assert merged_key(make_config(pypi_recent_releases=3)) != default
+    assert merged_key(make_config(pypi_mirror_index=str(tmp_path / "other.sqlite3"))) != default
+
+
+def test_merged_results_missing_a_failed_fetcher_are_not_cached(tmp_path):
+    class FlakyStub(CachingStubFetcher):
+        def fetch(self, tool_name):
+            metadata = super().fetch(tool_name)
+            if self.calls == 1:
+                raise ConnectionError("connection reset")
+            return metadata
+
+    config = FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "cache"),
+    )
+    registry = FetcherRegistry(config)
+    registry.register(CachingStubFetcher(config, "Steady", 1))
+    flaky = FlakyStub(config, "Flaky", 2, description="flaky")
+    registry.register(flaky)
+
+    first = registry.fetch_metadata("tool")
+    assert first.raw_data["registry"]["failed_fetchers"] == ["Flaky"] and first.description is None
+
+    again = registry.fetch_metadata("tool")
+    assert flaky.calls == 2 and not again.raw_data["registry"]["cached"]
+    assert again.description == "flaky"
+    assert registry.fetch_metadata("tool").raw_data["registry"]["cached"]
+
+
+def test_warm_only_refetches_results_close_to_expiry(tmp_path):
+    config = FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "cache"),
+        cache_ttl=600,
+    )
+    registry = FetcherRegistry(config)
+    fetcher = CachingStubFetcher(config, "Cached", 1)
+    registry.register(fetcher)
+
+    report = registry.warm(["a", "b", "a"], concurrency=2, refresh_window=60)
+    assert report['total'] == 2 and report['warmed'] == 2 and report['coverage'] == 1.0
+    assert fetcher.calls == 2
+
+    report = registry.warm(["a", "b"], refresh_window=60)
+    assert report['fresh'] == 2 and fetcher.calls == 2
+
+    # The merged result is renewed from the fetcher's still-fresh result
+    report = registry.warm(["a"], refresh_window=3600)
+    assert report['tools'] == {"a": "warmed"} and fetcher.calls == 2
+    assert registry.fetch_metadata("a").raw_data['registry']['cached']
+    assert fetcher.calls == 2
+
+    live = CachingStubFetcher(config, "Live", 2, description="live")
+    config.fetcher_cache_ttls = {"Live": 0}
+    registry.register(live)
+    assert registry.warm(["a"], refresh_window=60)['warmed'] == 1
+    assert (fetcher.calls, live.calls) == (2, 1)
+
+
+def test_warm_refetches_expired_fetcher_results_instead_of_serving_them_stale(tmp_path, monkeypatch):
+    config = FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "cache"),
+        memory_cache_entries=0,
+        fetcher_cache_ttls={"Cached": 60},
+        registry_cache_ttl=600,
+        stale_while_revalidate=True,
+    )
+    registry = FetcherRegistry(config)
+    fetcher = CachingStubFetcher(config, "Cached", 1)
+    registry.register(fetcher)
+    registry.warm(["a"])
+
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 120)
+    assert registry.warm(["a"], refresh_window=600)['warmed'] == 1
+    assert fetcher.calls == 2
+    assert registry.fetch_metadata("a").version == "2"
+
+
+def test_warm_reports_aliases_under_their_canonical_cache_entry(tmp_path):
+    config = FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "cache"),
+        cache_ttl=600,
+    )
+    registry = FetcherRegistry(config, normalizer=lambda name: {"sklearn": "scikit-learn"}.get(name, name))
+    fetcher = CachingStubFetcher(config, "Cached", 1)
+    registry.register(fetcher)
+
+    assert registry.warm(["sklearn"], refresh_window=60)['tools'] == {"sklearn": "warmed"}
+    assert registry.warm(["sklearn", "scikit-learn"], refresh_window=60)['fresh'] == 2
+    assert fetcher.calls == 1
+
+
+def test_offline_registry_serves_snapshot_and_reports_misses(tmp_path):
+    online = FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "cache"),
+    )
+    registry = FetcherRegistry(online)
+    registry.register(CachingStubFetcher(online, "Cached", 1))
+    registry.fetch_metadata("tool")
+    bundle = str(tmp_path / "bundle.mfsnap")
+    online.get_cache_manager().export_snapshot(bundle)
+
+    offline = FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "offline"),
+        cache_snapshot=bundle,
+    )
+    registry = FetcherRegistry(offline)
+    cached = CachingStubFetcher(offline, "Cached", 1)
+    extra = CachingStubFetcher(offline, "Extra", 2, description="extra")
+    registry.register(cached)
+    registry.register(extra)
+
+    metadata = registry.fetch_metadata("tool")
+    assert metadata.version == "1"
+    assert metadata.raw_data['registry']['cache_misses'] == ["Extra"]
+    with pytest.raises(CacheMissError):
+        registry.fetch_metadata("unknown")
+    with pytest.raises(CacheMissError):
+        offline.get_transport().get("https://pypi.org/pypi/tool/json")
+    assert cached.calls == extra.calls == 0
+
+
+def test_concurrent_misses_for_one_tool_fetch_once(tmp_path):
+    config = FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "cache"),
+    )
+    fetcher = StubFetcher(config, "Slow", 1, delay=0.2, version="1.0")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(fetcher.fetch_with_timing, ["tool"] * 4))
+
+    assert fetcher.calls == 1
+    assert all(metadata.version == "1.0" for metadata in results)
+
+
+def test_concurrent_identical_lookups_share_one_fetch(config):
+    aliases = {"jupyter": "jupyter_lab", "jupyterlab": "jupyter_lab"}
+    registry = FetcherRegistry(config, normalizer=lambda name: aliases.get(name, name))
+    fetcher = StubFetcher(config, "Slow", 1, delay=0.3, version="1.0")
+    registry.register(fetcher)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(registry.fetch_metadata, ["jupyter", "jupyterlab", "jupyter_lab", "jupyter"]))
+
+    assert fetcher.calls == 1
+    assert {metadata.name for metadata in results} == {"jupyter_lab"}
+    assert len({id(metadata) for metadata in results}) == 4
+    results[0].installation_methods.clear()
+    assert all(metadata.installation_methods for metadata in results[1:])
+
+    async def lookup_twice():
+        return await asyncio.gather(registry.afetch_metadata("jupyter"), registry.afetch_metadata("jupyterlab"))
+
+    first, second = asyncio.run(lookup_twice())
+    assert fetcher.calls == 2 and first is not second
+
+
+def test_registry_reports_bytes_read_and_truncations(config):
+    class DownloadingStub(StubFetcher):
+        def fetch(self, tool_name):
+            response = type("Response", (), {
+                "url": "https://tool.example", "encoding": "utf-8", "close": lambda self: None,
+                "iter_content": lambda self, chunk_size: iter([b"<p>" + b"x" * 100]),
+            })()
+            metadata = super().fetch(tool_name)
+            metadata.readme_content = self.read_response(response)
+            return metadata
+
+    config.response_byte_limits = {"Capped": 40}
+    registry = FetcherRegistry(config)
+    registry.register(DownloadingStub(config, "Capped", 1))
+    registry.register(DownloadingStub(config, "Full", 2))
+
+    metadata = registry.fetch_metadata("tool")
+
+    report = metadata.raw_data["registry"]
+    assert report["downloads"] == {
+        "Capped": {"bytes_read": 40, "responses": 1, "truncated": 1},
+        "Full": {"bytes_read": 103, "responses": 1, "truncated": 0},
+    }
+    assert report["bytes_read"] == 143 and report["truncated_responses"] == 1
+
+
+def test_cancelled_afetch_releases_the_cache_lock_it_was_waiting_for(tmp_path):
+    config = FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "cache"),
+    )
+    fetcher = StubFetcher(config, "Stub", 1)
+    locks = config.get_cache_manager().locks
+    key = fetcher._metadata_cache_key("tool")
+
+    async def cancel_waiting_fetch():
+        task = asyncio.ensure_future(fetcher.afetch_with_timing("tool"))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The waiting executor thread gets the lock only now
+        locks.release(held)
+        await asyncio.sleep(0.3)
+
+    held = locks.acquire(key, timeout=1)
+    asyncio.run(cancel_waiting_fetch())
+
+    handle = locks.acquire(key, timeout=1)
+    assert handle is not None
+    locks.release(handle)
+    assert fetcher.calls == 0
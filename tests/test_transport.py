@@ -0,0 +1,186 @@
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from metadata.core import FetcherConfig
+from metadata.core.fetchers import GitHubFetcher, PyPIFetcher
+from metadata.core.transport import HttpTransport, request_deadline
+
+
+def make_config(tmp_path, **kwargs):
+    return FetcherConfig(
+        output_directory=str(tmp_path / "outputs"),
+        cache_directory=str(tmp_path / "cache"),
+        **kwargs
+    )
+
+
+def test_fetchers_share_one_transport(tmp_path):
+    config = make_config(tmp_path)
+
+    assert PyPIFetcher(config).transport is GitHubFetcher(config).transport
+
+    replacement = HttpTransport()
+    config.set_transport(replacement)
+    assert PyPIFetcher(config).transport is replacement
+
+
+def test_transport_applies_defaults_and_rate_limit(tmp_path, monkeypatch):
+    config = make_config(tmp_path, timeout=3.5)
+    transport = config.get_transport()
+    calls = []
+    acquired = []
+    monkeypatch.setattr(transport.session, "request",
+                        lambda method, url, **kwargs: calls.append((method, url, kwargs)))
+    monkeypatch.setattr(transport.rate_limiter, "acquire", acquired.append)
+
+    transport.get("https://pypi.org/pypi/requests/json")
+    transport.head("https://docs.example.org", timeout=1)
+
+    assert calls[0][:2] == ("GET", "https://pypi.org/pypi/requests/json")
+    assert calls[0][2]["timeout"] == 3.5
+    assert calls[1][2]["timeout"] == 1
+    assert acquired == ["https://pypi.org/pypi/requests/json", "https://docs.example.org"]
+    assert "gzip" in transport.session.headers["Accept-Encoding"]
+
+
+def test_request_deadline_shortens_timeouts_and_stops_late_requests(tmp_path, monkeypatch):
+    transport = make_config(tmp_path, timeout=10).get_transport()
+    calls = []
+    monkeypatch.setattr(transport.session, "request", lambda method, url, **kwargs: calls.append(kwargs))
+
+    with request_deadline(time.time() + 1):
+        transport.get("https://pypi.org/a")
+        with request_deadline(time.time() + 60):
+            transport.get("https://pypi.org/b", timeout=(5, None))
+    assert 0 < calls[0]["timeout"] <= 1
+    assert calls[1]["timeout"][0] <= 1 and calls[1]["timeout"][1] <= 1
+
+    with request_deadline(time.time() - 1):
+        with pytest.raises(requests.Timeout):
+            transport.get("https://pypi.org/c")
+    transport.get("https://pypi.org/d")
+    assert len(calls) == 3 and calls[2]["timeout"] == 10
+
+
+def make_response(status, body=b"", headers=None, url="https://pypi.org/pypi/requests/json"):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers.update(headers or {})
+    response.url = url
+    return response
+
+
+def test_cached_get_revalidates_with_etag(tmp_path, monkeypatch):
+    config = make_config(tmp_path, cache_ttl=60)
+    config.get_cache_manager()
+    transport = config.get_transport()
+    sent = []
+    replies = [
+        make_response(200, b'{"info": {"version": "1.0"}}', {"ETag": '"v1"', "Content-Type": "application/json"}),
+        make_response(304, headers={"ETag": '"v1"'}),
+    ]
+
+    def fake_request(method, url, **kwargs):
+        sent.append(kwargs.get("headers") or {})
+        return replies.pop(0)
+
+    monkeypatch.setattr(transport.session, "request", fake_request)
+    url = "https://pypi.org/pypi/requests/json"
+
+    assert transport.get(url, cached=True).json() == {"info": {"version": "1.0"}}
+    assert transport.get(url, cached=True).from_cache
+    assert len(sent) == 1
+
+    monkeypatch.setattr(time, "time", lambda real=time.time: real() + 120)
+    refreshed = transport.get(url, cached=True)
+
+    assert sent[1]["If-None-Match"] == '"v1"'
+    assert refreshed.status_code == 200 and refreshed.from_cache
+    assert refreshed.json() == {"info": {"version": "1.0"}}
+    assert refreshed.headers["Content-Type"] == "application/json"
+
+
+def test_uncached_and_no_store_responses_bypass_cache(tmp_path, monkeypatch):
+    config = make_config(tmp_path)
+    config.get_cache_manager()
+    transport = config.get_transport()
+    calls = []
+    monkeypatch.setattr(transport.session, "request", lambda method, url, **kwargs: calls.append(url) or
+                        make_response(200, b"{}", {"Cache-Control": "no-store"}))
+
+    transport.get("https://api.github.com/x", cached=True)
+    transport.get("https://api.github.com/x", cached=True)
+    transport.get("https://api.github.com/y")
+    transport.get("https://api.github.com/y")
+    assert len(calls) == 4
+
+
+def test_concurrent_identical_gets_are_coalesced(tmp_path, monkeypatch):
+    transport = make_config(tmp_path).get_transport()
+    calls = []
+
+    def slow_request(method, url, **kwargs):
+        calls.append(url)
+        time.sleep(0.2)
+        return make_response(200, b'{"ok": true}', url=url)
+
+    monkeypatch.setattr(transport.session, "request", slow_request)
+    url = "https://pypi.org/pypi/requests/json"
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(executor.map(lambda _: transport.get(url, timeout=5), range(4)))
+        executor.submit(transport.get, "https://pypi.org/pypi/other/json").result()
+
+    assert calls == [url, "https://pypi.org/pypi/other/json"]
+    assert all(response.json() == {"ok": True} for response in responses)
+    assert len({id(response) for response in responses}) == 4
+
+
+def test_read_body_caps_bytes_and_stops_at_markers():
+    def streamed(chunks):
+        response = requests.Response()
+        response.raw = io.BytesIO()
+        response.iter_content = lambda chunk_size: iter(chunks)
+        return response
+
+    body, truncated = HttpTransport.read_body(streamed([b"a" * 10, b"b" * 10, b"c" * 10]), max_bytes=15)
+    assert body == b"a" * 10 + b"b" * 5 and truncated
+
+    # A marker split across chunks still stops the read, without counting as truncation
+    chunks = [b"<html><head><title>t</title></HE", b"AD><body>" + b"x" * 100, b"never read"]
+    body, truncated = HttpTransport.read_body(streamed(chunks), max_bytes=1000, stop_at=(b"</head>",))
+    assert body == b"".join(chunks[:2]) and not truncated
+
+    body, truncated = HttpTransport.read_body(streamed([b"a" * 10]), max_bytes=10)
+    assert body == b"a" * 10 and not truncated
+
+
+def test_json_api_responses_are_streamed_under_the_byte_cap(tmp_path, monkeypatch):
+    from metadata.core.fetchers.main_fetcher import MainFetcher
+    from metadata.core.fetchers.multi_search import MultiSearchFetcher
+
+    config = make_config(tmp_path, response_byte_limits={"MainFetcher": 64, "MultiSearchFetcher": 64})
+    chunks_read = []
+
+    def fake_get(url, **kwargs):
+        assert kwargs.get("stream")
+        response = make_response(200, url=url)
+        response.raw = io.BytesIO()
+
+        def iter_content(chunk_size):
+            for chunk in [b'{"Abstract": "' + b"x" * 32] * 100:
+                chunks_read.append(chunk)
+                yield chunk
+
+        response.iter_content = iter_content
+        return response
+
+    monkeypatch.setattr(config.get_transport(), "get", fake_get)
+
+    assert MainFetcher(config)._search_duckduckgo("tool") == []
+    assert MultiSearchFetcher(config)._search_duckduckgo("tool") == []
+    assert 0 < len(chunks_read) < 10